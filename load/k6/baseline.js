@@ -1,6 +1,6 @@
 import http from 'k6/http';
 import { check } from 'k6';
-import { authHeaders, walletId } from './common.js';
+import { authHeaders, recordServerTiming, walletId } from './common.js';
 
 const BASE_URL = __ENV.BASE_URL || 'http://localhost:8080';
 const VUS = Number(__ENV.VUS || 200);
@@ -33,6 +33,7 @@ export default function () {
     { headers: authHeaders('wallet:write wallet:read', idem) }
   );
 
+  recordServerTiming(res);
   check(res, {
     'status 200': (r) => r.status === 200,
   });
@@ -1,5 +1,6 @@
 import crypto from 'k6/crypto';
 import encoding from 'k6/encoding';
+import { Trend } from 'k6/metrics';
 
 const secret = __ENV.JWT_SECRET || 'dev-secret-change-me';
 const aud = __ENV.JWT_AUDIENCE || 'agentic-commerce';
@@ -32,3 +33,23 @@ export function authHeaders(scopes, idempotencyKey = null) {
 export function walletId(idx) {
   return `00000000-0000-0000-0000-${String(idx).padStart(12, '0')}`;
 }
+
+// Per-phase server time from the Server-Timing header (SERVER_TIMING_ENABLED=true on the
+// service), so a p95 regression can be attributed to auth, pool checkout, posting or commit.
+const PHASES = ['auth', 'replay_cache', 'pool_checkout', 'post_journal', 'commit', 'retry_backoff'];
+const phaseTrends = Object.fromEntries(
+  PHASES.map((phase) => [phase, new Trend(`server_phase_${phase}`, true)])
+);
+
+export function recordServerTiming(res) {
+  const header = res.headers['Server-Timing'];
+  if (!header) {
+    return;
+  }
+  for (const item of header.split(',')) {
+    const [name, duration] = item.trim().split(';dur=');
+    if (phaseTrends[name]) {
+      phaseTrends[name].add(Number(duration));
+    }
+  }
+}
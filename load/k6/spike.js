@@ -1,6 +1,6 @@
 import http from 'k6/http';
 import { check, sleep } from 'k6';
-import { authHeaders, walletId } from './common.js';
+import { authHeaders, recordServerTiming, walletId } from './common.js';
 
 const BASE_URL = __ENV.BASE_URL || 'http://localhost:8080';
 
@@ -26,6 +26,7 @@ export default function () {
     JSON.stringify({ from_wallet_id: from, to_wallet_id: to, amount: '0.25', asset: 'USD' }),
     { headers: authHeaders('wallet:write', idem) }
   );
+  recordServerTiming(res);
   check(res, { 'spike status': (r) => r.status === 200 });
   sleep(0.01);
 }
@@ -0,0 +1,94 @@
+-- Posts a balanced journal transaction in a single round-trip: idempotency
+-- lookup, account version bumps, entries, projections and the outbox event.
+-- Returns one row per entry (ordered by seq) carrying the transaction header.
+--
+-- Ledger errors use custom SQLSTATEs that the service maps back onto its
+-- domain errors: WL404 -> NotFoundError, WL409 -> ConflictError.
+CREATE OR REPLACE FUNCTION post_journal_transaction(
+  p_operation_scope TEXT,
+  p_idempotency_key TEXT,
+  p_payload_hash TEXT,
+  p_external_reference TEXT,
+  p_event_type TEXT,
+  p_payload JSONB,
+  p_wallet_ids UUID[],
+  p_amounts NUMERIC[],
+  p_assets TEXT[],
+  p_expected_versions BIGINT[]
+)
+RETURNS TABLE (
+  transaction_id UUID,
+  operation_scope TEXT,
+  idempotency_key TEXT,
+  payload_hash TEXT,
+  status TEXT,
+  created_at TIMESTAMPTZ,
+  external_reference TEXT,
+  wallet_id UUID,
+  amount NUMERIC(20, 6),
+  asset TEXT
+) AS $$
+#variable_conflict use_column
+DECLARE
+  v_transaction_id UUID;
+  v_existing_hash TEXT;
+  v_version BIGINT;
+  i INT;
+BEGIN
+  SELECT t.transaction_id, t.payload_hash
+  INTO v_transaction_id, v_existing_hash
+  FROM journal_transactions t
+  WHERE t.operation_scope = p_operation_scope AND t.idempotency_key = p_idempotency_key;
+
+  IF FOUND THEN
+    IF v_existing_hash <> p_payload_hash THEN
+      RAISE EXCEPTION 'idempotency key reuse with different payload' USING ERRCODE = 'WL409';
+    END IF;
+  ELSE
+    v_transaction_id := gen_random_uuid();
+
+    INSERT INTO journal_transactions(transaction_id, operation_scope, idempotency_key, payload_hash, status, external_reference)
+    VALUES (v_transaction_id, p_operation_scope, p_idempotency_key, p_payload_hash, 'committed', p_external_reference);
+
+    FOR i IN 1 .. array_length(p_wallet_ids, 1) LOOP
+      v_version := p_expected_versions[i];
+      IF v_version IS NULL THEN
+        SELECT a.version INTO v_version FROM accounts a WHERE a.wallet_id = p_wallet_ids[i] FOR UPDATE;
+        IF NOT FOUND THEN
+          RAISE EXCEPTION 'wallet not found' USING ERRCODE = 'WL404';
+        END IF;
+      END IF;
+
+      UPDATE accounts a
+      SET version = a.version + 1
+      WHERE a.wallet_id = p_wallet_ids[i] AND a.version = v_version
+      RETURNING a.version INTO v_version;
+      IF NOT FOUND THEN
+        RAISE EXCEPTION 'optimistic version conflict' USING ERRCODE = 'WL409';
+      END IF;
+
+      UPDATE balance_projections b
+      SET balance = b.balance + p_amounts[i], version = v_version, as_of = NOW()
+      WHERE b.wallet_id = p_wallet_ids[i] AND b.asset = p_assets[i];
+      IF NOT FOUND THEN
+        RAISE EXCEPTION 'projection row not found' USING ERRCODE = 'WL404';
+      END IF;
+    END LOOP;
+
+    INSERT INTO journal_entries(transaction_id, seq, wallet_id, amount, asset)
+    SELECT v_transaction_id, leg.seq, leg.wallet_id, leg.amount, leg.asset
+    FROM unnest(p_wallet_ids, p_amounts, p_assets) WITH ORDINALITY AS leg(wallet_id, amount, asset, seq);
+
+    INSERT INTO outbox_events(event_id, transaction_id, event_type, payload)
+    VALUES (gen_random_uuid(), v_transaction_id, p_event_type, p_payload);
+  END IF;
+
+  RETURN QUERY
+  SELECT t.transaction_id, t.operation_scope, t.idempotency_key, t.payload_hash, t.status,
+         t.created_at, t.external_reference, e.wallet_id, e.amount, e.asset
+  FROM journal_transactions t
+  JOIN journal_entries e ON e.transaction_id = t.transaction_id
+  WHERE t.transaction_id = v_transaction_id
+  ORDER BY e.seq;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,116 @@
+-- Lock every participating account in one statement, in wallet_id order, and
+-- apply expected-version checks, version bumps and projection deltas in that
+-- same statement. Opposing postings (A->B and B->A) now queue on the same
+-- first lock instead of deadlocking, and a wallet that appears on several legs
+-- is locked, versioned and projected exactly once.
+CREATE OR REPLACE FUNCTION post_journal_transaction(
+  p_operation_scope TEXT,
+  p_idempotency_key TEXT,
+  p_payload_hash TEXT,
+  p_external_reference TEXT,
+  p_event_type TEXT,
+  p_payload JSONB,
+  p_wallet_ids UUID[],
+  p_amounts NUMERIC[],
+  p_assets TEXT[],
+  p_expected_versions BIGINT[]
+)
+RETURNS TABLE (
+  transaction_id UUID,
+  operation_scope TEXT,
+  idempotency_key TEXT,
+  payload_hash TEXT,
+  status TEXT,
+  created_at TIMESTAMPTZ,
+  external_reference TEXT,
+  wallet_id UUID,
+  amount NUMERIC(20, 6),
+  asset TEXT
+) AS $$
+#variable_conflict use_column
+DECLARE
+  v_transaction_id UUID;
+  v_existing_hash TEXT;
+  v_wanted INT;
+  v_locked INT;
+  v_bumped INT;
+  v_projected INT;
+BEGIN
+  SELECT t.transaction_id, t.payload_hash
+  INTO v_transaction_id, v_existing_hash
+  FROM journal_transactions t
+  WHERE t.operation_scope = p_operation_scope AND t.idempotency_key = p_idempotency_key;
+
+  IF FOUND THEN
+    IF v_existing_hash <> p_payload_hash THEN
+      RAISE EXCEPTION 'idempotency key reuse with different payload' USING ERRCODE = 'WL409';
+    END IF;
+  ELSE
+    WITH wanted AS (
+      SELECT leg.wallet_id, MIN(leg.asset) AS asset, SUM(leg.amount) AS delta,
+             MAX(leg.expected_version) AS expected_version
+      FROM unnest(p_wallet_ids, p_amounts, p_assets, p_expected_versions)
+        AS leg(wallet_id, amount, asset, expected_version)
+      GROUP BY leg.wallet_id
+    ),
+    locked AS MATERIALIZED (
+      SELECT a.wallet_id, a.version, w.expected_version
+      FROM accounts a
+      JOIN wanted w ON w.wallet_id = a.wallet_id
+      ORDER BY a.wallet_id
+      FOR UPDATE OF a
+    ),
+    bumped AS (
+      UPDATE accounts a
+      SET version = a.version + 1
+      FROM locked l
+      WHERE a.wallet_id = l.wallet_id
+        AND (l.expected_version IS NULL OR l.version = l.expected_version)
+      RETURNING a.wallet_id, a.version
+    ),
+    projected AS (
+      UPDATE balance_projections b
+      SET balance = b.balance + w.delta, version = bu.version, as_of = NOW()
+      FROM bumped bu
+      JOIN wanted w ON w.wallet_id = bu.wallet_id
+      WHERE b.wallet_id = bu.wallet_id AND b.asset = w.asset
+      RETURNING b.wallet_id
+    )
+    SELECT (SELECT COUNT(*) FROM wanted),
+           (SELECT COUNT(*) FROM locked),
+           (SELECT COUNT(*) FROM bumped),
+           (SELECT COUNT(*) FROM projected)
+    INTO v_wanted, v_locked, v_bumped, v_projected;
+
+    IF v_locked < v_wanted THEN
+      RAISE EXCEPTION 'wallet not found' USING ERRCODE = 'WL404';
+    END IF;
+    IF v_bumped < v_locked THEN
+      RAISE EXCEPTION 'optimistic version conflict' USING ERRCODE = 'WL409';
+    END IF;
+    IF v_projected < v_bumped THEN
+      RAISE EXCEPTION 'projection row not found' USING ERRCODE = 'WL404';
+    END IF;
+
+    v_transaction_id := gen_random_uuid();
+
+    INSERT INTO journal_transactions(transaction_id, operation_scope, idempotency_key, payload_hash, status, external_reference)
+    VALUES (v_transaction_id, p_operation_scope, p_idempotency_key, p_payload_hash, 'committed', p_external_reference);
+
+    INSERT INTO journal_entries(transaction_id, seq, wallet_id, amount, asset)
+    SELECT v_transaction_id, leg.seq, leg.wallet_id, leg.amount, leg.asset
+    FROM unnest(p_wallet_ids, p_amounts, p_assets) WITH ORDINALITY AS leg(wallet_id, amount, asset, seq);
+
+    INSERT INTO outbox_events(event_id, transaction_id, event_type, payload)
+    VALUES (gen_random_uuid(), v_transaction_id, p_event_type, p_payload);
+  END IF;
+
+  RETURN QUERY
+  SELECT t.transaction_id, t.operation_scope, t.idempotency_key, t.payload_hash, t.status,
+         t.created_at, t.external_reference, e.wallet_id, e.amount, e.asset
+  FROM journal_transactions t
+  JOIN journal_entries e ON e.transaction_id = t.transaction_id
+  WHERE t.transaction_id = v_transaction_id
+  ORDER BY e.seq;
+END;
+$$ LANGUAGE plpgsql;
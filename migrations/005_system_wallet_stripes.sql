@@ -0,0 +1,78 @@
+-- The system counter-account is split into stripes so adjustments do not all
+-- serialize on one accounts row. Stripe 0 is the root system wallet itself;
+-- stripes 1..N-1 are ordinary accounts with deterministic ids derived from the
+-- root. Balances and audits on the root wallet id cover every stripe ever
+-- provisioned, so shrinking the stripe count never hides posted funds.
+CREATE TABLE IF NOT EXISTS system_wallet_stripes (
+  root_wallet_id UUID NOT NULL REFERENCES accounts(wallet_id),
+  stripe INT NOT NULL,
+  wallet_id UUID NOT NULL UNIQUE REFERENCES accounts(wallet_id),
+  PRIMARY KEY (root_wallet_id, stripe),
+  CONSTRAINT stripe_non_negative CHECK (stripe >= 0)
+);
+
+-- Provisions stripes 0..p_count-1 for p_root (idempotent) and returns their
+-- wallet ids in stripe order.
+CREATE OR REPLACE FUNCTION ensure_system_wallet_stripes(p_root UUID, p_count INT)
+RETURNS TABLE (stripe INT, wallet_id UUID) AS $$
+#variable_conflict use_column
+DECLARE
+  v_asset TEXT;
+BEGIN
+  SELECT a.asset INTO v_asset FROM accounts a WHERE a.wallet_id = p_root;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'system wallet not found' USING ERRCODE = 'WL404';
+  END IF;
+
+  IF NOT EXISTS (
+    SELECT 1 FROM system_wallet_stripes s
+    WHERE s.root_wallet_id = p_root AND s.stripe = p_count - 1
+  ) THEN
+    WITH wanted AS (
+      SELECT k AS stripe,
+             CASE WHEN k = 0 THEN p_root ELSE md5(p_root::text || ':stripe:' || k)::uuid END AS wallet_id
+      FROM generate_series(0, p_count - 1) AS k
+    ),
+    new_accounts AS (
+      INSERT INTO accounts(wallet_id, asset, version)
+      SELECT w.wallet_id, v_asset, 0 FROM wanted w
+      ON CONFLICT (wallet_id) DO NOTHING
+    ),
+    new_projections AS (
+      INSERT INTO balance_projections(wallet_id, asset, balance, version)
+      SELECT w.wallet_id, v_asset, 0, 0 FROM wanted w
+      ON CONFLICT (wallet_id, asset) DO NOTHING
+    )
+    INSERT INTO system_wallet_stripes(root_wallet_id, stripe, wallet_id)
+    SELECT p_root, w.stripe, w.wallet_id FROM wanted w
+    ON CONFLICT DO NOTHING;
+  END IF;
+
+  RETURN QUERY
+  SELECT s.stripe, s.wallet_id
+  FROM system_wallet_stripes s
+  WHERE s.root_wallet_id = p_root AND s.stripe < p_count
+  ORDER BY s.stripe;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One row per striped system wallet, reported under the root wallet id.
+-- version is the sum of stripe versions, which still increases on every posting.
+CREATE OR REPLACE VIEW system_wallet_balances AS
+SELECT s.root_wallet_id AS wallet_id,
+       b.asset,
+       SUM(b.balance) AS balance,
+       SUM(b.version)::bigint AS version,
+       MAX(b.as_of) AS as_of,
+       COUNT(*) AS stripes
+FROM system_wallet_stripes s
+JOIN balance_projections b ON b.wallet_id = s.wallet_id
+GROUP BY s.root_wallet_id, b.asset;
+
+-- The default root is its own stripe 0, so its aggregate balance is served
+-- before any further stripes are provisioned.
+INSERT INTO system_wallet_stripes(root_wallet_id, stripe, wallet_id)
+SELECT a.wallet_id, 0, a.wallet_id
+FROM accounts a
+WHERE a.wallet_id = '00000000-0000-0000-0000-000000000001'
+ON CONFLICT DO NOTHING;
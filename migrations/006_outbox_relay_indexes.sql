@@ -0,0 +1,9 @@
+-- The relay claims the oldest pending events first and prunes processed rows
+-- by age; index both access paths and retire the processed_at-only index.
+CREATE INDEX IF NOT EXISTS idx_outbox_pending_created_at
+  ON outbox_events(created_at) WHERE processed_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_outbox_processed_at
+  ON outbox_events(processed_at) WHERE processed_at IS NOT NULL;
+
+DROP INDEX IF EXISTS idx_outbox_unprocessed;
@@ -0,0 +1,31 @@
+-- Publish projection version bumps on the wallet_balance channel so every
+-- replica's in-process balance cache can drop superseded entries. NOTIFY is
+-- transactional: listeners only hear about versions that actually committed.
+-- One statement-level trigger covers single postings, fan-outs and batches,
+-- and sends a handful of notifications per statement rather than one per row.
+CREATE OR REPLACE FUNCTION notify_balance_versions()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_chunk TEXT;
+BEGIN
+  -- Payloads are capped at 8000 bytes; 100 "uuid:version" pairs stay well below.
+  FOR v_chunk IN
+    SELECT string_agg(c.wallet_id::text || ':' || c.version, ',')
+    FROM (
+      SELECT wallet_id, version, (row_number() OVER () - 1) / 100 AS page
+      FROM changed
+    ) c
+    GROUP BY c.page
+  LOOP
+    PERFORM pg_notify('wallet_balance', v_chunk);
+  END LOOP;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_balance_projections_notify ON balance_projections;
+CREATE TRIGGER trg_balance_projections_notify
+AFTER UPDATE ON balance_projections
+REFERENCING NEW TABLE AS changed
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_balance_versions();
@@ -0,0 +1,22 @@
+-- Journal position for checkpointed audits: the id of the transaction that
+-- wrote each entry. Once every transaction below a snapshot's xmin has
+-- finished, the entries they wrote can never change, so a sum over them can
+-- be sealed. Added without a default first so existing rows are not rewritten;
+-- pre-existing entries keep NULL and sort before every checkpoint.
+ALTER TABLE journal_entries ADD COLUMN IF NOT EXISTS journal_xid xid8;
+ALTER TABLE journal_entries ALTER COLUMN journal_xid SET DEFAULT pg_current_xact_id();
+
+CREATE INDEX IF NOT EXISTS idx_journal_entries_wallet_position
+  ON journal_entries(wallet_id, asset, journal_xid);
+
+-- balance = SUM(amount) of every entry for the wallet written by a transaction
+-- with journal_xid < journal_xmin (or NULL journal_xid). Audits add the entries
+-- at or after journal_xmin on top.
+CREATE TABLE IF NOT EXISTS balance_checkpoints (
+  wallet_id UUID NOT NULL REFERENCES accounts(wallet_id),
+  asset TEXT NOT NULL,
+  journal_xmin xid8 NOT NULL,
+  balance NUMERIC(20, 6) NOT NULL,
+  sealed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (wallet_id, asset)
+);
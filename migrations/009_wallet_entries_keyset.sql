@@ -0,0 +1,7 @@
+-- Wallet history pages seek on (created_at, entry_id): entries of one posting
+-- share created_at, so entry_id breaks ties. Extending the existing index lets
+-- each page start with an index seek at any depth instead of an OFFSET scan.
+CREATE INDEX IF NOT EXISTS idx_journal_entries_wallet_history
+  ON journal_entries(wallet_id, asset, created_at, entry_id);
+
+DROP INDEX IF EXISTS idx_journal_entries_wallet_asset;
@@ -0,0 +1,350 @@
+-- Range-partition journal_transactions, journal_entries and outbox_events by
+-- created_at, one partition per UTC month.
+--
+-- Existing rows are not copied: each table is renamed to <table>_legacy and
+-- attached as the partition covering everything before the first month
+-- boundary after this migration runs. Secondary indexes with the same
+-- definition are adopted on attach; only the new (id, created_at) keys are
+-- built. Monthly partitions from that boundary on are created by
+-- ensure_journal_partitions(), which the app calls at startup and the
+-- maintenance command (wallet-journal-partitions, or
+-- python -m wallet_service.ledger.partitions) runs on a schedule.
+--
+-- Unique constraints on a partitioned table must include created_at, so
+-- (operation_scope, idempotency_key) moves to the unpartitioned
+-- idempotency_keys table. It also records created_at, so a replay reads
+-- exactly one partition. New transaction ids are UUIDv7 stamped with
+-- created_at (to the millisecond), so a lookup by id is bounded too.
+--
+-- Balance checkpoints move from journal positions (xid8, migration 008) to a
+-- time horizon: sealed_through is a created_at before which every journal
+-- transaction had finished, so audits add only entries at or after it and
+-- touch only the partitions from that month on. journal_xid cannot prune
+-- partitions and is dropped; existing checkpoints are discarded and audits
+-- sum full history until the next sealing pass.
+
+CREATE OR REPLACE FUNCTION uuid_v7_at(p_at TIMESTAMPTZ)
+RETURNS UUID AS $$
+  -- 48-bit Unix milliseconds, version 7, random remainder (RFC 9562).
+  SELECT encode(
+    set_bit(set_bit(
+      overlay(uuid_send(gen_random_uuid())
+              PLACING substring(int8send(floor(extract(epoch FROM p_at) * 1000)::bigint) FROM 3)
+              FROM 1 FOR 6),
+      52, 1), 53, 1),
+    'hex')::uuid;
+$$ LANGUAGE sql VOLATILE;
+
+CREATE TABLE IF NOT EXISTS journal_partitioning (
+  singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+  legacy_until TIMESTAMPTZ NOT NULL
+);
+
+INSERT INTO journal_partitioning(legacy_until)
+VALUES ((date_trunc('month', NOW() AT TIME ZONE 'UTC') + INTERVAL '1 month') AT TIME ZONE 'UTC');
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+  operation_scope TEXT NOT NULL,
+  idempotency_key TEXT NOT NULL,
+  transaction_id UUID NOT NULL,
+  payload_hash TEXT NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (operation_scope, idempotency_key)
+);
+
+INSERT INTO idempotency_keys(operation_scope, idempotency_key, transaction_id, payload_hash, created_at)
+SELECT operation_scope, idempotency_key, transaction_id, payload_hash, created_at
+FROM journal_transactions;
+
+-- Per-wallet sums of entries in partitions that have been detached, so
+-- full-history balances stay correct once old months leave the tables.
+CREATE TABLE IF NOT EXISTS journal_carry_forward (
+  wallet_id UUID NOT NULL REFERENCES accounts(wallet_id),
+  asset TEXT NOT NULL,
+  balance NUMERIC(20, 6) NOT NULL,
+  detached_through TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (wallet_id, asset)
+);
+
+DELETE FROM balance_checkpoints;
+ALTER TABLE balance_checkpoints DROP COLUMN journal_xmin;
+ALTER TABLE balance_checkpoints ADD COLUMN sealed_through TIMESTAMPTZ NOT NULL;
+ALTER TABLE journal_entries DROP COLUMN journal_xid;
+
+-- Move the current tables aside, freeing every name the partitioned tables
+-- reuse. Keys and foreign keys are redefined on the parents below.
+ALTER TABLE outbox_events DROP CONSTRAINT outbox_events_transaction_id_fkey;
+ALTER TABLE outbox_events DROP CONSTRAINT outbox_events_pkey;
+ALTER TABLE outbox_events RENAME TO outbox_events_legacy;
+ALTER INDEX idx_outbox_pending_created_at RENAME TO outbox_events_legacy_pending_created_at_idx;
+ALTER INDEX idx_outbox_processed_at RENAME TO outbox_events_legacy_processed_at_idx;
+
+DROP TRIGGER trg_entry_asset_matches_account ON journal_entries;
+ALTER TABLE journal_entries DROP CONSTRAINT journal_entries_transaction_id_fkey;
+ALTER TABLE journal_entries DROP CONSTRAINT journal_entries_wallet_id_fkey;
+ALTER TABLE journal_entries DROP CONSTRAINT journal_entries_pkey;
+ALTER TABLE journal_entries DROP CONSTRAINT uq_journal_entry_txn_seq;
+ALTER TABLE journal_entries RENAME TO journal_entries_legacy;
+ALTER INDEX idx_journal_entries_wallet_history RENAME TO journal_entries_legacy_wallet_history_idx;
+
+DROP TRIGGER trg_balanced_txn ON journal_transactions;
+ALTER TABLE journal_transactions DROP CONSTRAINT journal_transactions_pkey;
+ALTER TABLE journal_transactions DROP CONSTRAINT uq_idempotency_scope;
+ALTER TABLE journal_transactions RENAME TO journal_transactions_legacy;
+ALTER INDEX idx_journal_txn_created_at RENAME TO journal_transactions_legacy_created_at_idx;
+
+CREATE TABLE journal_transactions (
+  transaction_id UUID NOT NULL,
+  operation_scope TEXT NOT NULL,
+  idempotency_key TEXT NOT NULL,
+  payload_hash TEXT NOT NULL,
+  status TEXT NOT NULL,
+  external_reference TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  CONSTRAINT journal_status_valid CHECK (status IN ('committed')),
+  CONSTRAINT journal_transactions_pkey PRIMARY KEY (transaction_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX idx_journal_txn_created_at ON journal_transactions(created_at);
+
+CREATE TABLE journal_entries (
+  entry_id UUID NOT NULL DEFAULT gen_random_uuid(),
+  transaction_id UUID NOT NULL,
+  seq INT NOT NULL,
+  wallet_id UUID NOT NULL,
+  amount NUMERIC(20, 6) NOT NULL,
+  asset TEXT NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  CONSTRAINT journal_entries_pkey PRIMARY KEY (entry_id, created_at),
+  CONSTRAINT uq_journal_entry_txn_seq UNIQUE (transaction_id, created_at, seq),
+  CONSTRAINT amount_non_zero CHECK (amount <> 0)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX idx_journal_entries_wallet_history
+  ON journal_entries(wallet_id, asset, created_at, entry_id);
+
+CREATE TABLE outbox_events (
+  event_id UUID NOT NULL,
+  transaction_id UUID NOT NULL,
+  event_type TEXT NOT NULL,
+  payload JSONB NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  processed_at TIMESTAMPTZ,
+  CONSTRAINT outbox_events_pkey PRIMARY KEY (event_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX idx_outbox_pending_created_at ON outbox_events(created_at) WHERE processed_at IS NULL;
+CREATE INDEX idx_outbox_processed_at ON outbox_events(processed_at) WHERE processed_at IS NOT NULL;
+
+DO $$
+DECLARE
+  v_until TIMESTAMPTZ := (SELECT legacy_until FROM journal_partitioning);
+BEGIN
+  EXECUTE format(
+    'ALTER TABLE journal_transactions ATTACH PARTITION journal_transactions_legacy '
+    'FOR VALUES FROM (MINVALUE) TO (%L)', v_until);
+  EXECUTE format(
+    'ALTER TABLE journal_entries ATTACH PARTITION journal_entries_legacy '
+    'FOR VALUES FROM (MINVALUE) TO (%L)', v_until);
+  EXECUTE format(
+    'ALTER TABLE outbox_events ATTACH PARTITION outbox_events_legacy '
+    'FOR VALUES FROM (MINVALUE) TO (%L)', v_until);
+END;
+$$;
+
+-- A posting's transaction, entries and outbox event share created_at (one
+-- NOW()), so they always land in the same month and the keys can include it.
+ALTER TABLE journal_entries
+  ADD CONSTRAINT journal_entries_transaction_fkey FOREIGN KEY (transaction_id, created_at)
+  REFERENCES journal_transactions(transaction_id, created_at);
+ALTER TABLE journal_entries
+  ADD CONSTRAINT journal_entries_wallet_id_fkey FOREIGN KEY (wallet_id) REFERENCES accounts(wallet_id);
+ALTER TABLE outbox_events
+  ADD CONSTRAINT outbox_events_transaction_fkey FOREIGN KEY (transaction_id, created_at)
+  REFERENCES journal_transactions(transaction_id, created_at);
+
+CREATE TRIGGER trg_entry_asset_matches_account
+BEFORE INSERT ON journal_entries
+FOR EACH ROW EXECUTE FUNCTION enforce_entry_asset_matches_account();
+
+CREATE OR REPLACE FUNCTION enforce_transaction_balanced()
+RETURNS TRIGGER AS $$
+DECLARE
+  txn_sum NUMERIC(20, 6);
+  entry_count INT;
+BEGIN
+  SELECT COALESCE(SUM(amount), 0), COUNT(*)
+  INTO txn_sum, entry_count
+  FROM journal_entries
+  WHERE transaction_id = NEW.transaction_id AND created_at = NEW.created_at;
+
+  IF entry_count < 2 THEN
+    RAISE EXCEPTION 'transaction % requires at least 2 entries', NEW.transaction_id;
+  END IF;
+
+  IF txn_sum <> 0 THEN
+    RAISE EXCEPTION 'transaction % unbalanced sum=%', NEW.transaction_id, txn_sum;
+  END IF;
+
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE CONSTRAINT TRIGGER trg_balanced_txn
+AFTER INSERT OR UPDATE ON journal_transactions
+DEFERRABLE INITIALLY DEFERRED
+FOR EACH ROW EXECUTE FUNCTION enforce_transaction_balanced();
+
+-- Create the monthly partitions of all three tables from the current month
+-- through p_months_ahead months ahead. Returns the partitions it created.
+CREATE OR REPLACE FUNCTION ensure_journal_partitions(p_months_ahead INT)
+RETURNS SETOF TEXT AS $$
+DECLARE
+  v_from TIMESTAMPTZ := GREATEST(
+    date_trunc('month', NOW()),
+    (SELECT legacy_until FROM journal_partitioning)
+  );
+  v_last TIMESTAMPTZ := date_trunc('month', NOW()) + make_interval(months => p_months_ahead);
+  v_table TEXT;
+  v_name TEXT;
+BEGIN
+  WHILE v_from <= v_last LOOP
+    FOREACH v_table IN ARRAY ARRAY['journal_transactions', 'journal_entries', 'outbox_events'] LOOP
+      v_name := v_table || '_p' || to_char(v_from, 'YYYYMM');
+      IF to_regclass(v_name) IS NULL THEN
+        EXECUTE format(
+          'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+          v_name, v_table, v_from, v_from + INTERVAL '1 month');
+        RETURN NEXT v_name;
+      END IF;
+    END LOOP;
+    v_from := v_from + INTERVAL '1 month';
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql
+-- Month boundaries are UTC whatever the session time zone.
+SET TimeZone = 'UTC';
+
+SELECT ensure_journal_partitions(3);
+
+CREATE OR REPLACE FUNCTION post_journal_transaction(
+  p_operation_scope TEXT,
+  p_idempotency_key TEXT,
+  p_payload_hash TEXT,
+  p_external_reference TEXT,
+  p_event_type TEXT,
+  p_payload JSONB,
+  p_wallet_ids UUID[],
+  p_amounts NUMERIC[],
+  p_assets TEXT[],
+  p_expected_versions BIGINT[]
+)
+RETURNS TABLE (
+  transaction_id UUID,
+  operation_scope TEXT,
+  idempotency_key TEXT,
+  payload_hash TEXT,
+  status TEXT,
+  created_at TIMESTAMPTZ,
+  external_reference TEXT,
+  wallet_id UUID,
+  amount NUMERIC(20, 6),
+  asset TEXT
+) AS $$
+#variable_conflict use_column
+DECLARE
+  v_transaction_id UUID;
+  v_created_at TIMESTAMPTZ;
+  v_existing_hash TEXT;
+  v_wanted INT;
+  v_locked INT;
+  v_bumped INT;
+  v_projected INT;
+BEGIN
+  SELECT k.transaction_id, k.payload_hash, k.created_at
+  INTO v_transaction_id, v_existing_hash, v_created_at
+  FROM idempotency_keys k
+  WHERE k.operation_scope = p_operation_scope AND k.idempotency_key = p_idempotency_key;
+
+  IF FOUND THEN
+    IF v_existing_hash <> p_payload_hash THEN
+      RAISE EXCEPTION 'idempotency key reuse with different payload' USING ERRCODE = 'WL409';
+    END IF;
+  ELSE
+    WITH wanted AS (
+      SELECT leg.wallet_id, MIN(leg.asset) AS asset, SUM(leg.amount) AS delta,
+             MAX(leg.expected_version) AS expected_version
+      FROM unnest(p_wallet_ids, p_amounts, p_assets, p_expected_versions)
+        AS leg(wallet_id, amount, asset, expected_version)
+      GROUP BY leg.wallet_id
+    ),
+    locked AS MATERIALIZED (
+      SELECT a.wallet_id, a.version, w.expected_version
+      FROM accounts a
+      JOIN wanted w ON w.wallet_id = a.wallet_id
+      ORDER BY a.wallet_id
+      FOR UPDATE OF a
+    ),
+    bumped AS (
+      UPDATE accounts a
+      SET version = a.version + 1
+      FROM locked l
+      WHERE a.wallet_id = l.wallet_id
+        AND (l.expected_version IS NULL OR l.version = l.expected_version)
+      RETURNING a.wallet_id, a.version
+    ),
+    projected AS (
+      UPDATE balance_projections b
+      SET balance = b.balance + w.delta, version = bu.version, as_of = NOW()
+      FROM bumped bu
+      JOIN wanted w ON w.wallet_id = bu.wallet_id
+      WHERE b.wallet_id = bu.wallet_id AND b.asset = w.asset
+      RETURNING b.wallet_id
+    )
+    SELECT (SELECT COUNT(*) FROM wanted),
+           (SELECT COUNT(*) FROM locked),
+           (SELECT COUNT(*) FROM bumped),
+           (SELECT COUNT(*) FROM projected)
+    INTO v_wanted, v_locked, v_bumped, v_projected;
+
+    IF v_locked < v_wanted THEN
+      RAISE EXCEPTION 'wallet not found' USING ERRCODE = 'WL404';
+    END IF;
+    IF v_bumped < v_locked THEN
+      RAISE EXCEPTION 'optimistic version conflict' USING ERRCODE = 'WL409';
+    END IF;
+    IF v_projected < v_bumped THEN
+      RAISE EXCEPTION 'projection row not found' USING ERRCODE = 'WL404';
+    END IF;
+
+    v_created_at := NOW();
+    v_transaction_id := uuid_v7_at(v_created_at);
+
+    INSERT INTO idempotency_keys(operation_scope, idempotency_key, transaction_id, payload_hash, created_at)
+    VALUES (p_operation_scope, p_idempotency_key, v_transaction_id, p_payload_hash, v_created_at);
+
+    INSERT INTO journal_transactions(transaction_id, operation_scope, idempotency_key, payload_hash, status, external_reference, created_at)
+    VALUES (v_transaction_id, p_operation_scope, p_idempotency_key, p_payload_hash, 'committed', p_external_reference, v_created_at);
+
+    INSERT INTO journal_entries(transaction_id, seq, wallet_id, amount, asset, created_at)
+    SELECT v_transaction_id, leg.seq, leg.wallet_id, leg.amount, leg.asset, v_created_at
+    FROM unnest(p_wallet_ids, p_amounts, p_assets) WITH ORDINALITY AS leg(wallet_id, amount, asset, seq);
+
+    INSERT INTO outbox_events(event_id, transaction_id, event_type, payload, created_at)
+    VALUES (gen_random_uuid(), v_transaction_id, p_event_type, p_payload, v_created_at);
+  END IF;
+
+  -- created_at pins both reads to the posting's partition.
+  RETURN QUERY
+  SELECT t.transaction_id, t.operation_scope, t.idempotency_key, t.payload_hash, t.status,
+         t.created_at, t.external_reference, e.wallet_id, e.amount, e.asset
+  FROM journal_transactions t
+  JOIN journal_entries e ON e.transaction_id = t.transaction_id AND e.created_at = t.created_at
+  WHERE t.transaction_id = v_transaction_id AND t.created_at = v_created_at
+  ORDER BY e.seq;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'idempotency key refers to a detached transaction' USING ERRCODE = 'WL409';
+  END IF;
+END;
+$$ LANGUAGE plpgsql;
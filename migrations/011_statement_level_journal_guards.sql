@@ -0,0 +1,131 @@
+-- Validate journal entries once per INSERT statement instead of once per row.
+--
+-- trg_entry_asset_matches_account looked up accounts for every inserted entry,
+-- and trg_balanced_txn re-summed each transaction's entries at commit. Both
+-- checks now run over the statement's transition table: one join against
+-- accounts and one GROUP BY per statement, however many postings it carries.
+--
+-- A posting's entries must therefore be inserted by a single statement (as
+-- post_journal_transaction() and the batch path already do): each
+-- transaction's rows in one statement must number at least two and sum to
+-- zero. Since every group of entries is balanced on its own, the deferred
+-- per-transaction check only has to confirm that some entry exists, which is
+-- one index probe rather than a sum.
+--
+-- Statement triggers fire only for the table a statement names, so each
+-- journal_entries partition gets its own copy for inserts that target it
+-- directly; an insert through the parent is checked once, by the parent's.
+
+CREATE OR REPLACE FUNCTION enforce_journal_entries()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_wallet_id UUID;
+  v_entry_asset TEXT;
+  v_account_asset TEXT;
+  v_transaction_id UUID;
+  v_sum NUMERIC(20, 6);
+  v_count BIGINT;
+BEGIN
+  SELECT n.wallet_id, n.asset, a.asset
+  INTO v_wallet_id, v_entry_asset, v_account_asset
+  FROM new_entries n
+  LEFT JOIN accounts a ON a.wallet_id = n.wallet_id
+  WHERE a.asset IS DISTINCT FROM n.asset
+  LIMIT 1;
+
+  IF FOUND THEN
+    IF v_account_asset IS NULL THEN
+      RAISE EXCEPTION 'wallet % not found', v_wallet_id;
+    END IF;
+    RAISE EXCEPTION 'entry asset % mismatches account asset %', v_entry_asset, v_account_asset;
+  END IF;
+
+  SELECT n.transaction_id, SUM(n.amount), COUNT(*)
+  INTO v_transaction_id, v_sum, v_count
+  FROM new_entries n
+  GROUP BY n.transaction_id, n.created_at
+  HAVING COUNT(*) < 2 OR SUM(n.amount) <> 0
+  LIMIT 1;
+
+  IF FOUND THEN
+    IF v_count < 2 THEN
+      RAISE EXCEPTION 'transaction % requires at least 2 entries', v_transaction_id;
+    END IF;
+    RAISE EXCEPTION 'transaction % unbalanced sum=%', v_transaction_id, v_sum;
+  END IF;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Install the statement-level guard on a journal_entries partition.
+CREATE OR REPLACE FUNCTION guard_journal_entries_partition(p_partition REGCLASS)
+RETURNS VOID AS $$
+BEGIN
+  EXECUTE format(
+    'CREATE OR REPLACE TRIGGER trg_journal_entries_guard AFTER INSERT ON %s '
+    'REFERENCING NEW TABLE AS new_entries '
+    'FOR EACH STATEMENT EXECUTE FUNCTION enforce_journal_entries()', p_partition);
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_entry_asset_matches_account ON journal_entries;
+DROP FUNCTION IF EXISTS enforce_entry_asset_matches_account();
+
+CREATE OR REPLACE TRIGGER trg_journal_entries_guard
+AFTER INSERT ON journal_entries
+REFERENCING NEW TABLE AS new_entries
+FOR EACH STATEMENT EXECUTE FUNCTION enforce_journal_entries();
+
+SELECT guard_journal_entries_partition(inhrelid::regclass)
+FROM pg_inherits
+WHERE inhparent = 'journal_entries'::regclass;
+
+CREATE OR REPLACE FUNCTION enforce_transaction_balanced()
+RETURNS TRIGGER AS $$
+BEGIN
+  -- Entries arrive in balanced groups of two or more (enforce_journal_entries),
+  -- so a transaction with any entry is balanced.
+  PERFORM 1
+  FROM journal_entries
+  WHERE transaction_id = NEW.transaction_id AND created_at = NEW.created_at
+  LIMIT 1;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'transaction % requires at least 2 entries', NEW.transaction_id;
+  END IF;
+
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION ensure_journal_partitions(p_months_ahead INT)
+RETURNS SETOF TEXT AS $$
+DECLARE
+  v_from TIMESTAMPTZ := GREATEST(
+    date_trunc('month', NOW()),
+    (SELECT legacy_until FROM journal_partitioning)
+  );
+  v_last TIMESTAMPTZ := date_trunc('month', NOW()) + make_interval(months => p_months_ahead);
+  v_table TEXT;
+  v_name TEXT;
+BEGIN
+  WHILE v_from <= v_last LOOP
+    FOREACH v_table IN ARRAY ARRAY['journal_transactions', 'journal_entries', 'outbox_events'] LOOP
+      v_name := v_table || '_p' || to_char(v_from, 'YYYYMM');
+      IF to_regclass(v_name) IS NULL THEN
+        EXECUTE format(
+          'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+          v_name, v_table, v_from, v_from + INTERVAL '1 month');
+        IF v_table = 'journal_entries' THEN
+          PERFORM guard_journal_entries_partition(v_name::regclass);
+        END IF;
+        RETURN NEXT v_name;
+      END IF;
+    END LOOP;
+    v_from := v_from + INTERVAL '1 month';
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql
+-- Month boundaries are UTC whatever the session time zone.
+SET TimeZone = 'UTC';
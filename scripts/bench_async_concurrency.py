@@ -0,0 +1,125 @@
+"""Compare request concurrency of the sync (threadpool) and async ledger paths.
+
+The sync path is driven exactly the way Starlette runs a `def` endpoint: through
+anyio's default thread limiter, which caps in-flight calls at 40. The async path
+awaits the ledger directly, so it is bounded only by the connection pool.
+
+    uv run python scripts/bench_async_concurrency.py --pool-size 80 --rtt-ms 2
+
+--rtt-ms adds a simulated network wait per request (blocking in the sync path,
+awaited in the async path) to model a database that is not on localhost.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from uuid import uuid4
+
+import anyio
+import anyio.to_thread
+
+from wallet_service.config import settings
+from wallet_service.db import database
+from wallet_service.db.migrations import apply_migrations
+from wallet_service.ledger import async_service, service
+
+STARLETTE_THREADPOOL_TOKENS = 40
+
+
+def _summary(latencies: list[float], elapsed: float) -> tuple[float, float]:
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    return len(latencies) / elapsed, p95 * 1000
+
+
+async def _run_sync(wallets: list, requests: int, concurrency: int, rtt: float):
+    limiter = anyio.CapacityLimiter(STARLETTE_THREADPOOL_TOKENS)
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    def handler(wallet_id):
+        if rtt:
+            time.sleep(rtt)
+        return service.get_balance(wallet_id)
+
+    async def one(i: int) -> None:
+        async with gate:
+            started = time.perf_counter()
+            await anyio.to_thread.run_sync(handler, wallets[i % len(wallets)], limiter=limiter)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return _summary(latencies, time.perf_counter() - started)
+
+
+async def _run_async(wallets: list, requests: int, concurrency: int, rtt: float):
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(i: int) -> None:
+        async with gate:
+            started = time.perf_counter()
+            if rtt:
+                await asyncio.sleep(rtt)
+            await async_service.get_balance(wallets[i % len(wallets)])
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return _summary(latencies, time.perf_counter() - started)
+
+
+async def _bench(args: argparse.Namespace) -> None:
+    wallets = [uuid4() for _ in range(args.wallets)]
+    for wallet_id in wallets:
+        service.create_wallet(wallet_id, "USD")
+    database.close_pool()
+
+    rtt = args.rtt_ms / 1000
+
+    # One pool at a time so both fit under the server's max_connections. Each
+    # pool is warmed first so connection setup is not measured.
+    await _run_sync(wallets, args.pool_size, args.pool_size, 0)
+    sync_results = [await _run_sync(wallets, args.requests, c, rtt) for c in args.concurrency]
+    database.close_pool()
+
+    await _run_async(wallets, args.pool_size, args.pool_size, 0)
+    async_results = [await _run_async(wallets, args.requests, c, rtt) for c in args.concurrency]
+    await database.close_async_pool()
+
+    print(
+        f"{'concurrency':>11} | {'sync rps':>9} {'sync p95':>9} | {'async rps':>9} {'async p95':>9}"
+    )
+    for concurrency, (sync_rps, sync_p95), (async_rps, async_p95) in zip(
+        args.concurrency, sync_results, async_results
+    ):
+        print(
+            f"{concurrency:>11} | {sync_rps:>9.0f} {sync_p95:>7.1f}ms | "
+            f"{async_rps:>9.0f} {async_p95:>7.1f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", settings.database_url))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 40, 80, 160, 320])
+    parser.add_argument("--requests", type=int, default=4000, help="Requests per concurrency level")
+    parser.add_argument("--wallets", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=80, help="Max connections per pool")
+    parser.add_argument(
+        "--rtt-ms", type=float, default=0.0, help="Simulated network wait per request"
+    )
+    args = parser.parse_args()
+
+    settings.database_url = args.database_url
+    settings.otel_enabled = False
+    settings.db_pool_min_size = 1
+    settings.db_pool_max_size = args.pool_size
+    apply_migrations()
+    asyncio.run(_bench(args))
+
+
+if __name__ == "__main__":
+    main()
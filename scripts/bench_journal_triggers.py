@@ -0,0 +1,186 @@
+"""Measure per-posting overhead of the journal guard triggers.
+
+Three modes are posted in turn, in interleaved rounds:
+
+- none: the guard triggers are disabled, as the baseline.
+- row: the per-row guards of migrations 002/010 (an accounts lookup per entry
+  and a deferred re-sum per transaction), installed for the run.
+- statement: the statement-level guards of migration 011, as deployed.
+
+Each mode posts --postings single transfers and the same number of transfers
+in post_transfer_batch() calls of --batch; the overhead per posting is the
+mode's median time minus the baseline's.
+
+    uv run python scripts/bench_journal_triggers.py --postings 2000 --batch 100
+
+Switching modes disables and creates triggers on the journal tables, so run it
+against a scratch database, not one serving traffic. The deployed triggers are
+restored on exit.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from decimal import Decimal
+from uuid import uuid4
+
+import psycopg
+
+from wallet_service.config import settings
+from wallet_service.db import database
+from wallet_service.db.migrations import apply_migrations
+from wallet_service.ledger import service
+
+MODES = ("none", "row", "statement")
+
+DISABLE_GUARDS_SQL = """
+    ALTER TABLE journal_entries DISABLE TRIGGER trg_journal_entries_guard;
+    ALTER TABLE journal_transactions DISABLE TRIGGER trg_balanced_txn;
+"""
+
+ENABLE_GUARDS_SQL = """
+    ALTER TABLE journal_entries ENABLE TRIGGER trg_journal_entries_guard;
+    ALTER TABLE journal_transactions ENABLE TRIGGER trg_balanced_txn;
+"""
+
+# Migration 010's per-row guards, under names of their own.
+ROW_GUARDS_SQL = """
+    CREATE FUNCTION bench_row_entry_asset() RETURNS TRIGGER AS $$
+    DECLARE
+      account_asset TEXT;
+    BEGIN
+      SELECT asset INTO account_asset FROM accounts WHERE wallet_id = NEW.wallet_id;
+      IF account_asset IS NULL THEN
+        RAISE EXCEPTION 'wallet % not found', NEW.wallet_id;
+      END IF;
+      IF account_asset <> NEW.asset THEN
+        RAISE EXCEPTION 'entry asset % mismatches account asset %', NEW.asset, account_asset;
+      END IF;
+      RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE FUNCTION bench_row_balanced() RETURNS TRIGGER AS $$
+    DECLARE
+      txn_sum NUMERIC(20, 6);
+      entry_count INT;
+    BEGIN
+      SELECT COALESCE(SUM(amount), 0), COUNT(*)
+      INTO txn_sum, entry_count
+      FROM journal_entries
+      WHERE transaction_id = NEW.transaction_id AND created_at = NEW.created_at;
+      IF entry_count < 2 THEN
+        RAISE EXCEPTION 'transaction % requires at least 2 entries', NEW.transaction_id;
+      END IF;
+      IF txn_sum <> 0 THEN
+        RAISE EXCEPTION 'transaction % unbalanced sum=%', NEW.transaction_id, txn_sum;
+      END IF;
+      RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER bench_row_entry_asset
+    BEFORE INSERT ON journal_entries
+    FOR EACH ROW EXECUTE FUNCTION bench_row_entry_asset();
+
+    CREATE CONSTRAINT TRIGGER bench_row_balanced
+    AFTER INSERT OR UPDATE ON journal_transactions
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bench_row_balanced();
+"""
+
+DROP_ROW_GUARDS_SQL = """
+    DROP TRIGGER IF EXISTS bench_row_entry_asset ON journal_entries;
+    DROP TRIGGER IF EXISTS bench_row_balanced ON journal_transactions;
+    DROP FUNCTION IF EXISTS bench_row_entry_asset();
+    DROP FUNCTION IF EXISTS bench_row_balanced();
+"""
+
+
+def _install(conn: psycopg.Connection, mode: str) -> None:
+    with conn.transaction():
+        conn.execute(DROP_ROW_GUARDS_SQL)
+        conn.execute(ENABLE_GUARDS_SQL)
+        if mode != "statement":
+            conn.execute(DISABLE_GUARDS_SQL)
+        if mode == "row":
+            conn.execute(ROW_GUARDS_SQL)
+
+
+def _transfer(payer, payee) -> dict:
+    return {
+        "idempotency_key": f"bench-trigger-{uuid4()}",
+        "from_wallet_id": payer,
+        "to_wallet_id": payee,
+        "amount": Decimal("0.01"),
+        "asset": "USD",
+        "external_reference": None,
+        "expected_from_version": None,
+        "expected_to_version": None,
+    }
+
+
+def _single(wallets: list, postings: int) -> float:
+    started = time.perf_counter()
+    for i in range(postings):
+        payer, payee = wallets[i % len(wallets)], wallets[(i + 1) % len(wallets)]
+        service.post_transfer(**_transfer(payer, payee))
+    return (time.perf_counter() - started) / postings
+
+
+def _batched(wallets: list, postings: int, batch: int) -> float:
+    started = time.perf_counter()
+    for start in range(0, postings, batch):
+        items = [
+            _transfer(wallets[i % len(wallets)], wallets[(i + 1) % len(wallets)])
+            for i in range(start, min(start + batch, postings))
+        ]
+        service.post_transfer_batch(items, atomic=True)
+    return (time.perf_counter() - started) / postings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", settings.database_url))
+    parser.add_argument("--postings", type=int, default=2000, help="Postings per mode and round")
+    parser.add_argument("--batch", type=int, default=100, help="Transfers per batch call")
+    parser.add_argument("--wallets", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    settings.database_url = args.database_url
+    settings.otel_enabled = False
+    apply_migrations()
+    wallets = [uuid4() for _ in range(args.wallets)]
+    for wallet_id in wallets:
+        service.create_wallet(wallet_id, "USD")
+    # Warm the pool and prepared statements before anything is timed.
+    _batched(wallets, args.batch, args.batch)
+
+    single: dict[str, list[float]] = {mode: [] for mode in MODES}
+    batched: dict[str, list[float]] = {mode: [] for mode in MODES}
+    with psycopg.connect(args.database_url, autocommit=True) as admin:
+        try:
+            for _ in range(args.rounds):
+                for mode in MODES:
+                    _install(admin, mode)
+                    single[mode].append(_single(wallets, args.postings))
+                    batched[mode].append(_batched(wallets, args.postings, args.batch))
+        finally:
+            _install(admin, "statement")
+            database.close_pool()
+
+    base_single = statistics.median(single["none"])
+    base_batched = statistics.median(batched["none"])
+    print(f"{'mode':>9} | {'single us':>9} {'overhead':>8} | {'batch us':>9} {'overhead':>8}")
+    for mode in MODES:
+        single_us, batched_us = statistics.median(single[mode]), statistics.median(batched[mode])
+        print(
+            f"{mode:>9} | {single_us * 1e6:>9.0f} {(single_us - base_single) * 1e6:>8.0f} | "
+            f"{batched_us * 1e6:>9.0f} {(batched_us - base_batched) * 1e6:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Serialization cost per ledger response: response models vs. the direct path.
+
+model: what routes did before wallet_service.api.responses. They built a
+TransactionResponse from the transaction's fields (entries as dicts), and
+FastAPI validated it against the response_model and dumped it to JSON.
+direct: transaction_response() / batch_transfer_response(), which dump the
+slotted ledger dataclasses with no validation. Both produce the same bytes,
+which is checked before timing.
+
+    uv run python scripts/bench_response_serialization.py --legs 2 10 100 --batch 100
+"""
+
+import argparse
+import timeit
+from datetime import UTC, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from pydantic import TypeAdapter
+
+from wallet_service.api.responses import batch_transfer_response, transaction_response
+from wallet_service.api.schemas import (
+    BatchTransferResponse,
+    BatchTransferResult,
+    TransactionResponse,
+)
+from wallet_service.ledger.journal import BatchItemResult, JournalEntry, LedgerTransaction
+
+_transaction_model = TypeAdapter(TransactionResponse)
+_batch_model = TypeAdapter(BatchTransferResponse)
+
+
+def _transaction(legs: int) -> LedgerTransaction:
+    amount = Decimal("1.250000")
+    return LedgerTransaction(
+        transaction_id=uuid4(),
+        operation_scope="fanout",
+        idempotency_key=f"bench-{uuid4()}",
+        payload_hash="ab" * 32,
+        status="committed",
+        created_at=datetime.now(UTC),
+        external_reference="order-1234",
+        entries=[JournalEntry(uuid4(), amount * (legs - 1), "USD")]
+        + [JournalEntry(uuid4(), -amount, "USD") for _ in range(legs - 1)],
+    )
+
+
+def _model(tx: LedgerTransaction) -> TransactionResponse:
+    return TransactionResponse(
+        transaction_id=tx.transaction_id,
+        operation_scope=tx.operation_scope,
+        idempotency_key=tx.idempotency_key,
+        payload_hash=tx.payload_hash,
+        status=tx.status,
+        created_at=tx.created_at,
+        external_reference=tx.external_reference,
+        entries=[
+            {"account_id": e.account_id, "amount": e.amount, "asset": e.asset} for e in tx.entries
+        ],
+    )
+
+
+def _model_transaction_json(tx: LedgerTransaction) -> bytes:
+    return _transaction_model.dump_json(_transaction_model.validate_python(_model(tx)))
+
+
+def _model_batch_json(mode: str, results: list[BatchItemResult]) -> bytes:
+    response = BatchTransferResponse(
+        mode=mode,
+        committed=len(results),
+        failed=0,
+        results=[
+            BatchTransferResult(
+                idempotency_key=result.idempotency_key,
+                status=result.status,
+                transaction=_model(result.transaction),
+            )
+            for result in results
+        ],
+    )
+    return _batch_model.dump_json(_batch_model.validate_python(response))
+
+
+def _per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--legs", type=int, nargs="+", default=[2, 10, 100])
+    parser.add_argument("--batch", type=int, default=100, help="Transfers per batch response")
+    parser.add_argument("--number", type=int, default=2000, help="Calls per timing")
+    args = parser.parse_args()
+
+    cases = []
+    for legs in args.legs:
+        tx = _transaction(legs)
+        cases.append(
+            (
+                f"transaction, {legs} legs",
+                lambda tx=tx: _model_transaction_json(tx),
+                lambda tx=tx: transaction_response(tx).body,
+                args.number,
+            )
+        )
+    results = [
+        BatchItemResult(tx.idempotency_key, "committed", tx)
+        for tx in (_transaction(2) for _ in range(args.batch))
+    ]
+    cases.append(
+        (
+            f"batch, {args.batch} transfers",
+            lambda: _model_batch_json("atomic", results),
+            lambda: batch_transfer_response("atomic", results).body,
+            max(args.number // args.batch, 20),
+        )
+    )
+
+    print(f"{'response':>26} | {'model us':>9} {'direct us':>9} {'speedup':>7}")
+    for name, model, direct, number in cases:
+        assert model() == direct(), name
+        model_us, direct_us = _per_call_us(model, number), _per_call_us(direct, number)
+        print(f"{name:>26} | {model_us:>9.1f} {direct_us:>9.1f} {model_us / direct_us:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,9 @@ import hashlib
 import hmac
 import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from uuid import UUID
 
 import requests
@@ -101,6 +103,10 @@ def main() -> None:
     parser.add_argument("--base-url", default=os.getenv("BASE_URL", "http://localhost:8080"))
     parser.add_argument("--count", type=int, default=2500)
     parser.add_argument("--start", type=int, default=1)
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="Wallets per bulk request (at most 1000)"
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Bulk requests in flight")
     parser.add_argument("--jwt-secret", default="dev-secret-change-me")
     parser.add_argument("--jwt-audience", default="agentic-commerce")
     parser.add_argument("--timeout-seconds", type=float, default=5.0, help="HTTP request timeout")
@@ -114,6 +120,10 @@ def main() -> None:
         help="Wait up to N seconds for /v1/ready before seeding",
     )
     args = parser.parse_args()
+    if not 1 <= args.batch_size <= 1000:
+        parser.error("--batch-size must be between 1 and 1000")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
 
     token = make_jwt(args.jwt_secret, args.jwt_audience, "wallet:read wallet:write wallet:admin")
     headers = {"Authorization": f"Bearer {token}"}
@@ -132,38 +142,50 @@ def main() -> None:
             max_backoff_seconds=args.max_backoff_seconds,
         )
 
-    created = 0
-    already_exists = 0
-    failed = 0
-
+    # One bulk request per batch: the service inserts a batch in a single
+    # statement and reports which wallets already existed, so re-running
+    # seeding against an existing dataset is safe.
+    wallet_ids = []
     for i in range(args.start, args.start + args.count):
         wallet_id = f"00000000-0000-0000-0000-{str(i).zfill(12)}"
         UUID(wallet_id)
+        wallet_ids.append(wallet_id)
+    batches = [
+        wallet_ids[i : i + args.batch_size] for i in range(0, len(wallet_ids), args.batch_size)
+    ]
+    sessions = threading.local()
+
+    def seed_batch(batch: list[str]) -> tuple[int, int, int]:
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
         res = _request_with_retries(
-            session,
+            sessions.session,
             "POST",
-            f"{base_url}/v1/wallets",
+            f"{base_url}/v1/wallets:bulk",
             headers=headers,
-            json_body={"wallet_id": wallet_id, "asset": "USD"},
+            json_body={"wallets": [{"wallet_id": w, "asset": "USD"} for w in batch]},
             timeout_seconds=args.timeout_seconds,
             retries=args.retries,
             backoff_seconds=args.backoff_seconds,
             max_backoff_seconds=args.max_backoff_seconds,
         )
-
         if res.status_code == 200:
-            created += 1
-            continue
-        if res.status_code == 409:
-            # Safe to re-run seeding against an existing dataset.
-            already_exists += 1
-            continue
-
-        failed += 1
-        # Keep the loop going to surface the full scope (and any transient issues),
-        # but print a hint for the first few failures.
-        if failed <= 5:
-            print(f"seed failed wallet_id={wallet_id} status={res.status_code} body={res.text[:200]!r}")
+            body = res.json()
+            return len(body["created"]), len(body["existing"]), 0
+        print(
+            f"seed failed batch=[{batch[0]}, {batch[-1]}] "
+            f"status={res.status_code} body={res.text[:200]!r}"
+        )
+        return 0, 0, len(batch)
+
+    created = 0
+    already_exists = 0
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for batch_created, batch_existing, batch_failed in pool.map(seed_batch, batches):
+            created += batch_created
+            already_exists += batch_existing
+            failed += batch_failed
 
     print(
         f"seeded wallet range [{args.start}, {args.start + args.count - 1}] "
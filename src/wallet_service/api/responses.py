@@ -0,0 +1,90 @@
+"""Pre-validated JSON responses for ledger results.
+
+A LedgerTransaction is built from typed database rows, so validating it into a
+TransactionResponse (and FastAPI validating that again against the
+response_model) only costs CPU. These responses serialize the slotted ledger
+dataclasses straight to JSON bytes with pydantic-core, the encoder FastAPI
+uses for response models. Field names and order match the schemas, so the
+bytes are the same; the response_model stays on each route for OpenAPI.
+"""
+
+from dataclasses import dataclass
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from wallet_service.domain.errors import (
+    ConflictError,
+    ForbiddenError,
+    NotFoundError,
+    ServiceUnavailableError,
+    UnauthorizedError,
+    ValidationError,
+)
+from wallet_service.ledger.journal import BatchItemResult, LedgerTransaction
+
+# Mirrors the app-level exception handlers for errors reported per batch item.
+_BATCH_ERROR_STATUS = {
+    NotFoundError: 404,
+    ConflictError: 409,
+    ValidationError: 422,
+    UnauthorizedError: 401,
+    ForbiddenError: 403,
+    ServiceUnavailableError: 503,
+}
+
+
+@dataclass(slots=True)
+class _BatchTransferResult:
+    idempotency_key: str
+    status: str
+    transaction: LedgerTransaction | None
+    error_status: int | None
+    error: str | None
+
+
+@dataclass(slots=True)
+class _BatchTransferResponse:
+    mode: str
+    committed: int
+    failed: int
+    results: list[_BatchTransferResult]
+
+
+def _error_status(error: Exception) -> int:
+    # Like exception handlers, the closest mapped base class wins; anything
+    # unmapped is reported as the 500 it would otherwise have become.
+    for cls in type(error).__mro__:
+        status = _BATCH_ERROR_STATUS.get(cls)
+        if status is not None:
+            return status
+    return 500
+
+
+_transaction_json = TypeAdapter(LedgerTransaction)
+_batch_json = TypeAdapter(_BatchTransferResponse)
+
+
+def transaction_response(tx: LedgerTransaction) -> Response:
+    """Same body as TransactionResponse for tx."""
+    return Response(content=_transaction_json.dump_json(tx), media_type="application/json")
+
+
+def batch_transfer_response(mode: str, results: list[BatchItemResult]) -> Response:
+    """Same body as BatchTransferResponse for results."""
+    body = _BatchTransferResponse(
+        mode=mode,
+        committed=sum(result.status == "committed" for result in results),
+        failed=sum(result.status == "failed" for result in results),
+        results=[
+            _BatchTransferResult(
+                idempotency_key=result.idempotency_key,
+                status=result.status,
+                transaction=result.transaction,
+                error_status=None if result.error is None else _error_status(result.error),
+                error=None if result.error is None else str(result.error),
+            )
+            for result in results
+        ],
+    )
+    return Response(content=_batch_json.dump_json(body), media_type="application/json")
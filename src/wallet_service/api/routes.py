@@ -1,50 +1,80 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 
 from wallet_service.api.deps import get_auth_context, require_idempotency_key
+from wallet_service.api.responses import batch_transfer_response, transaction_response
 from wallet_service.api.schemas import (
     AdjustmentRequest,
     BalanceResponse,
+    BatchTransferRequest,
+    BatchTransferResponse,
+    BulkCreateWalletsRequest,
+    BulkCreateWalletsResponse,
     CreateWalletRequest,
+    FanoutRequest,
     TransactionResponse,
     TransferRequest,
+    WalletEntriesPage,
+    WalletEntry,
     WalletResponse,
 )
 from wallet_service.auth.jwt import AuthContext, require_scope
-from wallet_service.ledger import service
+from wallet_service.ledger import async_service
 
 router = APIRouter(prefix="/v1", tags=["wallet"])
 
+NDJSON = "application/x-ndjson"
+
 
 @router.post("/wallets", response_model=WalletResponse)
-def create_wallet_endpoint(
+async def create_wallet_endpoint(
     request: CreateWalletRequest,
     auth: AuthContext = Depends(get_auth_context),
 ):
     require_scope(auth, "wallet:write")
-    result = service.create_wallet(request.wallet_id, request.asset)
+    result = await async_service.create_wallet(request.wallet_id, request.asset)
     return WalletResponse(**result)
 
 
-@router.get("/wallets/{wallet_id}/balance", response_model=BalanceResponse)
-def get_balance_endpoint(
+@router.post("/wallets:bulk", response_model=BulkCreateWalletsResponse)
+async def bulk_create_wallets_endpoint(
+    request: BulkCreateWalletsRequest,
+    auth: AuthContext = Depends(get_auth_context),
+):
+    require_scope(auth, "wallet:write")
+    result = await async_service.create_wallets([(w.wallet_id, w.asset) for w in request.wallets])
+    return BulkCreateWalletsResponse(**result)
+
+
+@router.get(
+    "/wallets/{wallet_id}/balance", response_model=BalanceResponse, response_model_exclude_none=True
+)
+async def get_balance_endpoint(
     wallet_id: UUID,
     auth: AuthContext = Depends(get_auth_context),
 ):
     require_scope(auth, "wallet:read")
-    result = service.get_balance(wallet_id)
+    result = await async_service.get_balance(wallet_id)
     return BalanceResponse(**result)
 
 
-@router.get("/wallets/{wallet_id}/balance/audit", response_model=BalanceResponse)
-def audit_balance_endpoint(
+@router.get(
+    "/wallets/{wallet_id}/balance/audit",
+    response_model=BalanceResponse,
+    response_model_exclude_none=True,
+)
+async def audit_balance_endpoint(
     wallet_id: UUID,
+    full: bool = False,
     auth: AuthContext = Depends(get_auth_context),
 ):
     require_scope(auth, "wallet:read")
-    projected = service.get_balance(wallet_id)
-    audit = service.audit_balance(wallet_id)
+    projected = await async_service.get_balance(wallet_id)
+    audit = await async_service.audit_balance(wallet_id, full=full)
     return BalanceResponse(
         wallet_id=audit["wallet_id"],
         asset=audit["asset"],
@@ -54,14 +84,48 @@ def audit_balance_endpoint(
     )
 
 
+async def _stream_entries(page: dict, **filters) -> AsyncIterator[str]:
+    # Every page is its own short read transaction, so an export of any size
+    # never pins a pooled connection while the client drains the stream.
+    while True:
+        for entry in page["entries"]:
+            yield WalletEntry(**entry).model_dump_json() + "\n"
+        if page["next_cursor"] is None:
+            return
+        page = await async_service.list_entries(
+            page["wallet_id"], cursor=page["next_cursor"], **filters
+        )
+
+
+@router.get("/wallets/{wallet_id}/entries", response_model=WalletEntriesPage)
+async def list_entries_endpoint(
+    wallet_id: UUID,
+    request: Request,
+    cursor: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    """Journal entries newest first; `Accept: application/x-ndjson` streams every page."""
+    require_scope(auth, "wallet:read")
+    filters = {"since": since, "until": until, "limit": limit}
+    # The first page is read up front so a missing wallet or bad cursor is
+    # still a proper error status rather than a broken stream.
+    page = await async_service.list_entries(wallet_id, cursor=cursor, **filters)
+    if NDJSON in request.headers.get("accept", ""):
+        return StreamingResponse(_stream_entries(page, **filters), media_type=NDJSON)
+    return WalletEntriesPage(**page)
+
+
 @router.post("/transfers", response_model=TransactionResponse)
-def transfer_endpoint(
+async def transfer_endpoint(
     request: TransferRequest,
     idempotency_key: str = Depends(require_idempotency_key),
     auth: AuthContext = Depends(get_auth_context),
 ):
     require_scope(auth, "wallet:write")
-    tx = service.post_transfer(
+    tx = await async_service.post_transfer(
         idempotency_key=idempotency_key,
         from_wallet_id=request.from_wallet_id,
         to_wallet_id=request.to_wallet_id,
@@ -71,17 +135,48 @@ def transfer_endpoint(
         expected_from_version=request.expected_from_version,
         expected_to_version=request.expected_to_version,
     )
-    return TransactionResponse(**tx.__dict__)
+    return transaction_response(tx)
+
+
+@router.post("/transfers:fanout", response_model=TransactionResponse)
+async def fanout_endpoint(
+    request: FanoutRequest,
+    idempotency_key: str = Depends(require_idempotency_key),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    require_scope(auth, "wallet:write")
+    tx = await async_service.post_fanout(
+        idempotency_key=idempotency_key,
+        from_wallet_id=request.from_wallet_id,
+        credits=[(c.to_wallet_id, c.amount, c.expected_to_version) for c in request.credits],
+        asset=request.asset,
+        external_reference=request.external_reference,
+        expected_from_version=request.expected_from_version,
+    )
+    return transaction_response(tx)
+
+
+@router.post("/transfers:batch", response_model=BatchTransferResponse)
+async def transfer_batch_endpoint(
+    request: BatchTransferRequest,
+    auth: AuthContext = Depends(get_auth_context),
+):
+    require_scope(auth, "wallet:write")
+    results = await async_service.post_transfer_batch(
+        [item.model_dump() for item in request.transfers],
+        atomic=request.mode == "atomic",
+    )
+    return batch_transfer_response(request.mode, results)
 
 
 @router.post("/adjustments", response_model=TransactionResponse)
-def adjustment_endpoint(
+async def adjustment_endpoint(
     request: AdjustmentRequest,
     idempotency_key: str = Depends(require_idempotency_key),
     auth: AuthContext = Depends(get_auth_context),
 ):
     require_scope(auth, "wallet:admin")
-    tx = service.post_adjustment(
+    tx = await async_service.post_adjustment(
         idempotency_key=idempotency_key,
         wallet_id=request.wallet_id,
         amount=request.amount,
@@ -90,14 +185,14 @@ def adjustment_endpoint(
         reason=request.reason,
         expected_wallet_version=request.expected_wallet_version,
     )
-    return TransactionResponse(**tx.__dict__)
+    return transaction_response(tx)
 
 
 @router.get("/transactions/{transaction_id}", response_model=TransactionResponse)
-def get_transaction_endpoint(
+async def get_transaction_endpoint(
     transaction_id: UUID,
     auth: AuthContext = Depends(get_auth_context),
 ):
     require_scope(auth, "wallet:read")
-    tx = service.get_transaction(transaction_id)
-    return TransactionResponse(**tx.__dict__)
+    tx = await async_service.get_transaction(transaction_id)
+    return transaction_response(tx)
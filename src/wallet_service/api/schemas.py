@@ -18,12 +18,24 @@ class WalletResponse(BaseModel):
     created_at: datetime
 
 
+class BulkCreateWalletsRequest(BaseModel):
+    wallets: list[CreateWalletRequest] = Field(min_length=1, max_length=1000)
+
+
+class BulkCreateWalletsResponse(BaseModel):
+    # Each in request order; existing wallets are left unchanged.
+    created: list[UUID]
+    existing: list[UUID]
+
+
 class BalanceResponse(BaseModel):
     wallet_id: UUID
     asset: str
     balance: Decimal
     version: int
     as_of: datetime
+    # Set only when a cached value is served during a database outage.
+    stale_seconds: float | None = None
 
 
 class TransferRequest(BaseModel):
@@ -36,6 +48,30 @@ class TransferRequest(BaseModel):
     expected_to_version: int | None = None
 
 
+class BatchTransferItem(TransferRequest):
+    idempotency_key: str = Field(min_length=1)
+
+
+class BatchTransferRequest(BaseModel):
+    # atomic: any failed item rolls back the batch; best_effort: commit every valid item.
+    mode: Literal["atomic", "best_effort"] = "atomic"
+    transfers: list[BatchTransferItem] = Field(min_length=1, max_length=500)
+
+
+class FanoutCredit(BaseModel):
+    to_wallet_id: UUID
+    amount: Decimal = Field(gt=0)
+    expected_to_version: int | None = None
+
+
+class FanoutRequest(BaseModel):
+    from_wallet_id: UUID
+    credits: list[FanoutCredit] = Field(min_length=1, max_length=500)
+    asset: str = Field(default="USD", min_length=3, max_length=12)
+    external_reference: str | None = None
+    expected_from_version: int | None = None
+
+
 class AdjustmentRequest(BaseModel):
     wallet_id: UUID
     amount: Decimal = Field(gt=0)
@@ -51,6 +87,21 @@ class JournalEntryDTO(BaseModel):
     asset: str
 
 
+class WalletEntry(BaseModel):
+    entry_id: UUID
+    transaction_id: UUID
+    seq: int
+    amount: Decimal
+    created_at: datetime
+
+
+class WalletEntriesPage(BaseModel):
+    wallet_id: UUID
+    asset: str
+    entries: list[WalletEntry]
+    next_cursor: str | None = None
+
+
 class TransactionResponse(BaseModel):
     transaction_id: UUID
     operation_scope: str
@@ -60,3 +111,19 @@ class TransactionResponse(BaseModel):
     created_at: datetime
     external_reference: str | None = None
     entries: list[JournalEntryDTO]
+
+
+class BatchTransferResult(BaseModel):
+    idempotency_key: str
+    status: Literal["committed", "replayed", "failed", "aborted"]
+    transaction: TransactionResponse | None = None
+    # HTTP status and message the single-transfer endpoint would have returned.
+    error_status: int | None = None
+    error: str | None = None
+
+
+class BatchTransferResponse(BaseModel):
+    mode: Literal["atomic", "best_effort"]
+    committed: int
+    failed: int
+    results: list[BatchTransferResult]
@@ -0,0 +1,108 @@
+"""Signing keys for asymmetric (RS*/ES*/PS*/EdDSA) bearer tokens.
+
+The key set is fetched from settings.jwt_jwks_url at startup and then every
+jwt_jwks_refresh_seconds by a background thread, and each JWK is parsed into a
+key object once per fetch. Verifying a token only looks its kid up, and the
+request path never waits on the network. A failed refresh keeps the previous
+keys; issuers publish a new key before signing with it, so a rotation is
+picked up by the next refresh.
+"""
+
+import logging
+import threading
+
+import jwt
+
+from wallet_service.config import settings
+from wallet_service.observability.metrics import meter
+
+logger = logging.getLogger(__name__)
+
+_refreshes = meter.create_counter(
+    "wallet.auth.jwks.refreshes",
+    description="JWKS fetches, by outcome",
+)
+
+
+class JwksKeys:
+    def __init__(self) -> None:
+        self._keys: dict[str | None, jwt.PyJWK] = {}
+
+    def key_for(self, kid: str | None) -> jwt.PyJWK:
+        """The parsed key for a token's kid; a key set of one also serves tokens without one."""
+        keys = self._keys
+        key = keys.get(kid)
+        if key is None and kid is None and len(keys) == 1:
+            key = next(iter(keys.values()))
+        if key is None:
+            raise jwt.InvalidKeyError(f"no signing key for kid {kid!r}")
+        return key
+
+    def refresh(self) -> int:
+        """Fetch and parse the key set, replacing the current keys. Returns their count."""
+        client = jwt.PyJWKClient(
+            settings.jwt_jwks_url,
+            cache_jwk_set=False,
+            cache_keys=False,
+            timeout=settings.jwt_jwks_timeout_seconds,
+        )
+        jwk_set = client.get_jwk_set()
+        # Swapped whole, so readers never see a half-built mapping.
+        self._keys = {key.key_id: key for key in jwk_set.keys}
+        return len(self._keys)
+
+    def clear(self) -> None:
+        self._keys = {}
+
+
+jwks_keys = JwksKeys()
+
+
+class JwksRefresher:
+    """Background thread re-fetching the key set on a fixed interval."""
+
+    def __init__(self, keys: JwksKeys) -> None:
+        self._keys = keys
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="jwks-refresher", daemon=True)
+
+    def start(self) -> None:
+        self.refresh()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=settings.jwt_jwks_timeout_seconds + 1)
+
+    def refresh(self) -> None:
+        try:
+            count = self._keys.refresh()
+        except (jwt.PyJWTError, ValueError):
+            _refreshes.add(1, {"outcome": "failed"})
+            logger.warning("jwks refresh failed; keeping previous keys", exc_info=True)
+            return
+        _refreshes.add(1, {"outcome": "ok"})
+        logger.debug("jwks refreshed", extra={"keys": count})
+
+    def _run(self) -> None:
+        while not self._stop.wait(settings.jwt_jwks_refresh_seconds):
+            self.refresh()
+
+
+_refresher: JwksRefresher | None = None
+
+
+def start_jwks_refresher() -> None:
+    global _refresher
+    if _refresher is not None or not settings.jwt_jwks_url:
+        return
+    _refresher = JwksRefresher(jwks_keys)
+    _refresher.start()
+
+
+def stop_jwks_refresher() -> None:
+    global _refresher
+    if _refresher is None:
+        return
+    _refresher.stop()
+    _refresher = None
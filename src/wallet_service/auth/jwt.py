@@ -2,21 +2,35 @@ from dataclasses import dataclass
 
 import jwt
 
+from wallet_service.auth.jwks import jwks_keys
+from wallet_service.auth.token_cache import token_cache
 from wallet_service.config import settings
 from wallet_service.domain.errors import ForbiddenError, UnauthorizedError
 
 
-@dataclass
+@dataclass(frozen=True)
 class AuthContext:
     subject: str
-    scope: set[str]
+    # Frozen: one cached context is shared by every request bearing the token.
+    scope: frozenset[str]
+
+
+def _verification_key(token: str):
+    """The shared secret for HMAC tokens, otherwise the JWKS key named by kid."""
+    header = jwt.get_unverified_header(token)
+    if str(header.get("alg", "")).startswith("HS"):
+        return settings.jwt_secret
+    return jwks_keys.key_for(header.get("kid"))
 
 
 def decode_bearer_token(token: str) -> AuthContext:
+    ctx = token_cache.get(token)
+    if ctx is not None:
+        return ctx
     try:
         claims = jwt.decode(
             token,
-            settings.jwt_secret,
+            _verification_key(token),
             algorithms=settings.jwt_algorithms,
             audience=settings.jwt_audience,
         )
@@ -24,8 +38,10 @@ def decode_bearer_token(token: str) -> AuthContext:
         raise UnauthorizedError("invalid token") from exc
 
     scope_str = claims.get("scope", "")
-    scopes = {s.strip() for s in scope_str.split(" ") if s.strip()}
-    return AuthContext(subject=claims.get("sub", "unknown"), scope=scopes)
+    scopes = frozenset(s.strip() for s in scope_str.split(" ") if s.strip())
+    ctx = AuthContext(subject=claims.get("sub", "unknown"), scope=scopes)
+    token_cache.put(token, ctx, claims.get("exp"))
+    return ctx
 
 
 def require_scope(ctx: AuthContext, required: str) -> None:
@@ -0,0 +1,93 @@
+"""In-process cache of verified bearer tokens.
+
+Agent clients reuse one token for thousands of calls, and every call would
+otherwise repeat signature verification, claim parsing and building the scope
+set. A token that verified once keeps verifying until its exp, so its
+AuthContext is kept under a SHA-256 digest of the token (the token itself is
+not retained) until then, capped at jwt_cache_max_ttl_seconds so a rotated
+secret or key is honoured within that bound. Only tokens that verified are
+stored; a token differing by one byte has another digest and is verified in
+full. Entries are bounded by count, least recently used evicted first.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from wallet_service.config import settings
+from wallet_service.observability.metrics import meter
+
+if TYPE_CHECKING:
+    from wallet_service.auth.jwt import AuthContext
+
+_hits = meter.create_counter(
+    "wallet.auth.token_cache.hits",
+    description="Bearer tokens answered from the verified-token cache",
+)
+_misses = meter.create_counter(
+    "wallet.auth.token_cache.misses",
+    description="Bearer tokens verified in full",
+)
+_evictions = meter.create_counter(
+    "wallet.auth.token_cache.evictions",
+    description="Verified tokens dropped for capacity or expiry",
+)
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class TokenCache:
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        # Wall clock: exp is a Unix timestamp.
+        self._clock = clock
+        self._lock = threading.Lock()
+        # token digest -> (expires_at, context)
+        self._entries: OrderedDict[bytes, tuple[float, AuthContext]] = OrderedDict()
+
+    def get(self, token: str) -> "AuthContext | None":
+        if settings.jwt_cache_max_entries <= 0:
+            return None
+        key = _digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() >= entry[0]:
+                del self._entries[key]
+                _evictions.add(1, {"reason": "expired"})
+                entry = None
+            if entry is None:
+                _misses.add(1)
+                return None
+            self._entries.move_to_end(key)
+        _hits.add(1)
+        return entry[1]
+
+    def put(self, token: str, context: "AuthContext", exp: float | None) -> None:
+        """Remember a verified token until exp (seconds since the epoch), if given."""
+        max_entries = settings.jwt_cache_max_entries
+        if max_entries <= 0:
+            return
+        expires_at = self._clock() + settings.jwt_cache_max_ttl_seconds
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        key = _digest(token)
+        with self._lock:
+            self._entries[key] = (expires_at, context)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+                _evictions.add(1, {"reason": "capacity"})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache()
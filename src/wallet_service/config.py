@@ -1,3 +1,4 @@
+from typing import Literal
 from urllib.parse import quote, urlparse
 
 from pydantic import Field, model_validator
@@ -14,6 +15,22 @@ class Settings(BaseSettings):
 
     database_url: str | None = Field(default=None)
     db_connect_timeout_seconds: int = 3
+    db_pool_min_size: int = 2
+    db_pool_max_size: int = 20
+    # Checkout wait before failing closed with 503.
+    db_pool_timeout_seconds: float = 3.0
+    db_pool_max_lifetime_seconds: float = 1800.0
+    db_pool_max_idle_seconds: float = 300.0
+    # Connections idle longer than this are pinged on checkout.
+    db_pool_check_idle_seconds: float = 30.0
+    db_prepare_statements: bool = True
+    # Serialization-failure/deadlock retries per transaction (jittered backoff).
+    db_tx_max_retries: int = 5
+    db_tx_retry_base_seconds: float = 0.005
+    db_tx_retry_max_seconds: float = 0.1
+    # "apply" migrates at startup under an advisory lock; "verify" only checks
+    # that nothing is pending, for deployments that migrate in a separate step.
+    migrations_mode: Literal["apply", "verify"] = "apply"
     supabase_db_url: str | None = None
     supabase_url: str | None = None
     supabase_key: str | None = None
@@ -23,17 +40,76 @@ class Settings(BaseSettings):
     jwt_secret: str = "dev-secret-change-me"
     jwt_audience: str = "agentic-commerce"
     jwt_algorithms: list[str] = ["HS256"]
+    # RS*/ES* tokens are verified against this key set, re-fetched in the background.
+    jwt_jwks_url: str | None = None
+    jwt_jwks_refresh_seconds: float = 300.0
+    jwt_jwks_timeout_seconds: float = 3.0
+    # Verified tokens cached until exp (at most max_ttl); 0 entries disables it.
+    jwt_cache_max_entries: int = 10000
+    jwt_cache_max_ttl_seconds: float = 300.0
 
     otel_enabled: bool = True
     otel_service_name: str = "wallet-service"
     otel_exporter_otlp_endpoint: str = "http://localhost:4318"
+    # Send each request's phase breakdown as a Server-Timing response header.
+    server_timing_enabled: bool = False
+    # Statements a request may run, by "METHOD /route"; exceeding it logs a warning.
+    # A retried transaction counts every attempt.
+    db_statement_budgets: dict[str, int] = {
+        "POST /v1/wallets": 2,
+        "POST /v1/wallets:bulk": 1,
+        "GET /v1/wallets/{wallet_id}/balance": 1,
+        "GET /v1/wallets/{wallet_id}/balance/audit": 2,
+        "GET /v1/wallets/{wallet_id}/entries": 1,
+        "POST /v1/transfers": 1,
+        "POST /v1/transfers:fanout": 1,
+        "POST /v1/transfers:batch": 7,
+        "POST /v1/adjustments": 1,
+        "GET /v1/transactions/{transaction_id}": 1,
+        "GET /v1/ready": 1,
+    }
 
     default_asset: str = "USD"
     system_wallet_id: str = "00000000-0000-0000-0000-000000000001"
+    # Adjustments post their counter-leg to one of this many system sub-accounts.
+    system_wallet_stripes: int = Field(default=8, ge=1)
+    system_wallet_stripe_strategy: Literal["hash", "round_robin"] = "hash"
+
+    # In-process replay cache of committed postings; 0 entries disables it.
+    idempotency_cache_max_entries: int = 10000
+    idempotency_cache_ttl_seconds: float = 300.0
+
+    # Outbox relay worker (python -m wallet_service.outbox).
+    outbox_batch_size: int = 500
+    outbox_poll_interval_seconds: float = 1.0
+    outbox_retention_hours: float = 168.0
+    outbox_prune_batch_size: int = 5000
+    outbox_prune_interval_seconds: float = 300.0
+    outbox_report_interval_seconds: float = 15.0
+
+    # In-process balance cache, invalidated via LISTEN/NOTIFY; 0 entries disables it.
+    balance_cache_max_entries: int = 50000
+    balance_cache_heartbeat_seconds: float = 1.0
+
+    # Balance checkpoint sealing (python -m wallet_service.ledger.checkpoints).
+    checkpoint_batch_size: int = 1000
+    checkpoint_min_age_seconds: float = 3600.0
+
+    # Rows per server-side cursor fetch in the reconciliation job.
+    reconcile_fetch_size: int = 10000
+
+    # Monthly journal partitions (python -m wallet_service.ledger.partitions).
+    journal_partition_months_ahead: int = 3
+    journal_retention_months: int = 13
+    journal_detach_lock_timeout_seconds: float = 5.0
+    # Cold storage for detached months (python -m wallet_service.ledger.archive).
+    journal_archive_dir: str = "journal-archive"
 
     # If true, allow stale/in-memory fallback for reads when DB is unavailable.
     # Default false for CP-first behavior.
     allow_stale_reads: bool = False
+    # Oldest cached balance (since last known current) a stale read may serve.
+    stale_read_max_seconds: float = 30.0
 
     @model_validator(mode="after")
     def resolve_database_url(self):
@@ -1,16 +1,337 @@
-from contextlib import contextmanager
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from weakref import WeakKeyDictionary
 
 import psycopg
+from opentelemetry.metrics import CallbackOptions, Observation
+from psycopg import IsolationLevel
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
 
 from wallet_service.config import settings
 from wallet_service.domain.errors import ServiceUnavailableError
+from wallet_service.observability import prometheus
+from wallet_service.observability.metrics import meter
+from wallet_service.observability.queries import (
+    AsyncCountingCursor,
+    CountingCursor,
+    current_stats,
+    uncounted,
+)
+from wallet_service.observability.timing import phase, record_phase
+
+
+@dataclass(frozen=True)
+class TransactionPolicy:
+    isolation_level: IsolationLevel = IsolationLevel.SERIALIZABLE
+    read_only: bool = False
+    deferrable: bool = False
+
+
+# Postings stay SERIALIZABLE. Reads are single statements over committed,
+# immutable journal rows or projection rows, so READ COMMITTED sees a
+# consistent value without taking SIReadLocks or joining serialization graphs.
+WRITE = TransactionPolicy()
+READ = TransactionPolicy(IsolationLevel.READ_COMMITTED, read_only=True)
+
+# Errors where Postgres aborted the transaction and a rerun may succeed.
+RETRYABLE_ERRORS = (psycopg.errors.SerializationFailure, psycopg.errors.DeadlockDetected)
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+_async_pool: AsyncConnectionPool | None = None
+_last_returned: "WeakKeyDictionary[psycopg.Connection | psycopg.AsyncConnection, float]" = (
+    WeakKeyDictionary()
+)
+
+_checkout_wait = meter.create_histogram(
+    "wallet.db.pool.wait_time",
+    unit="ms",
+    description="Time spent waiting to check a connection out of the pool",
+)
+_transaction_retries = meter.create_counter(
+    "wallet.db.transaction.retries",
+    description="Transactions re-run after a serialization failure or deadlock",
+)
+_transaction_retries_exhausted = meter.create_counter(
+    "wallet.db.transaction.retries_exhausted",
+    description="Transactions that still failed after the last retry",
+)
+
+
+def _recently_returned(conn: psycopg.Connection | psycopg.AsyncConnection) -> bool:
+    # Connections reused within the idle window are trusted; anything older is
+    # pinged so a half-dead socket is replaced before a request sees it.
+    returned_at = _last_returned.get(conn)
+    if returned_at is None:
+        return False
+    return time.monotonic() - returned_at < settings.db_pool_check_idle_seconds
+
+
+def _check_connection(conn: psycopg.Connection) -> None:
+    # Pings are pool upkeep, not statements of the request that checked out.
+    if not _recently_returned(conn):
+        with uncounted():
+            ConnectionPool.check_connection(conn)
+
+
+def _reset_connection(conn: psycopg.Connection) -> None:
+    _last_returned[conn] = time.monotonic()
+
+
+async def _check_async_connection(conn: psycopg.AsyncConnection) -> None:
+    if not _recently_returned(conn):
+        with uncounted():
+            await AsyncConnectionPool.check_connection(conn)
+
+
+async def _reset_async_connection(conn: psycopg.AsyncConnection) -> None:
+    _last_returned[conn] = time.monotonic()
+
+
+def _connection_kwargs() -> dict:
+    kwargs: dict = {"connect_timeout": settings.db_connect_timeout_seconds}
+    if not settings.db_prepare_statements:
+        # Disables server-side prepared statements (e.g. behind an old pgbouncer).
+        kwargs["prepare_threshold"] = None
+    return kwargs
+
+
+def _build_pool() -> ConnectionPool:
+    return ConnectionPool(
+        settings.database_url,
+        kwargs={**_connection_kwargs(), "cursor_factory": CountingCursor},
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        timeout=settings.db_pool_timeout_seconds,
+        max_lifetime=settings.db_pool_max_lifetime_seconds,
+        max_idle=settings.db_pool_max_idle_seconds,
+        check=_check_connection,
+        reset=_reset_connection,
+        name="wallet-db",
+        open=False,
+    )
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = _build_pool()
+                # Don't block on min_size: an unreachable DB must surface as a
+                # checkout timeout (503), not hang process startup.
+                pool.open(wait=False)
+                _pool = pool
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+def _build_async_pool() -> AsyncConnectionPool:
+    return AsyncConnectionPool(
+        settings.database_url,
+        kwargs={**_connection_kwargs(), "cursor_factory": AsyncCountingCursor},
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        timeout=settings.db_pool_timeout_seconds,
+        max_lifetime=settings.db_pool_max_lifetime_seconds,
+        max_idle=settings.db_pool_max_idle_seconds,
+        check=_check_async_connection,
+        reset=_reset_async_connection,
+        name="wallet-db-async",
+        open=False,
+    )
+
+
+async def get_async_pool() -> AsyncConnectionPool:
+    # The async pool is bound to the running event loop, so it is opened from the
+    # app's startup hook (or lazily by scripts) rather than at import time.
+    global _async_pool
+    if _async_pool is None:
+        pool = _build_async_pool()
+        await pool.open(wait=False)
+        _async_pool = pool
+    return _async_pool
+
+
+async def close_async_pool() -> None:
+    global _async_pool
+    pool, _async_pool = _async_pool, None
+    if pool is not None:
+        await pool.close()
+
+
+def pool_stats() -> dict[str, int]:
+    if _pool is None:
+        return {}
+    return _pool.get_stats()
+
+
+def async_pool_stats() -> dict[str, int]:
+    if _async_pool is None:
+        return {}
+    return _async_pool.get_stats()
+
+
+def _all_pool_stats() -> Iterable[tuple[str, dict[str, int]]]:
+    for name, stats in (("sync", pool_stats()), ("async", async_pool_stats())):
+        if stats:
+            yield name, stats
+
+
+def _observe_pool_size(_: CallbackOptions) -> Iterable[Observation]:
+    for name, stats in _all_pool_stats():
+        yield Observation(stats.get("pool_size", 0), {"pool": name, "state": "open"})
+        yield Observation(stats.get("pool_available", 0), {"pool": name, "state": "idle"})
+
+
+def _observe_pool_waiting(_: CallbackOptions) -> Iterable[Observation]:
+    for name, stats in _all_pool_stats():
+        yield Observation(stats.get("requests_waiting", 0), {"pool": name})
+
+
+def _observe_pool_saturation(_: CallbackOptions) -> Iterable[Observation]:
+    for name, stats in _all_pool_stats():
+        in_use = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+        yield Observation(in_use / settings.db_pool_max_size, {"pool": name})
+
+
+meter.create_observable_gauge(
+    "wallet.db.pool.connections",
+    callbacks=[_observe_pool_size],
+    description="Connections held by the pool, by state",
+)
+meter.create_observable_gauge(
+    "wallet.db.pool.waiting",
+    callbacks=[_observe_pool_waiting],
+    description="Requests queued for a pooled connection",
+)
+meter.create_observable_gauge(
+    "wallet.db.pool.saturation",
+    callbacks=[_observe_pool_saturation],
+    description="Fraction of max_size connections currently checked out",
+)
+
+
+def _retry_delay(attempt: int) -> float:
+    # Full jitter: contending transactions spread out instead of colliding again.
+    backoff = settings.db_tx_retry_base_seconds * (2**attempt)
+    ceiling = min(settings.db_tx_retry_max_seconds, backoff)
+    return random.uniform(0, ceiling)
 
 
 @contextmanager
-def get_connection():
+def get_connection(policy: TransactionPolicy = WRITE):
+    try:
+        pool = get_pool()
+        started = time.perf_counter()
+        with pool.connection() as conn:
+            waited = (time.perf_counter() - started) * 1000
+            _checkout_wait.record(waited)
+            record_phase("pool_checkout", waited)
+            # Applied to the connection rather than via SET TRANSACTION, so the
+            # BEGIN psycopg sends already carries it (no extra round-trip).
+            conn.isolation_level = policy.isolation_level
+            conn.read_only = policy.read_only
+            conn.deferrable = policy.deferrable
+            yield conn
+            # The pool would commit on return anyway; done here so it is timed.
+            with phase("commit"):
+                conn.commit()
+    except RETRYABLE_ERRORS:
+        raise
+    except psycopg.OperationalError as exc:
+        # PoolTimeout is an OperationalError too: a saturated or unreachable
+        # database fails closed the same way a refused connect did.
+        prometheus.db_unavailable.inc()
+        raise ServiceUnavailableError("database unavailable") from exc
+
+
+def run_transaction[T](
+    operation: str,
+    work: Callable[[psycopg.Connection], T],
+    policy: TransactionPolicy = WRITE,
+) -> T:
+    """Run work(conn) in one transaction, re-running it on serialization failures.
+
+    work must be safe to repeat: everything it did in a failed attempt has been
+    rolled back, and idempotent postings re-check their key on every attempt.
+    """
+    attempt = 0
+    stats = current_stats()
+    while True:
+        mark = stats.statements if stats is not None else 0
+        try:
+            with get_connection(policy) as conn:
+                return work(conn)
+        except RETRYABLE_ERRORS as exc:
+            attributes = {"operation": operation, "error": type(exc).__name__}
+            prometheus.serialization_failures.labels(**attributes).inc()
+            if attempt >= settings.db_tx_max_retries:
+                _transaction_retries_exhausted.add(1, attributes)
+                raise
+            _transaction_retries.add(1, attributes)
+            if stats is not None:
+                stats.discard_attempt(mark)
+            with phase("retry_backoff"):
+                time.sleep(_retry_delay(attempt))
+            attempt += 1
+
+
+@asynccontextmanager
+async def get_async_connection(policy: TransactionPolicy = WRITE):
     try:
-        with psycopg.connect(settings.database_url, connect_timeout=settings.db_connect_timeout_seconds) as conn:
-            conn.execute("SET TRANSACTION ISOLATION LEVEL SERIALIZABLE")
+        pool = await get_async_pool()
+        started = time.perf_counter()
+        async with pool.connection() as conn:
+            waited = (time.perf_counter() - started) * 1000
+            _checkout_wait.record(waited)
+            record_phase("pool_checkout", waited)
+            await conn.set_isolation_level(policy.isolation_level)
+            await conn.set_read_only(policy.read_only)
+            await conn.set_deferrable(policy.deferrable)
             yield conn
+            with phase("commit"):
+                await conn.commit()
+    except RETRYABLE_ERRORS:
+        raise
     except psycopg.OperationalError as exc:
+        prometheus.db_unavailable.inc()
         raise ServiceUnavailableError("database unavailable") from exc
+
+
+async def run_transaction_async[T](
+    operation: str,
+    work: Callable[[psycopg.AsyncConnection], Awaitable[T]],
+    policy: TransactionPolicy = WRITE,
+) -> T:
+    attempt = 0
+    stats = current_stats()
+    while True:
+        mark = stats.statements if stats is not None else 0
+        try:
+            async with get_async_connection(policy) as conn:
+                return await work(conn)
+        except RETRYABLE_ERRORS as exc:
+            attributes = {"operation": operation, "error": type(exc).__name__}
+            prometheus.serialization_failures.labels(**attributes).inc()
+            if attempt >= settings.db_tx_max_retries:
+                _transaction_retries_exhausted.add(1, attributes)
+                raise
+            _transaction_retries.add(1, attributes)
+            if stats is not None:
+                stats.discard_attempt(mark)
+            with phase("retry_backoff"):
+                await asyncio.sleep(_retry_delay(attempt))
+            attempt += 1
@@ -1,9 +1,42 @@
+"""Schema migrations: the SQL files in migrations/, applied in filename order.
+
+Every replica applies pending migrations at startup (migrations_mode
+"apply"). The run holds a transaction-level advisory lock, so replicas
+starting together apply each file once: the first takes the lock and
+migrates, and the others wait, then find nothing pending. Applied filenames
+are read in one query, so an up-to-date schema costs a handful of statements
+however many files there are.
+
+With migrations_mode "verify" a replica does not migrate. It reads the
+applied filenames once and refuses to start if any file it ships is missing,
+for deployments that migrate in a separate step (the Helm chart's pre-upgrade
+Job runs `python -m wallet_service.db.migrations`).
+"""
+
+import argparse
 from pathlib import Path
 
-from wallet_service.db.database import get_connection
+import psycopg
+from psycopg import IsolationLevel
+
+from wallet_service.db.database import READ, TransactionPolicy, close_pool, get_connection
+
+# pg_advisory_xact_lock key shared by every process migrating this database.
+MIGRATIONS_LOCK_ID = 0x57A1_1E70
+# READ COMMITTED so a replica that waited for the lock reads the filenames the
+# previous holder committed; a SERIALIZABLE snapshot would predate the wait.
+MIGRATE = TransactionPolicy(IsolationLevel.READ_COMMITTED)
 
+SCHEMA_MIGRATIONS_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+      filename TEXT PRIMARY KEY,
+      applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+"""
+APPLIED_SQL = "SELECT filename FROM schema_migrations"
 
-def apply_migrations() -> None:
+
+def migration_files() -> list[Path]:
     # In dev, we run from the repo. In deployed images we install the package into
     # site-packages but copy SQL migrations into /app/migrations. Prefer runtime
     # locations that actually exist in the container, and fail closed if none do.
@@ -12,27 +45,65 @@ def apply_migrations() -> None:
         Path("/app/migrations"),
         Path(__file__).resolve().parents[3] / "migrations",
     ]
-    migration_dir: Path | None = next((p for p in candidates if p.exists() and p.is_dir()), None)
+    migration_dir: Path | None = next((p for p in candidates if p.is_dir()), None)
     if migration_dir is None:
-        raise RuntimeError("migrations directory not found (looked in: " + ", ".join(map(str, candidates)) + ")")
+        raise RuntimeError(
+            "migrations directory not found (looked in: " + ", ".join(map(str, candidates)) + ")"
+        )
+    return sorted(migration_dir.glob("*.sql"))
 
-    files = sorted(migration_dir.glob("*.sql"))
 
-    with get_connection() as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS schema_migrations (
-              filename TEXT PRIMARY KEY,
-              applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-            )
-            """
-        )
+def apply_migrations() -> list[str]:
+    """Apply pending migrations under the advisory lock. Returns the filenames applied."""
+    files = migration_files()
+    applied = []
+    with get_connection(MIGRATE) as conn:
+        # Held until commit; concurrent replicas queue here rather than racing the DDL.
+        conn.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATIONS_LOCK_ID,))
+        conn.execute(SCHEMA_MIGRATIONS_SQL)
+        done = {row[0] for row in conn.execute(APPLIED_SQL)}
         for file in files:
-            exists = conn.execute(
-                "SELECT 1 FROM schema_migrations WHERE filename = %s", (file.name,)
-            ).fetchone()
-            if exists:
+            if file.name in done:
                 continue
             conn.execute(file.read_text())
             conn.execute("INSERT INTO schema_migrations(filename) VALUES (%s)", (file.name,))
-        conn.commit()
+            applied.append(file.name)
+    return applied
+
+
+def verify_migrations() -> None:
+    """Fail unless every migration file has been applied; never migrates.
+
+    Filenames applied but not shipped are allowed: during a rolling deploy the
+    database may already be ahead of the older replicas.
+    """
+    files = migration_files()
+    try:
+        with get_connection(READ) as conn:
+            done = {row[0] for row in conn.execute(APPLIED_SQL)}
+    except psycopg.errors.UndefinedTable as exc:
+        raise RuntimeError("schema not migrated: schema_migrations does not exist") from exc
+    pending = [file.name for file in files if file.name not in done]
+    if pending:
+        raise RuntimeError("schema not migrated, pending: " + ", ".join(pending))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply or verify the schema migrations.")
+    parser.add_argument("--verify", action="store_true", help="only check that none are pending")
+    args = parser.parse_args()
+    try:
+        if args.verify:
+            verify_migrations()
+            print("schema up to date")
+        else:
+            applied = apply_migrations()
+            print(
+                f"applied {len(applied)} migration(s)" + "".join(f"\n  {name}" for name in applied)
+            )
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
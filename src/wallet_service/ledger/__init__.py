@@ -3,8 +3,12 @@ from wallet_service.ledger.service import (
     create_wallet,
     get_balance,
     get_transaction,
+    list_entries,
     post_adjustment,
+    post_fanout,
     post_transfer,
+    post_transfer_batch,
+    system_wallet_stripes,
 )
 
 __all__ = [
@@ -12,6 +16,10 @@ __all__ = [
     "create_wallet",
     "get_balance",
     "get_transaction",
+    "list_entries",
     "post_adjustment",
+    "post_fanout",
     "post_transfer",
+    "post_transfer_batch",
+    "system_wallet_stripes",
 ]
@@ -0,0 +1,325 @@
+"""Cold-storage archive of detached journal months.
+
+wallet_service.ledger.partitions detaches months past retention and carries
+their balances forward, leaving the detached tables behind. export writes each
+such month to a directory of gzip-compressed column files (one per column, in
+COPY text format, rows in created_at order) plus a manifest.json with row
+counts and SHA-256 checksums, then drops the tables once the files verify.
+
+restore reads a month back from its files, takes its sums out of
+journal_carry_forward and attaches it to the journal again, in one
+transaction, so replays, lookups and audits see it as before. The next
+maintenance run detaches it again unless --retain now covers it.
+
+    python -m wallet_service.ledger.archive export --dir /var/lib/wallet/archive
+    python -m wallet_service.ledger.archive restore p202401 --dir /var/lib/wallet/archive
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+from contextlib import ExitStack
+from datetime import UTC, datetime
+from pathlib import Path
+
+from psycopg import sql
+
+from wallet_service.config import settings
+from wallet_service.db.database import READ, close_pool, run_transaction
+from wallet_service.ledger.partitions import MAINTAIN
+from wallet_service.logging_config import configure_logging
+from wallet_service.observability.metrics import meter
+from wallet_service.observability.otel import setup_otel
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+# Attach order: outbox events and entries reference their transactions.
+_TABLES = (
+    ("journal_transactions", "created_at, transaction_id"),
+    ("journal_entries", "created_at, entry_id"),
+    ("outbox_events", "created_at, event_id"),
+)
+
+DETACHED_MONTHS_SQL = r"""
+    SELECT substr(relname, length('journal_transactions') + 1)
+    FROM pg_class
+    WHERE relkind = 'r' AND NOT relispartition AND pg_table_is_visible(oid)
+      AND relname ~ '^journal_transactions_(legacy|p[0-9]{6})$'
+    ORDER BY relname
+"""
+
+COLUMNS_SQL = """
+    SELECT attname, format_type(atttypid, atttypmod)
+    FROM pg_attribute
+    WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+    ORDER BY attnum
+"""
+
+LEGACY_UNTIL_SQL = "SELECT legacy_until FROM journal_partitioning"
+
+GUARD_ENTRIES_SQL = "SELECT guard_journal_entries_partition(%s::regclass)"
+
+UNCARRY_SQL = """
+    UPDATE journal_carry_forward f
+    SET balance = f.balance - r.balance
+    FROM (
+        SELECT wallet_id, asset, SUM(amount) AS balance
+        FROM {entries}
+        GROUP BY wallet_id, asset
+    ) r
+    WHERE f.wallet_id = r.wallet_id AND f.asset = r.asset
+"""
+
+_archived_rows = meter.create_counter(
+    "wallet.journal.archive.rows",
+    description="Journal rows exported to cold storage and dropped from the database",
+)
+_restored_rows = meter.create_counter(
+    "wallet.journal.archive.restored_rows",
+    description="Journal rows restored from cold storage",
+)
+
+
+class ArchiveError(RuntimeError):
+    """An archive is missing, incomplete or does not match its manifest."""
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as stream:
+        for block in iter(lambda: stream.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _month_bounds(suffix: str, legacy_until: datetime) -> tuple[datetime | None, datetime]:
+    """created_at range a detached month covered; the legacy partition has no lower bound."""
+    if suffix == "_legacy":
+        return None, legacy_until
+    year, month = int(suffix[2:6]), int(suffix[6:8])
+    start = datetime(year, month, 1, tzinfo=UTC)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=UTC)
+    return start, end
+
+
+def detached_months() -> list[str]:
+    """Name suffixes (e.g. _p202401) of detached months still in the database."""
+    rows = run_transaction(
+        "detached_journal_months", lambda conn: conn.execute(DETACHED_MONTHS_SQL).fetchall(), READ
+    )
+    return [row[0] for row in rows]
+
+
+def _export_table(conn, table: str, order: str, directory: Path) -> dict:
+    columns = conn.execute(COLUMNS_SQL, (table,)).fetchall()
+    directory.mkdir()
+    query = sql.SQL("COPY (SELECT {} FROM {} ORDER BY {}) TO STDOUT").format(
+        sql.SQL(", ").join(sql.Identifier(name) for name, _ in columns),
+        sql.Identifier(table),
+        sql.SQL(order),
+    )
+    rows = 0
+    with ExitStack() as stack:
+        files = [
+            stack.enter_context(gzip.open(directory / f"{name}.gz", "wb")) for name, _ in columns
+        ]
+        with conn.cursor().copy(query) as copy:
+            # Text COPY escapes tabs and newlines inside values, and each
+            # block read is one row.
+            for block in copy:
+                for column, value in zip(files, bytes(block)[:-1].split(b"\t"), strict=True):
+                    column.write(value + b"\n")
+                rows += 1
+    return {
+        "rows": rows,
+        "columns": [
+            {
+                "name": name,
+                "type": type_name,
+                "file": f"{directory.name}/{name}.gz",
+                "sha256": _sha256(directory / f"{name}.gz"),
+            }
+            for name, type_name in columns
+        ],
+    }
+
+
+def _fsync_tree(directory: Path) -> None:
+    for path in [*directory.rglob("*"), directory]:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def verify_archive(directory: Path) -> dict:
+    """Check every column file against the manifest. Returns the manifest."""
+    try:
+        manifest = json.loads((directory / MANIFEST).read_text())
+    except (OSError, ValueError) as exc:
+        raise ArchiveError(f"no readable manifest in {directory}") from exc
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ArchiveError(f"unsupported archive format in {directory}")
+    for table in manifest["tables"].values():
+        for column in table["columns"]:
+            path = directory / column["file"]
+            if not path.is_file() or _sha256(path) != column["sha256"]:
+                raise ArchiveError(f"checksum mismatch for {path}")
+    return manifest
+
+
+def _write_month(suffix: str, target: Path) -> None:
+    staging = target.with_name(target.name + ".partial")
+
+    def read(conn) -> dict:
+        # Timestamps are written with their offset, in a format COPY reads back.
+        conn.execute("SELECT set_config('DateStyle', 'ISO', true)")
+        legacy_until = conn.execute(LEGACY_UNTIL_SQL).fetchone()[0]
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        tables = {
+            table: _export_table(conn, table + suffix, order, staging / table)
+            for table, order in _TABLES
+        }
+        created_from, created_until = _month_bounds(suffix, legacy_until)
+        return {
+            "format": FORMAT_VERSION,
+            "month": suffix.lstrip("_"),
+            "created_from": created_from.isoformat() if created_from else None,
+            "created_until": created_until.isoformat(),
+            "archived_at": datetime.now(UTC).isoformat(),
+            "tables": tables,
+        }
+
+    manifest = run_transaction("archive_export", read, READ)
+    (staging / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    _fsync_tree(staging)
+    staging.rename(target)
+
+
+def export_month(suffix: str, archive_dir: Path) -> dict:
+    """Write one detached month to archive_dir, verify it and drop its tables.
+
+    An archive left by a run that stopped before dropping is verified and
+    reused.
+    """
+    target = archive_dir / suffix.lstrip("_")
+    if not target.exists():
+        _write_month(suffix, target)
+    manifest = verify_archive(target)
+
+    def drop(conn) -> None:
+        for table, _ in reversed(_TABLES):
+            name = sql.Identifier(table + suffix)
+            count = conn.execute(sql.SQL("SELECT COUNT(*) FROM {}").format(name)).fetchone()[0]
+            if count != manifest["tables"][table]["rows"]:
+                raise ArchiveError(f"{table + suffix} has {count} rows, its archive does not")
+            conn.execute(sql.SQL("DROP TABLE {}").format(name))
+
+    run_transaction("archive_drop", drop, MAINTAIN)
+    rows = sum(table["rows"] for table in manifest["tables"].values())
+    _archived_rows.add(rows)
+    logger.info("journal month archived", extra={"month": manifest["month"], "rows": rows})
+    return manifest
+
+
+def export_detached(archive_dir: Path) -> list[dict]:
+    """Archive every detached month, oldest first."""
+    return [export_month(suffix, archive_dir) for suffix in detached_months()]
+
+
+def _restore_table(conn, table: str, directory: Path, spec: dict) -> None:
+    names = [column["name"] for column in spec["columns"]]
+    columns = [name for name, _ in conn.execute(COLUMNS_SQL, (table,)).fetchall()]
+    if sorted(names) != sorted(columns):
+        raise ArchiveError(f"archived columns of {table} do not match the current schema")
+    query = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table), sql.SQL(", ").join(sql.Identifier(name) for name in names)
+    )
+    with ExitStack() as stack:
+        files = [
+            stack.enter_context(gzip.open(directory / column["file"], "rb"))
+            for column in spec["columns"]
+        ]
+        with conn.cursor().copy(query) as copy:
+            for values in zip(*files, strict=True):
+                copy.write(b"\t".join(value[:-1] for value in values) + b"\n")
+
+
+def restore_month(month: str, archive_dir: Path) -> dict:
+    """Load an archived month back and attach it to the journal tables."""
+    directory = archive_dir / month
+    manifest = verify_archive(directory)
+    suffix = "_" + manifest["month"]
+    lower = manifest["created_from"]
+    bounds = sql.SQL("FOR VALUES FROM ({}) TO ({})").format(
+        sql.SQL("MINVALUE") if lower is None else sql.Literal(lower),
+        sql.Literal(manifest["created_until"]),
+    )
+
+    def restore(conn) -> None:
+        conn.execute(
+            "SELECT set_config('lock_timeout', %s, true)",
+            (f"{int(settings.journal_detach_lock_timeout_seconds * 1000)}ms",),
+        )
+        for table, _ in _TABLES:
+            child = sql.Identifier(table + suffix)
+            conn.execute(
+                sql.SQL(
+                    "CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                ).format(child, sql.Identifier(table))
+            )
+            _restore_table(conn, table + suffix, directory, manifest["tables"][table])
+        conn.execute(
+            sql.SQL(UNCARRY_SQL).format(entries=sql.Identifier("journal_entries" + suffix))
+        )
+        for table, _ in _TABLES:
+            conn.execute(
+                sql.SQL("ALTER TABLE {} ATTACH PARTITION {} {}").format(
+                    sql.Identifier(table), sql.Identifier(table + suffix), bounds
+                )
+            )
+        # Loaded rows were checked when first posted; guard later inserts.
+        conn.execute(GUARD_ENTRIES_SQL, ("journal_entries" + suffix,))
+
+    run_transaction("archive_restore", restore, MAINTAIN)
+    rows = sum(table["rows"] for table in manifest["tables"].values())
+    _restored_rows.add(rows)
+    logger.info("journal month restored", extra={"month": manifest["month"], "rows": rows})
+    return manifest
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Archive and restore detached journal months.")
+    parser.add_argument("--dir", type=Path, default=Path(settings.journal_archive_dir))
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("export", help="Archive every detached month and drop its tables")
+    restore = commands.add_parser("restore", help="Load an archived month back into the journal")
+    restore.add_argument("month", help="Archived month, e.g. p202401 or legacy")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    setup_otel()
+    try:
+        if args.command == "export":
+            manifests = export_detached(args.dir)
+            logger.info("journal archive finished", extra={"months": len(manifests)})
+        else:
+            restore_month(args.month, args.dir)
+    except ArchiveError:
+        logger.exception("journal archive failed")
+        raise SystemExit(1) from None
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""Asyncio variant of the ledger service.
+
+Mirrors wallet_service.ledger.service statement for statement on a
+psycopg.AsyncConnection, so request handlers can await Postgres instead of
+parking a threadpool thread. Both import their SQL from wallet_service.ledger.sql
+and their payload hashing, batch planning and row mapping from
+wallet_service.ledger.journal, keeping the two paths semantically identical.
+"""
+
+import time
+from datetime import UTC, datetime
+from decimal import Decimal
+from uuid import UUID
+
+import psycopg
+
+from wallet_service.db.database import READ, run_transaction_async
+from wallet_service.domain.errors import ConflictError, NotFoundError, ServiceUnavailableError
+from wallet_service.ledger.balance_cache import balance_cache
+from wallet_service.ledger.journal import (
+    BatchItemResult,
+    JournalPosting,
+    LedgerTransaction,
+    adjustment_posting,
+    audit_from_row,
+    audit_sql,
+    balance_from_row,
+    batch_entry_params,
+    batch_results,
+    batch_transaction_ids,
+    batch_transaction_params,
+    batch_update_params,
+    batch_wallet_ids,
+    bulk_wallet_params,
+    bulk_wallet_result,
+    cache_batch_results,
+    created_at_range,
+    entries_page,
+    entries_params,
+    fanout_posting,
+    invalidate_balances,
+    is_system_wallet,
+    plan_transfer_batch,
+    posting_params,
+    provisioned_stripes,
+    raise_ledger_error,
+    record_batch_results,
+    record_posting,
+    record_posting_conflict,
+    stale_balance,
+    system_stripe_key,
+    transaction_from_journal_rows,
+    transactions_by_key,
+    transfer_batch_postings,
+    transfer_posting,
+    wallet_from_row,
+)
+from wallet_service.ledger.replay_cache import replay_cache
+from wallet_service.ledger.sql import (
+    ENSURE_SYSTEM_STRIPES_SQL,
+    INSERT_ACCOUNT_SQL,
+    INSERT_BATCH_ENTRIES_SQL,
+    INSERT_BATCH_TRANSACTIONS_SQL,
+    INSERT_PROJECTION_SQL,
+    INSERT_WALLETS_BULK_SQL,
+    LOCK_ACCOUNTS_SQL,
+    POST_JOURNAL_SQL,
+    SELECT_BALANCE_SQL,
+    SELECT_SYSTEM_BALANCE_SQL,
+    SELECT_TRANSACTION_SQL,
+    SELECT_TRANSACTIONS_BY_KEY_SQL,
+    SELECT_WALLET_ENTRIES_SQL,
+)
+from wallet_service.observability.timing import phase
+
+
+async def create_wallet(wallet_id: UUID, asset: str) -> dict:
+    now = datetime.now(UTC)
+
+    async def insert(conn) -> dict:
+        try:
+            cur = await conn.execute(INSERT_ACCOUNT_SQL, (str(wallet_id), asset, now), prepare=True)
+            row = await cur.fetchone()
+            await conn.execute(INSERT_PROJECTION_SQL, (str(wallet_id), asset, now), prepare=True)
+        except psycopg.errors.UniqueViolation as exc:
+            raise ConflictError("wallet already exists") from exc
+        return wallet_from_row(row)
+
+    return await run_transaction_async("create_wallet", insert)
+
+
+async def create_wallets(wallets: list[tuple[UUID, str]]) -> dict:
+    params = bulk_wallet_params(wallets, datetime.now(UTC))
+
+    async def insert(conn) -> list:
+        cur = await conn.execute(INSERT_WALLETS_BULK_SQL, params, prepare=True)
+        return await cur.fetchall()
+
+    return bulk_wallet_result(wallets, await run_transaction_async("create_wallets", insert))
+
+
+async def system_wallet_stripes() -> list[UUID]:
+    key = system_stripe_key()
+    stripes = provisioned_stripes.get(key)
+    if stripes is not None:
+        return stripes
+
+    async def ensure(conn) -> list[UUID]:
+        try:
+            cur = await conn.execute(ENSURE_SYSTEM_STRIPES_SQL, key, prepare=True)
+            rows = await cur.fetchall()
+        except psycopg.Error as exc:
+            raise_ledger_error(exc)
+            raise
+        return [row[0] for row in rows]
+
+    stripes = await run_transaction_async("ensure_system_wallet_stripes", ensure)
+    provisioned_stripes[key] = stripes
+    return stripes
+
+
+async def get_balance(wallet_id: UUID) -> dict:
+    system = is_system_wallet(wallet_id)
+    sql = SELECT_SYSTEM_BALANCE_SQL if system else SELECT_BALANCE_SQL
+    if not system:
+        cached = balance_cache.get(wallet_id)
+        if cached is not None:
+            return cached
+    epoch = balance_cache.epoch()
+
+    async def read(conn) -> dict:
+        cur = await conn.execute(sql, (str(wallet_id),), prepare=True)
+        return balance_from_row(await cur.fetchone())
+
+    try:
+        balance = await run_transaction_async("get_balance", read, READ)
+    except ServiceUnavailableError as exc:
+        return stale_balance(wallet_id, exc)
+    if not system:
+        balance_cache.put(balance, epoch)
+    return balance
+
+
+async def _post_journal(posting: JournalPosting) -> LedgerTransaction:
+    operation = posting.operation_scope
+    started = time.perf_counter()
+    try:
+        with phase("replay_cache"):
+            cached = replay_cache.lookup(posting)
+    except ConflictError as exc:
+        record_posting_conflict(operation, exc)
+        raise
+    if cached is not None:
+        record_posting(operation, "cache", started)
+        return cached
+
+    async def post(conn) -> tuple[LedgerTransaction, bool]:
+        try:
+            with phase("post_journal"):
+                cur = await conn.execute(POST_JOURNAL_SQL, posting_params(posting), prepare=True)
+                rows = await cur.fetchall()
+        except psycopg.Error as exc:
+            raise_ledger_error(exc)
+            raise
+        return transaction_from_journal_rows(rows), rows[0][-1]
+
+    try:
+        tx, replayed = await run_transaction_async(operation, post)
+    except ConflictError as exc:
+        record_posting_conflict(operation, exc)
+        raise
+    if not replayed:
+        invalidate_balances([tx])
+    record_posting(operation, "database" if replayed else None, started)
+    replay_cache.store(tx)
+    return tx
+
+
+async def post_transfer(
+    *,
+    idempotency_key: str,
+    from_wallet_id: UUID,
+    to_wallet_id: UUID,
+    amount: Decimal,
+    asset: str,
+    external_reference: str | None,
+    expected_from_version: int | None,
+    expected_to_version: int | None,
+) -> LedgerTransaction:
+    posting = transfer_posting(
+        idempotency_key=idempotency_key,
+        from_wallet_id=from_wallet_id,
+        to_wallet_id=to_wallet_id,
+        amount=amount,
+        asset=asset,
+        external_reference=external_reference,
+        expected_from_version=expected_from_version,
+        expected_to_version=expected_to_version,
+    )
+    return await _post_journal(posting)
+
+
+async def post_fanout(
+    *,
+    idempotency_key: str,
+    from_wallet_id: UUID,
+    credits: list[tuple[UUID, Decimal, int | None]],
+    asset: str,
+    external_reference: str | None,
+    expected_from_version: int | None,
+) -> LedgerTransaction:
+    posting = fanout_posting(
+        idempotency_key=idempotency_key,
+        from_wallet_id=from_wallet_id,
+        credits=credits,
+        asset=asset,
+        external_reference=external_reference,
+        expected_from_version=expected_from_version,
+    )
+    return await _post_journal(posting)
+
+
+async def post_transfer_batch(transfers: list[dict], *, atomic: bool) -> list[BatchItemResult]:
+    postings = transfer_batch_postings(transfers)
+    keys = [key for key, _ in postings]
+
+    async def post(conn) -> list[BatchItemResult]:
+        cur = await conn.execute(SELECT_TRANSACTIONS_BY_KEY_SQL, ("transfer", keys), prepare=True)
+        existing = transactions_by_key(await cur.fetchall())
+        wallet_ids = batch_wallet_ids(postings, existing)
+        accounts = []
+        if wallet_ids:
+            cur = await conn.execute(LOCK_ACCOUNTS_SQL, (wallet_ids,), prepare=True)
+            accounts = await cur.fetchall()
+        plan = plan_transfer_batch(postings, existing, accounts, atomic)
+        if not plan.postings:
+            return plan.results
+
+        cur = await conn.execute(
+            INSERT_BATCH_TRANSACTIONS_SQL, batch_transaction_params(plan), prepare=True
+        )
+        created_rows = await cur.fetchall()
+        transaction_ids = batch_transaction_ids(plan, created_rows)
+        cur = await conn.execute(
+            INSERT_BATCH_ENTRIES_SQL, batch_entry_params(plan, transaction_ids), prepare=True
+        )
+        entry_rows = await cur.fetchall()
+        for sql, params in batch_update_params(plan, transaction_ids):
+            await conn.execute(sql, params, prepare=True)
+        return batch_results(plan, transaction_ids, created_rows, entry_rows)
+
+    results = await run_transaction_async("transfer_batch", post)
+    invalidate_balances([r.transaction for r in results if r.status == "committed"])
+    cache_batch_results(results)
+    record_batch_results(results)
+    return results
+
+
+async def post_adjustment(
+    *,
+    idempotency_key: str,
+    wallet_id: UUID,
+    amount: Decimal,
+    direction: str,
+    asset: str,
+    reason: str,
+    expected_wallet_version: int | None,
+) -> LedgerTransaction:
+    posting = adjustment_posting(
+        idempotency_key=idempotency_key,
+        wallet_id=wallet_id,
+        amount=amount,
+        direction=direction,
+        asset=asset,
+        reason=reason,
+        expected_wallet_version=expected_wallet_version,
+        system_stripes=await system_wallet_stripes(),
+    )
+    return await _post_journal(posting)
+
+
+async def list_entries(
+    wallet_id: UUID,
+    *,
+    cursor: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = 100,
+) -> dict:
+    params = entries_params(wallet_id, cursor, since, until, limit)
+
+    async def read(conn) -> list:
+        cur = await conn.execute(SELECT_WALLET_ENTRIES_SQL, params, prepare=True)
+        return await cur.fetchall()
+
+    rows = await run_transaction_async("list_entries", read, READ)
+    return entries_page(wallet_id, rows, limit)
+
+
+async def get_transaction(transaction_id: UUID) -> LedgerTransaction:
+    async def read(conn) -> LedgerTransaction:
+        cur = await conn.execute(
+            SELECT_TRANSACTION_SQL, created_at_range(transaction_id), prepare=True
+        )
+        rows = await cur.fetchall()
+        if not rows:
+            raise NotFoundError("transaction not found")
+        return transaction_from_journal_rows(rows)
+
+    return await run_transaction_async("get_transaction", read, READ)
+
+
+async def audit_balance(wallet_id: UUID, *, full: bool = False) -> dict:
+    sql = audit_sql(wallet_id, full)
+
+    async def read(conn) -> dict:
+        cur = await conn.execute(sql, (str(wallet_id),), prepare=True)
+        return audit_from_row(await cur.fetchone())
+
+    return await run_transaction_async("audit_balance", read, READ)
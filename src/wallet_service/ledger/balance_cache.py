@@ -0,0 +1,256 @@
+"""In-process balance cache kept coherent by Postgres LISTEN/NOTIFY.
+
+Every committed projection update publishes "wallet_id:version" pairs on the
+wallet_balance channel (migration 007). A listener thread holds one dedicated
+connection LISTENing on it and drops cached balances whose version has been
+superseded, so all replicas converge without polling.
+
+A posting also drops its wallets' entries on this replica as soon as it
+commits, so a read that follows a write here never waits for the
+notification to come back.
+
+Cached values are only served while the listener is connected: a notification
+missed during a disconnect would otherwise leave a stale entry in place. When
+the listener reconnects the cache starts over. With allow_stale_reads, entries
+that are no longer verified may still answer reads while the database is
+unreachable, up to stale_read_max_seconds after they were last known current.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from uuid import UUID
+
+import psycopg
+
+from wallet_service.config import settings
+from wallet_service.observability.metrics import meter
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "wallet_balance"
+
+_hits = meter.create_counter(
+    "wallet.balance_cache.hits",
+    description="Balance reads answered from the in-process cache",
+)
+_misses = meter.create_counter(
+    "wallet.balance_cache.misses",
+    description="Balance reads that went to the database",
+)
+_invalidations = meter.create_counter(
+    "wallet.balance_cache.invalidations",
+    description="Cached balances dropped after a newer version was notified",
+)
+_stale_served = meter.create_counter(
+    "wallet.balance_cache.stale_served",
+    description="Unverified cached balances served while the database was unavailable",
+)
+_listener_disconnects = meter.create_counter(
+    "wallet.balance_cache.listener_disconnects",
+    description="Times the invalidation listener lost its connection",
+)
+
+
+class BalanceCache:
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        # wallet_id -> (cached_at, balance)
+        self._entries: OrderedDict[UUID, tuple[float, dict]] = OrderedDict()
+        # Highest version notified per wallet and the epoch it arrived in, so a
+        # read that raced a posting cannot store a value the notification has
+        # already superseded.
+        self._notified: OrderedDict[UUID, tuple[int, int]] = OrderedDict()
+        # Epoch at each wallet's last local invalidation, so a read that started
+        # before a posting committed cannot store what it read. Tokens below
+        # _floor (the last reconnect, or a notification or invalidation no
+        # longer tracked) are refused outright.
+        self._dropped: OrderedDict[UUID, int] = OrderedDict()
+        self._floor = 0
+        self._listening = False
+        self._epoch = 0
+        self._verified_at = 0.0
+
+    @property
+    def listening(self) -> bool:
+        return self._listening
+
+    def epoch(self) -> int:
+        """Token to take before reading from the database and pass to put()."""
+        return self._epoch
+
+    def get(self, wallet_id: UUID) -> dict | None:
+        if settings.balance_cache_max_entries <= 0 or not self._listening:
+            return None
+        with self._lock:
+            entry = self._entries.get(wallet_id)
+            if entry is None:
+                _misses.add(1)
+                return None
+            self._entries.move_to_end(wallet_id)
+        _hits.add(1)
+        return dict(entry[1])
+
+    def put(self, balance: dict, epoch: int) -> None:
+        """Cache a balance read from the database after epoch() returned epoch."""
+        max_entries = settings.balance_cache_max_entries
+        if max_entries <= 0:
+            return
+        wallet_id = balance["wallet_id"]
+        with self._lock:
+            # A reconnect in the meantime may have missed the notification
+            # that superseded this read.
+            if not self._listening or epoch < self._floor:
+                return
+            if self._dropped.get(wallet_id, -1) > epoch:
+                return
+            notified = self._notified.get(wallet_id)
+            if notified is not None and notified[0] > balance["version"]:
+                return
+            self._entries[wallet_id] = (self._clock(), dict(balance))
+            self._entries.move_to_end(wallet_id)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def apply(self, payload: str) -> None:
+        """Handle one wallet_balance notification ("wallet_id:version,...")."""
+        with self._lock:
+            self._epoch += 1
+            for pair in payload.split(","):
+                wallet, _, version = pair.partition(":")
+                wallet_id, notified = UUID(wallet), int(version)
+                known = self._notified.get(wallet_id)
+                if known is None or notified > known[0]:
+                    self._notified[wallet_id] = (notified, self._epoch)
+                self._notified.move_to_end(wallet_id)
+                entry = self._entries.get(wallet_id)
+                if entry is not None and entry[1]["version"] < notified:
+                    del self._entries[wallet_id]
+                    _invalidations.add(1)
+            while len(self._notified) > max(settings.balance_cache_max_entries, 0):
+                _, (_, notified_at) = self._notified.popitem(last=False)
+                self._floor = max(self._floor, notified_at)
+
+    def invalidate(self, wallet_ids) -> None:
+        """Drop wallets whose balances a posting from this process just committed."""
+        with self._lock:
+            self._epoch += 1
+            for wallet_id in wallet_ids:
+                if self._entries.pop(wallet_id, None) is not None:
+                    _invalidations.add(1)
+                self._dropped[wallet_id] = self._epoch
+                self._dropped.move_to_end(wallet_id)
+            while len(self._dropped) > max(settings.balance_cache_max_entries, 0):
+                _, dropped_at = self._dropped.popitem(last=False)
+                self._floor = max(self._floor, dropped_at)
+
+    def stale(self, wallet_id: UUID) -> dict | None:
+        """Last cached balance with its staleness, if within stale_read_max_seconds."""
+        with self._lock:
+            entry = self._entries.get(wallet_id)
+            if entry is None:
+                return None
+            cached_at, balance = entry
+            staleness = self._clock() - max(cached_at, self._verified_at)
+        if staleness > settings.stale_read_max_seconds:
+            return None
+        _stale_served.add(1)
+        return {**balance, "stale_seconds": round(staleness, 3)}
+
+    def mark_listening(self) -> None:
+        """The listener (re)subscribed: anything cached before may have missed updates."""
+        with self._lock:
+            self._entries.clear()
+            self._notified.clear()
+            self._dropped.clear()
+            self._epoch += 1
+            self._floor = self._epoch
+            self._verified_at = self._clock()
+            self._listening = True
+
+    def heartbeat(self) -> None:
+        with self._lock:
+            if self._listening:
+                self._verified_at = self._clock()
+
+    def mark_lost(self) -> None:
+        # Entries stay for stale reads; they are no longer served as current.
+        with self._lock:
+            self._listening = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._notified.clear()
+            self._dropped.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+balance_cache = BalanceCache()
+
+
+class BalanceListener:
+    """Background thread applying wallet_balance notifications to a cache."""
+
+    def __init__(self, cache: BalanceCache) -> None:
+        self._cache = cache
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="balance-listener", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=settings.balance_cache_heartbeat_seconds * 2 + 1)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(
+                    settings.database_url,
+                    autocommit=True,
+                    connect_timeout=settings.db_connect_timeout_seconds,
+                ) as conn:
+                    conn.execute(f"LISTEN {CHANNEL}")
+                    self._cache.mark_listening()
+                    logger.info("balance cache listening for invalidations")
+                    self._listen(conn)
+            except psycopg.Error:
+                if not self._stop.is_set():
+                    _listener_disconnects.add(1)
+                    logger.warning("balance cache listener disconnected", exc_info=True)
+            self._cache.mark_lost()
+            self._stop.wait(settings.balance_cache_heartbeat_seconds)
+
+    def _listen(self, conn: psycopg.Connection) -> None:
+        while not self._stop.is_set():
+            for notify in conn.notifies(timeout=settings.balance_cache_heartbeat_seconds):
+                self._cache.apply(notify.payload)
+            # notifies() alone does not notice a silently dropped connection.
+            conn.execute("SELECT 1")
+            self._cache.heartbeat()
+
+
+_listener: BalanceListener | None = None
+
+
+def start_balance_listener() -> None:
+    global _listener
+    if _listener is not None or settings.balance_cache_max_entries <= 0:
+        return
+    _listener = BalanceListener(balance_cache)
+    _listener.start()
+
+
+def stop_balance_listener() -> None:
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
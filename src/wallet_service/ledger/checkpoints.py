@@ -0,0 +1,207 @@
+"""Seal per-wallet balance checkpoints so audits only sum recent entries.
+
+A checkpoint holds a wallet's journal sum for entries created before a
+horizon: the start of the oldest transaction open in the database when the
+batch began. Entries take created_at from their transaction's start, so every
+transaction that could still add one before the horizon has finished and the
+entries it covers are final. audit_balance() adds only the entries created at
+or after it, which keeps audits on the newest journal partitions. Resealing is
+incremental (previous checkpoint plus the entries between the two horizons);
+--full recomputes from the whole history and reports checkpoints that no
+longer match.
+
+Wallets are walked in wallet_id order, one committed batch at a time, and only
+those not sealed within --min-age seconds are picked up, so rerunning an
+interrupted pass with the same --min-age resumes where it stopped.
+
+    python -m wallet_service.ledger.checkpoints --min-age 3600
+"""
+
+import argparse
+import logging
+import time
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from psycopg import IsolationLevel
+
+from wallet_service.config import settings
+from wallet_service.db.database import TransactionPolicy, close_pool, run_transaction
+from wallet_service.logging_config import configure_logging
+from wallet_service.observability.metrics import meter
+from wallet_service.observability.otel import setup_otel
+
+logger = logging.getLogger(__name__)
+
+# READ COMMITTED: the sealing statement takes its snapshot after the horizon
+# was read, so every transaction that started before the horizon is visible.
+# Concurrent sealers are reconciled by the ON CONFLICT guard, which never
+# moves a checkpoint backwards.
+SEAL = TransactionPolicy(IsolationLevel.READ_COMMITTED)
+
+# Wallet ids sort after this, so it starts the keyset walk.
+_FIRST_WALLET = UUID(int=0)
+
+# Sessions of other roles show NULL columns unless this role has
+# pg_read_all_stats; their transactions cannot be seen, so sealing refuses.
+HORIZON_SQL = """
+    SELECT LEAST(NOW(), MIN(xact_start)) AS sealed_through,
+           COUNT(*) FILTER (WHERE usename IS NOT NULL AND backend_type IS NULL) AS hidden
+    FROM pg_stat_activity
+    WHERE datname = current_database() OR backend_type IS NULL
+"""
+
+SEAL_CHECKPOINTS_SQL = """
+    WITH batch AS (
+        SELECT a.wallet_id, a.asset, c.sealed_through AS prev_through, c.balance AS prev_balance
+        FROM accounts a
+        LEFT JOIN balance_checkpoints c ON c.wallet_id = a.wallet_id AND c.asset = a.asset
+        WHERE a.wallet_id > %(after)s
+          AND (c.sealed_at IS NULL OR c.sealed_at < NOW() - make_interval(secs => %(min_age)s))
+          AND (c.sealed_through IS NULL OR c.sealed_through <= %(through)s)
+        ORDER BY a.wallet_id
+        LIMIT %(limit)s
+    ),
+    sealed AS (
+        SELECT b.wallet_id, b.asset,
+               CASE WHEN b.prev_through IS NOT NULL THEN b.prev_balance + (
+                   SELECT COALESCE(SUM(e.amount), 0)
+                   FROM journal_entries e
+                   WHERE e.wallet_id = b.wallet_id AND e.asset = b.asset
+                     AND e.created_at >= b.prev_through AND e.created_at < %(through)s
+               ) END AS carried,
+               CASE WHEN b.prev_through IS NULL OR %(full)s THEN (
+                   SELECT COALESCE(SUM(e.amount), 0)
+                   FROM journal_entries e
+                   WHERE e.wallet_id = b.wallet_id AND e.asset = b.asset
+                     AND e.created_at < %(through)s
+               ) + COALESCE((
+                   SELECT f.balance
+                   FROM journal_carry_forward f
+                   WHERE f.wallet_id = b.wallet_id AND f.asset = b.asset
+               ), 0) END AS recomputed
+        FROM batch b
+    ),
+    upserted AS (
+        INSERT INTO balance_checkpoints(wallet_id, asset, sealed_through, balance)
+        SELECT wallet_id, asset, %(through)s, COALESCE(recomputed, carried)
+        FROM sealed
+        ON CONFLICT (wallet_id, asset) DO UPDATE
+        SET sealed_through = EXCLUDED.sealed_through,
+            balance = EXCLUDED.balance,
+            sealed_at = NOW()
+        WHERE balance_checkpoints.sealed_through <= EXCLUDED.sealed_through
+    )
+    SELECT wallet_id, COALESCE(carried <> recomputed, FALSE) AS mismatched
+    FROM sealed
+    ORDER BY wallet_id
+"""
+
+_sealed = meter.create_counter(
+    "wallet.checkpoints.sealed",
+    description="Balance checkpoints sealed or advanced",
+)
+_mismatches = meter.create_counter(
+    "wallet.checkpoints.mismatches",
+    description="Checkpoints whose carried balance differed from a full recompute",
+)
+
+
+@dataclass
+class CheckpointRun:
+    sealed: int = 0
+    mismatched: list[UUID] = field(default_factory=list)
+    last_wallet_id: UUID | None = None
+
+
+def seal_batch(
+    after: UUID, *, min_age_seconds: float, limit: int, full: bool = False
+) -> list[tuple[UUID, bool]]:
+    """Seal the next batch of wallets after `after`. Returns (wallet_id, mismatched) rows."""
+    params = {"after": after, "min_age": min_age_seconds, "limit": limit, "full": full}
+
+    def seal(conn) -> list[tuple[UUID, bool]]:
+        through, hidden = conn.execute(HORIZON_SQL, prepare=True).fetchone()
+        if hidden:
+            raise RuntimeError(
+                "cannot see every session's transaction start; "
+                "seal as the service role or grant pg_read_all_stats"
+            )
+        return conn.execute(
+            SEAL_CHECKPOINTS_SQL, {**params, "through": through}, prepare=True
+        ).fetchall()
+
+    rows = run_transaction("seal_checkpoints", seal, SEAL)
+    _sealed.add(len(rows))
+    return rows
+
+
+def seal_checkpoints(
+    *,
+    min_age_seconds: float | None = None,
+    batch_size: int | None = None,
+    full: bool = False,
+) -> CheckpointRun:
+    """Seal every wallet whose checkpoint is missing or older than min_age_seconds."""
+    min_age = settings.checkpoint_min_age_seconds if min_age_seconds is None else min_age_seconds
+    limit = batch_size or settings.checkpoint_batch_size
+    run = CheckpointRun()
+    after = _FIRST_WALLET
+    started = time.monotonic()
+    while True:
+        rows = seal_batch(after, min_age_seconds=min_age, limit=limit, full=full)
+        if not rows:
+            break
+        mismatched = [wallet_id for wallet_id, drifted in rows if drifted]
+        if mismatched:
+            _mismatches.add(len(mismatched))
+            logger.warning(
+                "checkpoint mismatch", extra={"wallet_ids": [str(w) for w in mismatched]}
+            )
+        run.sealed += len(rows)
+        run.mismatched.extend(mismatched)
+        after = run.last_wallet_id = rows[-1][0]
+        logger.info(
+            "checkpoint batch sealed",
+            extra={
+                "sealed": run.sealed,
+                "last_wallet_id": str(after),
+                "wallets_per_second": round(run.sealed / (time.monotonic() - started), 1),
+            },
+        )
+        if len(rows) < limit:
+            break
+    return run
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Seal per-wallet balance checkpoints.")
+    parser.add_argument(
+        "--min-age",
+        type=float,
+        default=settings.checkpoint_min_age_seconds,
+        help="Skip wallets sealed within this many seconds (0 reseals everything)",
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.checkpoint_batch_size)
+    parser.add_argument(
+        "--full", action="store_true", help="Recompute from the whole journal and verify"
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    setup_otel()
+    try:
+        run = seal_checkpoints(
+            min_age_seconds=args.min_age, batch_size=args.batch_size, full=args.full
+        )
+    finally:
+        close_pool()
+    logger.info(
+        "checkpoints sealed", extra={"sealed": run.sealed, "mismatched": len(run.mismatched)}
+    )
+    if run.mismatched:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,678 @@
+"""Ledger model, posting planning and row mapping shared by the sync and async services.
+
+Nothing here talks to the database: the services run the statements in
+wallet_service.ledger.sql and hand the rows to these helpers, so both paths
+hash payloads, plan batches and map results the same way.
+"""
+
+import base64
+import hashlib
+import itertools
+import json
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from uuid import UUID
+
+import psycopg
+
+from wallet_service.config import settings
+from wallet_service.domain.errors import (
+    ConflictError,
+    NotFoundError,
+    ServiceUnavailableError,
+    ValidationError,
+)
+from wallet_service.ledger.balance_cache import balance_cache
+from wallet_service.ledger.replay_cache import IDEMPOTENCY_CONFLICT, replay_cache
+from wallet_service.ledger.sql import (
+    AUDIT_BALANCE_SQL,
+    AUDIT_CHECKPOINT_BALANCE_SQL,
+    AUDIT_SYSTEM_BALANCE_SQL,
+    AUDIT_SYSTEM_CHECKPOINT_BALANCE_SQL,
+    INSERT_BATCH_OUTBOX_SQL,
+    UPDATE_BATCH_ACCOUNTS_SQL,
+    UPDATE_BATCH_PROJECTIONS_SQL,
+)
+from wallet_service.observability import prometheus
+
+
+@dataclass(frozen=True, slots=True)
+class JournalEntry:
+    account_id: UUID
+    amount: Decimal
+    asset: str
+
+
+# Field order is the response's (wallet_service.api.responses); committed
+# transactions are immutable and may be shared through the replay cache.
+@dataclass(frozen=True, slots=True)
+class LedgerTransaction:
+    transaction_id: UUID
+    operation_scope: str
+    idempotency_key: str
+    payload_hash: str
+    status: str
+    created_at: datetime
+    external_reference: str | None
+    entries: list[JournalEntry]
+
+
+@dataclass
+class JournalPosting:
+    """A validated journal write, shared by the sync and async ledger paths."""
+
+    operation_scope: str
+    idempotency_key: str
+    payload: dict
+    payload_hash: str
+    external_reference: str | None
+    event_type: str
+    # (wallet_id, signed amount, asset, expected account version) per leg.
+    legs: list[tuple[UUID, Decimal, str, int | None]]
+
+
+@dataclass
+class BatchItemResult:
+    """Outcome of one item of a transfer batch, in request order."""
+
+    idempotency_key: str
+    # committed | replayed | failed | aborted (valid, but its atomic batch failed)
+    status: str
+    transaction: LedgerTransaction | None = None
+    error: Exception | None = None
+
+
+@dataclass
+class BatchPlan:
+    results: list[BatchItemResult]
+    # (index into results, posting) for every item that will be written.
+    postings: list[tuple[int, JournalPosting]] = field(default_factory=list)
+    # Final version, balance delta and asset per touched account.
+    versions: dict[UUID, int] = field(default_factory=dict)
+    deltas: dict[UUID, Decimal] = field(default_factory=dict)
+    assets: dict[UUID, str] = field(default_factory=dict)
+
+
+_LEDGER_SQLSTATE_ERRORS: dict[str, type[Exception]] = {
+    "WL404": NotFoundError,
+    "WL409": ConflictError,
+}
+
+# Message of the WL409 post_journal_transaction() raises for a stale expected version.
+VERSION_CONFLICT = "optimistic version conflict"
+
+# Provisioned stripe wallet ids keyed by (system_wallet_id, stripe count).
+provisioned_stripes: dict[tuple[str, int], list[UUID]] = {}
+_stripe_cursor = itertools.count()
+
+
+def hash_payload(payload: dict) -> str:
+    normalized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def ensure_balanced(entries: list[tuple[UUID, Decimal, str]]) -> None:
+    if len(entries) < 2:
+        raise ValidationError("at least two journal entries required")
+    total = Decimal(0)
+    asset = None
+    for _, amount, entry_asset in entries:
+        if amount == 0:
+            raise ValidationError("journal entry amount cannot be zero")
+        total += amount
+        asset = asset or entry_asset
+        if entry_asset != asset:
+            raise ValidationError("all entries in a transaction must have the same asset")
+    if total != 0:
+        raise ValidationError("double-entry violation: sum(entries.amount) != 0")
+
+
+def system_stripe_key() -> tuple[str, int]:
+    return settings.system_wallet_id, settings.system_wallet_stripes
+
+
+def _pick_system_stripe(stripes: list[UUID], idempotency_key: str) -> UUID:
+    # Hashing the idempotency key keeps a replayed request on the same stripe.
+    if settings.system_wallet_stripe_strategy == "round_robin":
+        index = next(_stripe_cursor)
+    else:
+        index = zlib.crc32(idempotency_key.encode("utf-8"))
+    return stripes[index % len(stripes)]
+
+
+def is_system_wallet(wallet_id: UUID) -> bool:
+    return wallet_id == UUID(settings.system_wallet_id)
+
+
+def wallet_from_row(row) -> dict:
+    return {
+        "wallet_id": row[0],
+        "asset": row[1],
+        "version": row[2],
+        "created_at": row[3],
+    }
+
+
+def bulk_wallet_params(wallets: list[tuple[UUID, str]], created_at: datetime) -> dict:
+    wallet_ids = [wallet_id for wallet_id, _ in wallets]
+    if len(set(wallet_ids)) != len(wallet_ids):
+        raise ValidationError("duplicate wallet_id in bulk request")
+    return {
+        "wallet_ids": wallet_ids,
+        "assets": [asset for _, asset in wallets],
+        "created_at": created_at,
+    }
+
+
+def bulk_wallet_result(wallets: list[tuple[UUID, str]], created_rows) -> dict:
+    created = {row[0] for row in created_rows}
+    return {
+        "created": [wallet_id for wallet_id, _ in wallets if wallet_id in created],
+        "existing": [wallet_id for wallet_id, _ in wallets if wallet_id not in created],
+    }
+
+
+def balance_from_row(row) -> dict:
+    if not row:
+        raise NotFoundError("wallet not found")
+    return {
+        "wallet_id": row[0],
+        "asset": row[1],
+        "balance": row[2],
+        "version": row[3],
+        "as_of": row[4],
+    }
+
+
+def audit_from_row(row) -> dict:
+    if not row:
+        raise NotFoundError("wallet not found")
+    return {"wallet_id": row[0], "asset": row[1], "balance": row[2]}
+
+
+_EARLIEST = datetime.min.replace(tzinfo=UTC)
+_LATEST = datetime.max.replace(tzinfo=UTC)
+_LAST_ENTRY_ID = UUID(int=2**128 - 1)
+_UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def created_at_range(transaction_id: UUID) -> dict:
+    """Bounds on a transaction's created_at, as SELECT_TRANSACTION_SQL parameters.
+
+    Transaction ids are UUIDv7 carrying created_at to the millisecond, which
+    pins a lookup to one journal partition. Ids assigned before partitioning
+    are random; those rows all live in the legacy partition, but nothing in
+    the id says so and every attached partition's primary key is probed.
+    """
+    if transaction_id.version != 7:
+        return {
+            "transaction_id": transaction_id,
+            "created_from": _EARLIEST,
+            "created_until": _LATEST,
+        }
+    created_from = _UNIX_EPOCH + timedelta(milliseconds=transaction_id.int >> 80)
+    return {
+        "transaction_id": transaction_id,
+        "created_from": created_from,
+        "created_until": created_from + timedelta(milliseconds=1),
+    }
+
+
+def _encode_entry_cursor(created_at: datetime, entry_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{entry_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_entry_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, entry_id = raw.split("|")
+        return _as_utc(datetime.fromisoformat(created_at)), UUID(entry_id)
+    except ValueError as exc:
+        raise ValidationError("invalid cursor") from exc
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive filter bounds are taken as UTC rather than the session time zone.
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def entries_params(
+    wallet_id: UUID, cursor: str | None, since: datetime | None, until: datetime | None, limit: int
+) -> dict:
+    before_at, before_id = _decode_entry_cursor(cursor) if cursor else (_LATEST, _LAST_ENTRY_ID)
+    return {
+        "wallet_id": wallet_id,
+        "since": _as_utc(since) if since else _EARLIEST,
+        "until": _as_utc(until) if until else _LATEST,
+        "before_at": before_at,
+        "before_id": before_id,
+        # One extra row tells whether another page follows.
+        "limit": limit + 1,
+    }
+
+
+def entries_page(wallet_id: UUID, rows, limit: int) -> dict:
+    if not rows:
+        raise NotFoundError("wallet not found")
+    entries = [
+        {
+            "entry_id": row[1],
+            "transaction_id": row[2],
+            "seq": row[3],
+            "amount": row[4],
+            "created_at": row[5],
+        }
+        for row in rows
+        if row[1] is not None
+    ]
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = _encode_entry_cursor(entries[-1]["created_at"], entries[-1]["entry_id"])
+    return {
+        "wallet_id": wallet_id,
+        "asset": rows[0][0],
+        "entries": entries,
+        "next_cursor": next_cursor,
+    }
+
+
+def _transaction_from_rows(tx, entries) -> LedgerTransaction:
+    return LedgerTransaction(
+        transaction_id=tx[0],
+        operation_scope=tx[1],
+        idempotency_key=tx[2],
+        payload_hash=tx[3],
+        status=tx[4],
+        created_at=tx[5],
+        external_reference=tx[6],
+        entries=[JournalEntry(*row) for row in entries],
+    )
+
+
+def transaction_from_journal_rows(rows) -> LedgerTransaction:
+    # post_journal_transaction() and SELECT_TRANSACTION_SQL repeat the header on
+    # every entry row.
+    return _transaction_from_rows(rows[0][:7], [row[7:10] for row in rows])
+
+
+def posting_params(posting: JournalPosting) -> tuple:
+    return (
+        posting.operation_scope,
+        posting.idempotency_key,
+        posting.payload_hash,
+        posting.external_reference,
+        posting.event_type,
+        json.dumps(posting.payload),
+        [wallet_id for wallet_id, _, _, _ in posting.legs],
+        [amount for _, amount, _, _ in posting.legs],
+        [asset for _, _, asset, _ in posting.legs],
+        [expected_version for _, _, _, expected_version in posting.legs],
+    )
+
+
+def raise_ledger_error(exc: psycopg.Error) -> None:
+    """Translate SQLSTATEs raised by post_journal_transaction() into domain errors."""
+    error = _LEDGER_SQLSTATE_ERRORS.get(exc.sqlstate or "")
+    if error is not None:
+        raise error(exc.diag.message_primary) from exc
+
+
+def transfer_posting(
+    *,
+    idempotency_key: str,
+    from_wallet_id: UUID,
+    to_wallet_id: UUID,
+    amount: Decimal,
+    asset: str,
+    external_reference: str | None,
+    expected_from_version: int | None,
+    expected_to_version: int | None,
+) -> JournalPosting:
+    if from_wallet_id == to_wallet_id:
+        raise ValidationError("from_wallet_id and to_wallet_id must differ")
+
+    payload = {
+        "from_wallet_id": str(from_wallet_id),
+        "to_wallet_id": str(to_wallet_id),
+        "amount": str(amount),
+        "asset": asset,
+        "external_reference": external_reference,
+        "expected_from_version": expected_from_version,
+        "expected_to_version": expected_to_version,
+    }
+    entries = [
+        (from_wallet_id, -amount, asset),
+        (to_wallet_id, amount, asset),
+    ]
+    ensure_balanced(entries)
+    return JournalPosting(
+        operation_scope="transfer",
+        idempotency_key=idempotency_key,
+        payload=payload,
+        payload_hash=hash_payload(payload),
+        external_reference=external_reference,
+        event_type="wallet.transfer.committed",
+        legs=[
+            (from_wallet_id, -amount, asset, expected_from_version),
+            (to_wallet_id, amount, asset, expected_to_version),
+        ],
+    )
+
+
+def fanout_posting(
+    *,
+    idempotency_key: str,
+    from_wallet_id: UUID,
+    credits: list[tuple[UUID, Decimal, int | None]],
+    asset: str,
+    external_reference: str | None,
+    expected_from_version: int | None,
+) -> JournalPosting:
+    if not credits:
+        raise ValidationError("at least one credit leg required")
+    expected_versions: dict[UUID, int | None] = {}
+    for to_wallet_id, _, expected_to_version in credits:
+        if to_wallet_id == from_wallet_id:
+            raise ValidationError("from_wallet_id cannot also be credited")
+        if expected_versions.setdefault(to_wallet_id, expected_to_version) != expected_to_version:
+            raise ValidationError("conflicting expected versions for the same wallet")
+
+    payload = {
+        "from_wallet_id": str(from_wallet_id),
+        "credits": [
+            {
+                "to_wallet_id": str(to_wallet_id),
+                "amount": str(amount),
+                "expected_to_version": version,
+            }
+            for to_wallet_id, amount, version in credits
+        ],
+        "asset": asset,
+        "external_reference": external_reference,
+        "expected_from_version": expected_from_version,
+    }
+    total = sum((amount for _, amount, _ in credits), Decimal(0))
+    entries = [(from_wallet_id, -total, asset)]
+    entries += [(to_wallet_id, amount, asset) for to_wallet_id, amount, _ in credits]
+    ensure_balanced(entries)
+    return JournalPosting(
+        operation_scope="fanout",
+        idempotency_key=idempotency_key,
+        payload=payload,
+        payload_hash=hash_payload(payload),
+        external_reference=external_reference,
+        event_type="wallet.fanout.committed",
+        # post_journal_transaction() sums legs per wallet, so the source and any
+        # repeated target are locked and versioned once for the whole posting.
+        legs=[(from_wallet_id, -total, asset, expected_from_version)]
+        + [(to_wallet_id, amount, asset, version) for to_wallet_id, amount, version in credits],
+    )
+
+
+def adjustment_posting(
+    *,
+    idempotency_key: str,
+    wallet_id: UUID,
+    amount: Decimal,
+    direction: str,
+    asset: str,
+    reason: str,
+    expected_wallet_version: int | None,
+    system_stripes: list[UUID],
+) -> JournalPosting:
+    sign = Decimal(1) if direction == "credit" else Decimal(-1)
+    system_wallet_id = _pick_system_stripe(system_stripes, idempotency_key)
+
+    payload = {
+        "wallet_id": str(wallet_id),
+        "amount": str(amount),
+        "direction": direction,
+        "asset": asset,
+        "reason": reason,
+        "expected_wallet_version": expected_wallet_version,
+    }
+    wallet_delta = amount * sign
+    entries = [
+        (wallet_id, wallet_delta, asset),
+        (system_wallet_id, -wallet_delta, asset),
+    ]
+    ensure_balanced(entries)
+    return JournalPosting(
+        operation_scope="adjustment",
+        idempotency_key=idempotency_key,
+        payload=payload,
+        payload_hash=hash_payload(payload),
+        external_reference=reason,
+        event_type="wallet.adjustment.committed",
+        legs=[
+            (wallet_id, wallet_delta, asset, expected_wallet_version),
+            (system_wallet_id, -wallet_delta, asset, None),
+        ],
+    )
+
+
+def transfer_batch_postings(transfers: list[dict]) -> list[tuple[str, JournalPosting | Exception]]:
+    """Validate every batch item up front; invalid items carry their error."""
+    seen: set[str] = set()
+    postings: list[tuple[str, JournalPosting | Exception]] = []
+    for item in transfers:
+        key = item["idempotency_key"]
+        try:
+            if key in seen:
+                raise ValidationError("duplicate idempotency key in batch")
+            seen.add(key)
+            postings.append((key, transfer_posting(**item)))
+        except ValidationError as exc:
+            postings.append((key, exc))
+    return postings
+
+
+def transactions_by_key(rows) -> dict[str, LedgerTransaction]:
+    return {
+        key: transaction_from_journal_rows(list(group))
+        for key, group in itertools.groupby(rows, key=lambda row: row[2])
+    }
+
+
+def batch_wallet_ids(postings, existing: dict[str, LedgerTransaction]) -> list[UUID]:
+    return sorted(
+        {
+            wallet_id
+            for key, posting in postings
+            if isinstance(posting, JournalPosting) and key not in existing
+            for wallet_id, _, _, _ in posting.legs
+        }
+    )
+
+
+def _batch_leg_error(posting: JournalPosting, assets: dict[UUID, str], versions: dict[UUID, int]):
+    # Checked in the same order post_journal_transaction() raises them.
+    if any(wallet_id not in assets for wallet_id, _, _, _ in posting.legs):
+        return NotFoundError("wallet not found")
+    if any(
+        expected is not None and versions[wallet_id] != expected
+        for wallet_id, _, _, expected in posting.legs
+    ):
+        return ConflictError(VERSION_CONFLICT)
+    if any(assets[wallet_id] != asset for wallet_id, _, asset, _ in posting.legs):
+        return NotFoundError("projection row not found")
+    return None
+
+
+def plan_transfer_batch(postings, existing, account_rows, atomic: bool) -> BatchPlan:
+    """Decide every item's outcome against the locked accounts, in request order.
+
+    Items apply sequentially, so an expected version refers to the account as
+    left by the earlier items of the same batch, exactly as if each had been
+    posted on its own.
+    """
+    plan = BatchPlan(results=[])
+    plan.assets = {row[0]: row[1] for row in account_rows}
+    plan.versions = {row[0]: row[2] for row in account_rows}
+    for key, posting in postings:
+        if isinstance(posting, Exception):
+            plan.results.append(BatchItemResult(key, "failed", error=posting))
+            continue
+        replay = existing.get(key)
+        if replay is not None:
+            if replay.payload_hash != posting.payload_hash:
+                error = ConflictError(IDEMPOTENCY_CONFLICT)
+                plan.results.append(BatchItemResult(key, "failed", error=error))
+            elif replay.status is None:
+                error = ConflictError("idempotency key refers to a detached transaction")
+                plan.results.append(BatchItemResult(key, "failed", error=error))
+            else:
+                plan.results.append(BatchItemResult(key, "replayed", transaction=replay))
+            continue
+        error = _batch_leg_error(posting, plan.assets, plan.versions)
+        if error is not None:
+            plan.results.append(BatchItemResult(key, "failed", error=error))
+            continue
+        for wallet_id, amount, _, _ in posting.legs:
+            plan.versions[wallet_id] += 1
+            plan.deltas[wallet_id] = plan.deltas.get(wallet_id, Decimal(0)) + amount
+        plan.postings.append((len(plan.results), posting))
+        plan.results.append(BatchItemResult(key, "committed"))
+
+    if atomic and any(result.status == "failed" for result in plan.results):
+        for index, _ in plan.postings:
+            plan.results[index].status = "aborted"
+        plan.postings = []
+    return plan
+
+
+def batch_transaction_params(plan: BatchPlan) -> tuple:
+    postings = [posting for _, posting in plan.postings]
+    return (
+        [posting.operation_scope for posting in postings],
+        [posting.idempotency_key for posting in postings],
+        [posting.payload_hash for posting in postings],
+        [posting.external_reference for posting in postings],
+    )
+
+
+def batch_transaction_ids(plan: BatchPlan, created_rows) -> list[UUID]:
+    # Keys are unique within a batch; rows come back as (key, id, created_at).
+    ids = {key: transaction_id for key, transaction_id, _ in created_rows}
+    return [ids[posting.idempotency_key] for _, posting in plan.postings]
+
+
+def batch_entry_params(plan: BatchPlan, transaction_ids: list[UUID]) -> tuple:
+    postings = [posting for _, posting in plan.postings]
+    legs = [
+        (transaction_id, seq, leg)
+        for transaction_id, posting in zip(transaction_ids, postings)
+        for seq, leg in enumerate(posting.legs, start=1)
+    ]
+    return (
+        [transaction_id for transaction_id, _, _ in legs],
+        [seq for _, seq, _ in legs],
+        [leg[0] for _, _, leg in legs],
+        [leg[1] for _, _, leg in legs],
+        [leg[2] for _, _, leg in legs],
+    )
+
+
+def batch_update_params(plan: BatchPlan, transaction_ids: list[UUID]) -> list[tuple[str, tuple]]:
+    wallet_ids = sorted(plan.deltas)
+    versions = [plan.versions[wallet_id] for wallet_id in wallet_ids]
+    postings = [posting for _, posting in plan.postings]
+    return [
+        (UPDATE_BATCH_ACCOUNTS_SQL, (wallet_ids, versions)),
+        (
+            UPDATE_BATCH_PROJECTIONS_SQL,
+            (
+                wallet_ids,
+                [plan.assets[wallet_id] for wallet_id in wallet_ids],
+                [plan.deltas[wallet_id] for wallet_id in wallet_ids],
+                versions,
+            ),
+        ),
+        (
+            INSERT_BATCH_OUTBOX_SQL,
+            (
+                transaction_ids,
+                [posting.event_type for posting in postings],
+                [json.dumps(posting.payload) for posting in postings],
+            ),
+        ),
+    ]
+
+
+def batch_results(
+    plan: BatchPlan, transaction_ids, created_rows, entry_rows
+) -> list[BatchItemResult]:
+    created_at = {transaction_id: created for _, transaction_id, created in created_rows}
+    entries: dict[UUID, list] = {}
+    for transaction_id, seq, wallet_id, amount, asset in sorted(entry_rows, key=lambda row: row[1]):
+        entries.setdefault(transaction_id, []).append((wallet_id, amount, asset))
+    for transaction_id, (index, posting) in zip(transaction_ids, plan.postings):
+        header = (
+            transaction_id,
+            posting.operation_scope,
+            posting.idempotency_key,
+            posting.payload_hash,
+            "committed",
+            created_at[transaction_id],
+            posting.external_reference,
+        )
+        plan.results[index].transaction = _transaction_from_rows(header, entries[transaction_id])
+    return plan.results
+
+
+def invalidate_balances(transactions: list[LedgerTransaction]) -> None:
+    # The listener's NOTIFY arrives later; until then a read on this replica
+    # would be answered with the balance and version the posting replaced.
+    balance_cache.invalidate({entry.account_id for tx in transactions for entry in tx.entries})
+
+
+def cache_batch_results(results: list[BatchItemResult]) -> None:
+    for result in results:
+        if result.transaction is not None:
+            replay_cache.store(result.transaction)
+
+
+def record_posting(operation: str, replayed: str | None, started: float) -> None:
+    """Count a committed or replayed posting; replayed names where the replay came from."""
+    if replayed is None:
+        prometheus.postings.labels(operation).inc()
+    else:
+        prometheus.idempotent_replays.labels(operation, replayed).inc()
+    prometheus.posting_duration.labels(operation).observe(time.perf_counter() - started)
+
+
+def record_posting_conflict(operation: str, exc: ConflictError) -> None:
+    if str(exc) == VERSION_CONFLICT:
+        prometheus.version_conflicts.labels(operation).inc()
+    elif str(exc) == IDEMPOTENCY_CONFLICT:
+        prometheus.idempotency_conflicts.labels(operation).inc()
+
+
+def record_batch_results(results: list[BatchItemResult]) -> None:
+    for result in results:
+        if result.status == "committed":
+            prometheus.postings.labels("transfer").inc()
+        elif result.status == "replayed":
+            prometheus.idempotent_replays.labels("transfer", "database").inc()
+        elif isinstance(result.error, ConflictError):
+            record_posting_conflict("transfer", result.error)
+
+
+def stale_balance(wallet_id: UUID, exc: ServiceUnavailableError) -> dict:
+    # CP by default: only an explicit opt-in trades freshness for availability.
+    if settings.allow_stale_reads:
+        stale = balance_cache.stale(wallet_id)
+        if stale is not None:
+            return stale
+    raise exc
+
+
+def audit_sql(wallet_id: UUID, full: bool) -> str:
+    if is_system_wallet(wallet_id):
+        return AUDIT_SYSTEM_BALANCE_SQL if full else AUDIT_SYSTEM_CHECKPOINT_BALANCE_SQL
+    return AUDIT_BALANCE_SQL if full else AUDIT_CHECKPOINT_BALANCE_SQL
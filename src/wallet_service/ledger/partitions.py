@@ -0,0 +1,217 @@
+"""Monthly partition maintenance for the journal tables.
+
+journal_transactions, journal_entries and outbox_events are range-partitioned
+by created_at, one partition per UTC month (migration 010). Each run creates
+the partitions for the next --ahead months, so postings never hit a missing
+range, and detaches every month that ended more than --retain months ago.
+
+A month is detached in one transaction, together with its entries' per-wallet
+sums: those are added to journal_carry_forward, and checkpoints sealed before
+the month ended are advanced past it, so audits and reconciliation still see
+the full history. Detached tables are left in place for
+wallet_service.ledger.archive. A month whose outbox still has pending events
+is kept, and so is every later one.
+
+    python -m wallet_service.ledger.partitions --ahead 3 --retain 13
+"""
+
+import argparse
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from psycopg import IsolationLevel, sql
+
+from wallet_service.config import settings
+from wallet_service.db.database import TransactionPolicy, close_pool, run_transaction
+from wallet_service.logging_config import configure_logging
+from wallet_service.observability.metrics import meter
+from wallet_service.observability.otel import setup_otel
+
+logger = logging.getLogger(__name__)
+
+MAINTAIN = TransactionPolicy(IsolationLevel.READ_COMMITTED)
+
+ENSURE_PARTITIONS_SQL = "SELECT ensure_journal_partitions(%s)"
+
+# Partitions of journal_transactions, oldest first, with their upper bound;
+# the entries and outbox partitions of a month share the name suffix.
+EXPIRED_PARTITIONS_SQL = r"""
+    SELECT substr(c.relname, length('journal_transactions') + 1) AS suffix, b.upper_bound
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    CROSS JOIN LATERAL (
+        SELECT (
+            regexp_match(pg_get_expr(c.relpartbound, c.oid), 'TO \(''([^'']+)''\)')
+        )[1]::timestamptz AS upper_bound
+    ) b
+    WHERE i.inhparent = 'journal_transactions'::regclass
+      AND b.upper_bound <= (
+          date_trunc('month', NOW() AT TIME ZONE 'UTC') - make_interval(months => %s)
+      ) AT TIME ZONE 'UTC'
+    ORDER BY b.upper_bound
+"""
+
+PENDING_OUTBOX_SQL = "SELECT EXISTS (SELECT 1 FROM {outbox} WHERE processed_at IS NULL)"
+
+CARRY_FORWARD_SQL = """
+    INSERT INTO journal_carry_forward(wallet_id, asset, balance, detached_through)
+    SELECT wallet_id, asset, SUM(amount), %(through)s
+    FROM {entries}
+    GROUP BY wallet_id, asset
+    ON CONFLICT (wallet_id, asset) DO UPDATE
+    SET balance = journal_carry_forward.balance + EXCLUDED.balance,
+        detached_through = EXCLUDED.detached_through
+"""
+
+# Older months are already gone, so a checkpoint's missing entries between its
+# horizon and the end of this month are all in this partition.
+ADVANCE_CHECKPOINTS_SQL = """
+    UPDATE balance_checkpoints c
+    SET balance = c.balance + COALESCE((
+            SELECT SUM(e.amount)
+            FROM {entries} e
+            WHERE e.wallet_id = c.wallet_id AND e.asset = c.asset
+              AND e.created_at >= c.sealed_through
+        ), 0),
+        sealed_through = %(through)s
+    WHERE c.sealed_through < %(through)s
+"""
+
+_created = meter.create_counter(
+    "wallet.journal.partitions.created",
+    description="Monthly journal partitions created ahead of time",
+)
+_detached = meter.create_counter(
+    "wallet.journal.partitions.detached",
+    description="Journal months detached after the retention window",
+)
+
+
+@dataclass
+class PartitionRun:
+    created: list[str] = field(default_factory=list)
+    detached: list[str] = field(default_factory=list)
+    # Expired month kept because its outbox still has pending events.
+    blocked: str | None = None
+
+
+def ensure_partitions(months_ahead: int | None = None) -> list[str]:
+    """Create any missing monthly partitions up to months_ahead. Returns their names."""
+    ahead = settings.journal_partition_months_ahead if months_ahead is None else months_ahead
+    rows = run_transaction(
+        "ensure_journal_partitions",
+        lambda conn: conn.execute(ENSURE_PARTITIONS_SQL, (ahead,), prepare=True).fetchall(),
+        MAINTAIN,
+    )
+    created = [row[0] for row in rows]
+    _created.add(len(created))
+    if created:
+        logger.info("journal partitions created", extra={"partitions": created})
+    return created
+
+
+def detach_month(suffix: str, through: datetime) -> bool:
+    """Detach one month from all three tables. False if its outbox is not drained."""
+    transactions, entries, outbox = (
+        sql.Identifier(table + suffix)
+        for table in ("journal_transactions", "journal_entries", "outbox_events")
+    )
+
+    def detach(conn) -> bool:
+        # DETACH needs an exclusive lock on each parent; give up rather than
+        # queue every posting behind a long-running reader.
+        conn.execute(
+            "SELECT set_config('lock_timeout', %s, true)",
+            (f"{int(settings.journal_detach_lock_timeout_seconds * 1000)}ms",),
+        )
+        if conn.execute(sql.SQL(PENDING_OUTBOX_SQL).format(outbox=outbox)).fetchone()[0]:
+            return False
+        params = {"through": through}
+        conn.execute(sql.SQL(CARRY_FORWARD_SQL).format(entries=entries), params)
+        conn.execute(sql.SQL(ADVANCE_CHECKPOINTS_SQL).format(entries=entries), params)
+        # Referencing partitions first: their foreign keys point at transactions.
+        for parent, child in (
+            ("outbox_events", outbox),
+            ("journal_entries", entries),
+            ("journal_transactions", transactions),
+        ):
+            conn.execute(
+                sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(sql.Identifier(parent), child)
+            )
+        # A detached table keeps its copy of the parent's foreign key, which
+        # now points at transactions the parent no longer holds.
+        for child, constraint in (
+            (outbox, "outbox_events_transaction_fkey"),
+            (entries, "journal_entries_transaction_fkey"),
+        ):
+            conn.execute(
+                sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(
+                    child, sql.Identifier(constraint)
+                )
+            )
+        return True
+
+    return run_transaction("detach_journal_month", detach, MAINTAIN)
+
+
+def maintain_partitions(
+    *, months_ahead: int | None = None, retain_months: int | None = None
+) -> PartitionRun:
+    """Create upcoming partitions, then detach expired months oldest first."""
+    retain = settings.journal_retention_months if retain_months is None else retain_months
+    run = PartitionRun(created=ensure_partitions(months_ahead))
+    expired = run_transaction(
+        "expired_journal_partitions",
+        lambda conn: conn.execute(EXPIRED_PARTITIONS_SQL, (retain,)).fetchall(),
+        MAINTAIN,
+    )
+    for suffix, through in expired:
+        # Checkpoint and carry-forward arithmetic assume months leave in order.
+        if not detach_month(suffix, through):
+            run.blocked = suffix
+            logger.warning(
+                "journal month has pending outbox events; not detached",
+                extra={"partition": suffix, "through": through.isoformat()},
+            )
+            break
+        run.detached.append(suffix)
+        _detached.add(1)
+        logger.info(
+            "journal month detached", extra={"partition": suffix, "through": through.isoformat()}
+        )
+    return run
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Create and detach monthly journal partitions.")
+    parser.add_argument(
+        "--ahead",
+        type=int,
+        default=settings.journal_partition_months_ahead,
+        help="Months of partitions to keep created ahead of the current one",
+    )
+    parser.add_argument(
+        "--retain",
+        type=int,
+        default=settings.journal_retention_months,
+        help="Detach months that ended more than this many months ago",
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    setup_otel()
+    try:
+        run = maintain_partitions(months_ahead=args.ahead, retain_months=args.retain)
+    finally:
+        close_pool()
+    logger.info(
+        "journal partitions maintained",
+        extra={"partitions_created": len(run.created), "months_detached": len(run.detached)},
+    )
+    if run.blocked is not None:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
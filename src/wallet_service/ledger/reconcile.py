@@ -0,0 +1,219 @@
+"""Fleet-wide reconciliation of balance_projections against the journal.
+
+The wallet_id keyspace is cut into contiguous ranges that a process pool works
+through in parallel. Every worker reads inside the same exported snapshot, so
+the whole fleet is compared as of one instant even while postings continue,
+and streams its range through a server-side cursor instead of materialising
+it. Journal balances come from the latest checkpoint plus later entries, or
+from a full per-range aggregate (plus sums carried forward from detached
+journal partitions) with --full.
+
+    python -m wallet_service.ledger.reconcile --workers 8 --report drift.csv
+"""
+
+import argparse
+import csv
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from decimal import Decimal
+from multiprocessing import get_context
+from typing import TextIO
+from uuid import UUID
+
+import psycopg
+from psycopg import IsolationLevel, sql
+
+from wallet_service.config import settings
+from wallet_service.ledger.sql import CHECKPOINT_BALANCE_EXPR
+from wallet_service.logging_config import configure_logging
+from wallet_service.observability.metrics import meter
+from wallet_service.observability.otel import setup_otel
+
+logger = logging.getLogger(__name__)
+
+_RANGE_FILTER = "{col} >= %(lo)s AND (%(hi)s::uuid IS NULL OR {col} < %(hi)s)"
+
+RECONCILE_SQL = f"""
+    SELECT a.wallet_id, a.asset, p.balance, {CHECKPOINT_BALANCE_EXPR} AS journal
+    FROM accounts a
+    LEFT JOIN balance_projections p ON p.wallet_id = a.wallet_id AND p.asset = a.asset
+    LEFT JOIN balance_checkpoints c ON c.wallet_id = a.wallet_id AND c.asset = a.asset
+    WHERE {_RANGE_FILTER.format(col="a.wallet_id")}
+"""
+
+RECONCILE_FULL_SQL = f"""
+    SELECT a.wallet_id, a.asset, p.balance,
+           COALESCE(j.balance, 0) + COALESCE(f.balance, 0) AS journal
+    FROM accounts a
+    LEFT JOIN balance_projections p ON p.wallet_id = a.wallet_id AND p.asset = a.asset
+    LEFT JOIN journal_carry_forward f ON f.wallet_id = a.wallet_id AND f.asset = a.asset
+    LEFT JOIN (
+        SELECT wallet_id, asset, SUM(amount) AS balance
+        FROM journal_entries
+        WHERE {_RANGE_FILTER.format(col="wallet_id")}
+        GROUP BY wallet_id, asset
+    ) j ON j.wallet_id = a.wallet_id AND j.asset = a.asset
+    WHERE {_RANGE_FILTER.format(col="a.wallet_id")}
+"""
+
+_wallets_checked = meter.create_counter(
+    "wallet.reconcile.wallets",
+    description="Wallets compared by the reconciliation job",
+)
+_drift_found = meter.create_counter(
+    "wallet.reconcile.drift",
+    description="Wallets whose projection differs from the journal",
+)
+_partition_duration = meter.create_histogram(
+    "wallet.reconcile.partition.duration",
+    unit="s",
+    description="Time to reconcile one wallet_id range",
+)
+
+
+@dataclass(frozen=True)
+class DriftRow:
+    wallet_id: UUID
+    asset: str
+    # None when the wallet has no projection row at all.
+    projected: Decimal | None
+    journal: Decimal
+
+    @property
+    def delta(self) -> Decimal:
+        return (self.projected or Decimal(0)) - self.journal
+
+
+@dataclass
+class PartitionResult:
+    wallets: int
+    drift: list[DriftRow]
+    seconds: float
+
+
+@dataclass
+class ReconcileReport:
+    wallets: int = 0
+    drift: list[DriftRow] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def keyspace_partitions(count: int) -> list[tuple[UUID, UUID | None]]:
+    """Split the UUID keyspace into `count` contiguous [lo, hi) ranges; the last is open."""
+    step = 2**128 // count
+    bounds = [UUID(int=i * step) for i in range(count)]
+    return list(zip(bounds, [*bounds[1:], None], strict=True))
+
+
+def reconcile_partition(
+    dsn: str, snapshot: str | None, lo: UUID, hi: UUID | None, full: bool, fetch_size: int
+) -> PartitionResult:
+    """Compare one wallet_id range; runs in a pool worker process."""
+    started = time.perf_counter()
+    wallets, drift = 0, []
+    with psycopg.connect(dsn, connect_timeout=settings.db_connect_timeout_seconds) as conn:
+        conn.isolation_level = IsolationLevel.REPEATABLE_READ
+        conn.read_only = True
+        if snapshot is not None:
+            # Must be the first statement of the transaction.
+            conn.execute(sql.SQL("SET TRANSACTION SNAPSHOT {}").format(snapshot))
+        with conn.cursor(name="reconcile") as cur:
+            cur.itersize = fetch_size
+            cur.execute(RECONCILE_FULL_SQL if full else RECONCILE_SQL, {"lo": lo, "hi": hi})
+            for wallet_id, asset, projected, journal in cur:
+                wallets += 1
+                if projected != journal:
+                    drift.append(DriftRow(wallet_id, asset, projected, journal))
+        conn.rollback()
+    return PartitionResult(wallets, drift, time.perf_counter() - started)
+
+
+def reconcile(
+    *, workers: int, partitions: int | None = None, full: bool = False
+) -> ReconcileReport:
+    """Reconcile every wallet on one consistent snapshot across `workers` processes."""
+    dsn = settings.database_url
+    ranges = keyspace_partitions(partitions or workers * 4)
+    report = ReconcileReport()
+    started = time.perf_counter()
+    with psycopg.connect(dsn, connect_timeout=settings.db_connect_timeout_seconds) as holder:
+        # The exported snapshot stays importable while this transaction is open.
+        holder.isolation_level = IsolationLevel.REPEATABLE_READ
+        holder.read_only = True
+        snapshot = holder.execute("SELECT pg_export_snapshot()").fetchone()[0]
+        # spawn, not fork: the parent may already run exporter and pool threads.
+        with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as pool:
+            futures = [
+                pool.submit(
+                    reconcile_partition, dsn, snapshot, lo, hi, full, settings.reconcile_fetch_size
+                )
+                for lo, hi in ranges
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                report.wallets += result.wallets
+                report.drift.extend(result.drift)
+                _wallets_checked.add(result.wallets)
+                _drift_found.add(len(result.drift))
+                _partition_duration.record(result.seconds)
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    "reconcile progress",
+                    extra={
+                        "partitions_done": done,
+                        "partitions": len(ranges),
+                        "wallets": report.wallets,
+                        "drift": len(report.drift),
+                        "wallets_per_second": round(report.wallets / elapsed, 1),
+                    },
+                )
+        holder.rollback()
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def write_drift_report(drift: list[DriftRow], stream: TextIO) -> None:
+    writer = csv.writer(stream)
+    writer.writerow(["wallet_id", "asset", "projected", "journal", "delta"])
+    for row in sorted(drift, key=lambda r: (r.wallet_id, r.asset)):
+        projected = "" if row.projected is None else row.projected
+        writer.writerow([row.wallet_id, row.asset, projected, row.journal, row.delta])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Reconcile all projections against the journal.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--partitions", type=int, default=None, help="wallet_id ranges (default: 4 per worker)"
+    )
+    parser.add_argument("--full", action="store_true", help="Ignore checkpoints; sum every entry")
+    parser.add_argument("--report", default="-", help='Drift CSV path, or "-" for stdout')
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    setup_otel()
+    report = reconcile(workers=args.workers, partitions=args.partitions, full=args.full)
+    if args.report == "-":
+        write_drift_report(report.drift, sys.stdout)
+    else:
+        with open(args.report, "w", newline="", encoding="utf-8") as stream:
+            write_drift_report(report.drift, stream)
+    logger.info(
+        "reconcile finished",
+        extra={
+            "wallets": report.wallets,
+            "drift": len(report.drift),
+            "seconds": round(report.seconds, 1),
+            "wallets_per_second": round(report.wallets / max(report.seconds, 1e-9), 1),
+        },
+    )
+    if report.drift:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""In-process cache of committed postings for idempotent replays.
+
+Committed journal transactions are immutable and an idempotency key can only
+ever commit once per scope, so a replay whose payload hash matches the cached
+one can be answered without a database round-trip. Entries are bounded by
+count (least recently used evicted first) and by age.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from wallet_service.config import settings
+from wallet_service.domain.errors import ConflictError
+from wallet_service.observability.metrics import meter
+
+if TYPE_CHECKING:
+    from wallet_service.ledger.journal import JournalPosting, LedgerTransaction
+
+# Message of the WL409 post_journal_transaction() raises for a reused key.
+IDEMPOTENCY_CONFLICT = "idempotency key reuse with different payload"
+
+_hits = meter.create_counter(
+    "wallet.idempotency_cache.hits",
+    description="Idempotent replays answered from the in-process cache",
+)
+_misses = meter.create_counter(
+    "wallet.idempotency_cache.misses",
+    description="Postings whose idempotency key was not cached",
+)
+_conflicts = meter.create_counter(
+    "wallet.idempotency_cache.conflicts",
+    description="Cached keys reused with a different payload (answered with a conflict)",
+)
+_evictions = meter.create_counter(
+    "wallet.idempotency_cache.evictions",
+    description="Cached postings dropped for capacity or age",
+)
+
+
+class ReplayCache:
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (operation_scope, idempotency_key) -> (stored_at, payload_hash, transaction)
+        self._entries: OrderedDict[tuple[str, str], tuple[float, str, LedgerTransaction]] = (
+            OrderedDict()
+        )
+
+    def lookup(self, posting: "JournalPosting") -> "LedgerTransaction | None":
+        """Return the cached transaction for a replay, or None on a miss.
+
+        Raises ConflictError when the key was committed with a different payload,
+        exactly as post_journal_transaction() would.
+        """
+        if settings.idempotency_cache_max_entries <= 0:
+            return None
+        key = (posting.operation_scope, posting.idempotency_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            ttl = settings.idempotency_cache_ttl_seconds
+            if entry is not None and self._clock() - entry[0] > ttl:
+                del self._entries[key]
+                _evictions.add(1, {"reason": "expired"})
+                entry = None
+            if entry is None:
+                _misses.add(1, {"scope": posting.operation_scope})
+                return None
+            self._entries.move_to_end(key)
+        if entry[1] != posting.payload_hash:
+            _conflicts.add(1, {"scope": posting.operation_scope})
+            raise ConflictError(IDEMPOTENCY_CONFLICT)
+        _hits.add(1, {"scope": posting.operation_scope})
+        return entry[2]
+
+    def store(self, transaction: "LedgerTransaction") -> None:
+        """Remember a transaction once it is committed (never before)."""
+        max_entries = settings.idempotency_cache_max_entries
+        if max_entries <= 0:
+            return
+        key = (transaction.operation_scope, transaction.idempotency_key)
+        with self._lock:
+            self._entries[key] = (self._clock(), transaction.payload_hash, transaction)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+                _evictions.add(1, {"reason": "capacity"})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+replay_cache = ReplayCache()
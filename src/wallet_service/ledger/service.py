@@ -1,179 +1,181 @@
-import hashlib
-import json
-from dataclasses import dataclass
-from datetime import datetime, timezone
+import time
+from datetime import UTC, datetime
 from decimal import Decimal
-from uuid import UUID, uuid4
+from uuid import UUID
 
 import psycopg
 
-from wallet_service.config import settings
-from wallet_service.db.database import get_connection
-from wallet_service.domain.errors import ConflictError, NotFoundError, ValidationError
-
-
-@dataclass
-class LedgerTransaction:
-    transaction_id: UUID
-    operation_scope: str
-    idempotency_key: str
-    payload_hash: str
-    status: str
-    created_at: datetime
-    external_reference: str | None
-    entries: list[dict]
-
-
-def _payload_hash(payload: dict) -> str:
-    normalized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
-    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
-
-
-def _ensure_balanced(entries: list[tuple[UUID, Decimal, str]]) -> None:
-    if len(entries) < 2:
-        raise ValidationError("at least two journal entries required")
-    total = Decimal("0")
-    asset = None
-    for _, amount, entry_asset in entries:
-        if amount == 0:
-            raise ValidationError("journal entry amount cannot be zero")
-        total += amount
-        asset = asset or entry_asset
-        if entry_asset != asset:
-            raise ValidationError("all entries in a transaction must have the same asset")
-    if total != 0:
-        raise ValidationError("double-entry violation: sum(entries.amount) != 0")
+from wallet_service.db.database import READ, run_transaction
+from wallet_service.domain.errors import ConflictError, NotFoundError, ServiceUnavailableError
+from wallet_service.ledger.balance_cache import balance_cache
+from wallet_service.ledger.journal import (
+    BatchItemResult,
+    JournalPosting,
+    LedgerTransaction,
+    adjustment_posting,
+    audit_from_row,
+    audit_sql,
+    balance_from_row,
+    batch_entry_params,
+    batch_results,
+    batch_transaction_ids,
+    batch_transaction_params,
+    batch_update_params,
+    batch_wallet_ids,
+    bulk_wallet_params,
+    bulk_wallet_result,
+    cache_batch_results,
+    created_at_range,
+    entries_page,
+    entries_params,
+    fanout_posting,
+    invalidate_balances,
+    is_system_wallet,
+    plan_transfer_batch,
+    posting_params,
+    provisioned_stripes,
+    raise_ledger_error,
+    record_batch_results,
+    record_posting,
+    record_posting_conflict,
+    stale_balance,
+    system_stripe_key,
+    transaction_from_journal_rows,
+    transactions_by_key,
+    transfer_batch_postings,
+    transfer_posting,
+    wallet_from_row,
+)
+from wallet_service.ledger.replay_cache import replay_cache
+from wallet_service.ledger.sql import (
+    ENSURE_SYSTEM_STRIPES_SQL,
+    INSERT_ACCOUNT_SQL,
+    INSERT_BATCH_ENTRIES_SQL,
+    INSERT_BATCH_TRANSACTIONS_SQL,
+    INSERT_PROJECTION_SQL,
+    INSERT_WALLETS_BULK_SQL,
+    LOCK_ACCOUNTS_SQL,
+    POST_JOURNAL_SQL,
+    SELECT_BALANCE_SQL,
+    SELECT_SYSTEM_BALANCE_SQL,
+    SELECT_TRANSACTION_SQL,
+    SELECT_TRANSACTIONS_BY_KEY_SQL,
+    SELECT_WALLET_ENTRIES_SQL,
+)
+from wallet_service.observability.timing import phase
 
 
 def create_wallet(wallet_id: UUID, asset: str) -> dict:
-    now = datetime.now(timezone.utc)
-    with get_connection() as conn:
+    now = datetime.now(UTC)
+
+    def insert(conn) -> dict:
         try:
             row = conn.execute(
-                """
-                INSERT INTO accounts(wallet_id, asset, version, created_at)
-                VALUES (%s, %s, 0, %s)
-                RETURNING wallet_id, asset, version, created_at
-                """,
-                (str(wallet_id), asset, now),
+                INSERT_ACCOUNT_SQL, (str(wallet_id), asset, now), prepare=True
             ).fetchone()
-            conn.execute(
-                """
-                INSERT INTO balance_projections(wallet_id, asset, balance, version, as_of)
-                VALUES (%s, %s, 0, 0, %s)
-                """,
-                (str(wallet_id), asset, now),
-            )
-            conn.commit()
-            return {
-                "wallet_id": row[0],
-                "asset": row[1],
-                "version": row[2],
-                "created_at": row[3],
-            }
+            conn.execute(INSERT_PROJECTION_SQL, (str(wallet_id), asset, now), prepare=True)
         except psycopg.errors.UniqueViolation as exc:
             raise ConflictError("wallet already exists") from exc
+        return wallet_from_row(row)
 
+    return run_transaction("create_wallet", insert)
 
-def get_balance(wallet_id: UUID) -> dict:
-    with get_connection() as conn:
-        row = conn.execute(
-            """
-            SELECT wallet_id, asset, balance, version, as_of
-            FROM balance_projections
-            WHERE wallet_id = %s
-            """,
-            (str(wallet_id),),
-        ).fetchone()
-        if not row:
-            raise NotFoundError("wallet not found")
-        return {
-            "wallet_id": row[0],
-            "asset": row[1],
-            "balance": row[2],
-            "version": row[3],
-            "as_of": row[4],
-        }
-
-
-def _fetch_existing_idempotent(conn, operation_scope: str, idempotency_key: str, payload_hash: str):
-    existing = conn.execute(
-        """
-        SELECT transaction_id, payload_hash
-        FROM journal_transactions
-        WHERE operation_scope = %s AND idempotency_key = %s
-        """,
-        (operation_scope, idempotency_key),
-    ).fetchone()
-    if not existing:
-        return None
-    if existing[1] != payload_hash:
-        raise ConflictError("idempotency key reuse with different payload")
-    return existing[0]
-
-
-def _load_transaction(conn, transaction_id: str) -> LedgerTransaction:
-    tx = conn.execute(
-        """
-        SELECT transaction_id, operation_scope, idempotency_key, payload_hash, status, created_at, external_reference
-        FROM journal_transactions
-        WHERE transaction_id = %s
-        """,
-        (transaction_id,),
-    ).fetchone()
-    entries = conn.execute(
-        """
-        SELECT wallet_id, amount, asset
-        FROM journal_entries
-        WHERE transaction_id = %s
-        ORDER BY seq ASC
-        """,
-        (transaction_id,),
-    ).fetchall()
-    return LedgerTransaction(
-        transaction_id=tx[0],
-        operation_scope=tx[1],
-        idempotency_key=tx[2],
-        payload_hash=tx[3],
-        status=tx[4],
-        created_at=tx[5],
-        external_reference=tx[6],
-        entries=[{"account_id": row[0], "amount": row[1], "asset": row[2]} for row in entries],
-    )
 
+def create_wallets(wallets: list[tuple[UUID, str]]) -> dict:
+    """Create many (wallet_id, asset) wallets in one statement.
 
-def _bump_version(conn, wallet_id: str, expected_version: int | None) -> int:
-    if expected_version is None:
-        row = conn.execute("SELECT version FROM accounts WHERE wallet_id = %s FOR UPDATE", (wallet_id,)).fetchone()
-        if not row:
-            raise NotFoundError("wallet not found")
-        expected_version = int(row[0])
-
-    bumped = conn.execute(
-        """
-        UPDATE accounts
-        SET version = version + 1
-        WHERE wallet_id = %s AND version = %s
-        RETURNING version
-        """,
-        (wallet_id, expected_version),
-    ).fetchone()
-    if not bumped:
-        raise ConflictError("optimistic version conflict")
-    return int(bumped[0])
-
-
-def _apply_projection(conn, wallet_id: str, asset: str, delta: Decimal, version: int) -> None:
-    updated = conn.execute(
-        """
-        UPDATE balance_projections
-        SET balance = balance + %s, version = %s, as_of = NOW()
-        WHERE wallet_id = %s AND asset = %s
-        """,
-        (delta, version, wallet_id, asset),
-    )
-    if updated.rowcount == 0:
-        raise NotFoundError("projection row not found")
+    Wallets that already exist are left as they are, whatever asset they
+    were requested with. Returns the created and existing wallet ids, each
+    in request order.
+    """
+    params = bulk_wallet_params(wallets, datetime.now(UTC))
+
+    def insert(conn) -> list:
+        return conn.execute(INSERT_WALLETS_BULK_SQL, params, prepare=True).fetchall()
+
+    return bulk_wallet_result(wallets, run_transaction("create_wallets", insert))
+
+
+def system_wallet_stripes() -> list[UUID]:
+    """Return the system wallet stripes adjustments post against, provisioning them once."""
+    key = system_stripe_key()
+    stripes = provisioned_stripes.get(key)
+    if stripes is not None:
+        return stripes
+
+    def ensure(conn) -> list[UUID]:
+        try:
+            rows = conn.execute(ENSURE_SYSTEM_STRIPES_SQL, key, prepare=True).fetchall()
+        except psycopg.Error as exc:
+            raise_ledger_error(exc)
+            raise
+        return [row[0] for row in rows]
+
+    stripes = run_transaction("ensure_system_wallet_stripes", ensure)
+    provisioned_stripes[key] = stripes
+    return stripes
+
+
+def get_balance(wallet_id: UUID) -> dict:
+    # The striped system wallet reports the sum of its stripes under the root id;
+    # its stripes change on every adjustment, so it is never cached.
+    system = is_system_wallet(wallet_id)
+    sql = SELECT_SYSTEM_BALANCE_SQL if system else SELECT_BALANCE_SQL
+    if not system:
+        cached = balance_cache.get(wallet_id)
+        if cached is not None:
+            return cached
+    epoch = balance_cache.epoch()
+
+    def read(conn) -> dict:
+        row = conn.execute(sql, (str(wallet_id),), prepare=True).fetchone()
+        return balance_from_row(row)
+
+    try:
+        balance = run_transaction("get_balance", read, READ)
+    except ServiceUnavailableError as exc:
+        return stale_balance(wallet_id, exc)
+    if not system:
+        balance_cache.put(balance, epoch)
+    return balance
+
+
+def _post_journal(posting: JournalPosting) -> LedgerTransaction:
+    operation = posting.operation_scope
+    started = time.perf_counter()
+    try:
+        with phase("replay_cache"):
+            cached = replay_cache.lookup(posting)
+    except ConflictError as exc:
+        record_posting_conflict(operation, exc)
+        raise
+    if cached is not None:
+        record_posting(operation, "cache", started)
+        return cached
+
+    def post(conn) -> tuple[LedgerTransaction, bool]:
+        try:
+            with phase("post_journal"):
+                rows = conn.execute(
+                    POST_JOURNAL_SQL, posting_params(posting), prepare=True
+                ).fetchall()
+        except psycopg.Error as exc:
+            raise_ledger_error(exc)
+            raise
+        return transaction_from_journal_rows(rows), rows[0][-1]
+
+    # A retried attempt re-runs the idempotency lookup, so a concurrent commit of
+    # the same key turns into a replay rather than a duplicate posting.
+    try:
+        tx, replayed = run_transaction(operation, post)
+    except ConflictError as exc:
+        record_posting_conflict(operation, exc)
+        raise
+    if not replayed:
+        invalidate_balances([tx])
+    record_posting(operation, "database" if replayed else None, started)
+    replay_cache.store(tx)
+    return tx
 
 
 def post_transfer(
@@ -187,65 +189,85 @@ def post_transfer(
     expected_from_version: int | None,
     expected_to_version: int | None,
 ) -> LedgerTransaction:
-    if from_wallet_id == to_wallet_id:
-        raise ValidationError("from_wallet_id and to_wallet_id must differ")
-
-    operation_scope = "transfer"
-    payload = {
-        "from_wallet_id": str(from_wallet_id),
-        "to_wallet_id": str(to_wallet_id),
-        "amount": str(amount),
-        "asset": asset,
-        "external_reference": external_reference,
-        "expected_from_version": expected_from_version,
-        "expected_to_version": expected_to_version,
-    }
-    payload_hash = _payload_hash(payload)
-    entries = [
-        (from_wallet_id, -amount, asset),
-        (to_wallet_id, amount, asset),
-    ]
-    _ensure_balanced(entries)
-
-    with get_connection() as conn:
-        conn.execute("SELECT 1")
-        existing = _fetch_existing_idempotent(conn, operation_scope, idempotency_key, payload_hash)
-        if existing:
-            return _load_transaction(conn, existing)
-
-        transaction_id = str(uuid4())
-        conn.execute(
-            """
-            INSERT INTO journal_transactions(transaction_id, operation_scope, idempotency_key, payload_hash, status, external_reference)
-            VALUES (%s, %s, %s, %s, 'committed', %s)
-            """,
-            (transaction_id, operation_scope, idempotency_key, payload_hash, external_reference),
-        )
-
-        from_ver = _bump_version(conn, str(from_wallet_id), expected_from_version)
-        to_ver = _bump_version(conn, str(to_wallet_id), expected_to_version)
-
-        for seq, (wallet_id, entry_amount, entry_asset) in enumerate(entries, start=1):
-            conn.execute(
-                """
-                INSERT INTO journal_entries(transaction_id, seq, wallet_id, amount, asset)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (transaction_id, seq, str(wallet_id), entry_amount, entry_asset),
-            )
-
-        _apply_projection(conn, str(from_wallet_id), asset, -amount, from_ver)
-        _apply_projection(conn, str(to_wallet_id), asset, amount, to_ver)
-
-        conn.execute(
-            """
-            INSERT INTO outbox_events(event_id, transaction_id, event_type, payload)
-            VALUES (%s, %s, %s, %s::jsonb)
-            """,
-            (str(uuid4()), transaction_id, "wallet.transfer.committed", json.dumps(payload)),
-        )
-        conn.commit()
-        return _load_transaction(conn, transaction_id)
+    posting = transfer_posting(
+        idempotency_key=idempotency_key,
+        from_wallet_id=from_wallet_id,
+        to_wallet_id=to_wallet_id,
+        amount=amount,
+        asset=asset,
+        external_reference=external_reference,
+        expected_from_version=expected_from_version,
+        expected_to_version=expected_to_version,
+    )
+    return _post_journal(posting)
+
+
+def post_fanout(
+    *,
+    idempotency_key: str,
+    from_wallet_id: UUID,
+    credits: list[tuple[UUID, Decimal, int | None]],
+    asset: str,
+    external_reference: str | None,
+    expected_from_version: int | None,
+) -> LedgerTransaction:
+    """Debit one wallet and credit many in a single journal transaction.
+
+    ``credits`` holds (to_wallet_id, amount, expected_to_version) per leg. The
+    returned transaction lists the debit first, then every credit in order.
+    """
+    posting = fanout_posting(
+        idempotency_key=idempotency_key,
+        from_wallet_id=from_wallet_id,
+        credits=credits,
+        asset=asset,
+        external_reference=external_reference,
+        expected_from_version=expected_from_version,
+    )
+    return _post_journal(posting)
+
+
+def post_transfer_batch(transfers: list[dict], *, atomic: bool) -> list[BatchItemResult]:
+    """Post many transfers in one database transaction using set-based writes.
+
+    Each item takes the keyword arguments of post_transfer() and keeps its
+    idempotency semantics: a replayed key returns the original transaction and
+    a reused key with a different payload fails with a conflict. With
+    ``atomic`` any failed item aborts the whole batch; otherwise every valid
+    item is committed.
+    """
+    postings = transfer_batch_postings(transfers)
+    keys = [key for key, _ in postings]
+
+    def post(conn) -> list[BatchItemResult]:
+        rows = conn.execute(
+            SELECT_TRANSACTIONS_BY_KEY_SQL, ("transfer", keys), prepare=True
+        ).fetchall()
+        existing = transactions_by_key(rows)
+        wallet_ids = batch_wallet_ids(postings, existing)
+        accounts = []
+        if wallet_ids:
+            accounts = conn.execute(LOCK_ACCOUNTS_SQL, (wallet_ids,), prepare=True).fetchall()
+        plan = plan_transfer_batch(postings, existing, accounts, atomic)
+        if not plan.postings:
+            return plan.results
+
+        created_rows = conn.execute(
+            INSERT_BATCH_TRANSACTIONS_SQL, batch_transaction_params(plan), prepare=True
+        ).fetchall()
+        transaction_ids = batch_transaction_ids(plan, created_rows)
+        entry_rows = conn.execute(
+            INSERT_BATCH_ENTRIES_SQL, batch_entry_params(plan, transaction_ids), prepare=True
+        ).fetchall()
+        for sql, params in batch_update_params(plan, transaction_ids):
+            conn.execute(sql, params, prepare=True)
+        return batch_results(plan, transaction_ids, created_rows, entry_rows)
+
+    results = run_transaction("transfer_batch", post)
+    invalidate_balances([r.transaction for r in results if r.status == "committed"])
+    cache_batch_results(results)
+    record_batch_results(results)
+    return results
 
 
 def post_adjustment(
@@ -258,94 +280,61 @@ def post_adjustment(
     reason: str,
     expected_wallet_version: int | None,
 ) -> LedgerTransaction:
-    operation_scope = "adjustment"
-    sign = Decimal("1") if direction == "credit" else Decimal("-1")
-    system_wallet_id = UUID(settings.system_wallet_id)
-
-    payload = {
-        "wallet_id": str(wallet_id),
-        "amount": str(amount),
-        "direction": direction,
-        "asset": asset,
-        "reason": reason,
-        "expected_wallet_version": expected_wallet_version,
-    }
-    payload_hash = _payload_hash(payload)
-
-    wallet_delta = amount * sign
-    entries = [
-        (wallet_id, wallet_delta, asset),
-        (system_wallet_id, -wallet_delta, asset),
-    ]
-    _ensure_balanced(entries)
-
-    with get_connection() as conn:
-        existing = _fetch_existing_idempotent(conn, operation_scope, idempotency_key, payload_hash)
-        if existing:
-            return _load_transaction(conn, existing)
-
-        transaction_id = str(uuid4())
-        conn.execute(
-            """
-            INSERT INTO journal_transactions(transaction_id, operation_scope, idempotency_key, payload_hash, status, external_reference)
-            VALUES (%s, %s, %s, %s, 'committed', %s)
-            """,
-            (transaction_id, operation_scope, idempotency_key, payload_hash, reason),
-        )
-
-        wallet_ver = _bump_version(conn, str(wallet_id), expected_wallet_version)
-        system_ver = _bump_version(conn, str(system_wallet_id), None)
-
-        for seq, (entry_wallet_id, entry_amount, entry_asset) in enumerate(entries, start=1):
-            conn.execute(
-                """
-                INSERT INTO journal_entries(transaction_id, seq, wallet_id, amount, asset)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (transaction_id, seq, str(entry_wallet_id), entry_amount, entry_asset),
-            )
-
-        _apply_projection(conn, str(wallet_id), asset, wallet_delta, wallet_ver)
-        _apply_projection(conn, str(system_wallet_id), asset, -wallet_delta, system_ver)
-
-        conn.execute(
-            """
-            INSERT INTO outbox_events(event_id, transaction_id, event_type, payload)
-            VALUES (%s, %s, %s, %s::jsonb)
-            """,
-            (
-                str(uuid4()),
-                transaction_id,
-                "wallet.adjustment.committed",
-                json.dumps(payload),
-            ),
-        )
-        conn.commit()
-        return _load_transaction(conn, transaction_id)
+    posting = adjustment_posting(
+        idempotency_key=idempotency_key,
+        wallet_id=wallet_id,
+        amount=amount,
+        direction=direction,
+        asset=asset,
+        reason=reason,
+        expected_wallet_version=expected_wallet_version,
+        system_stripes=system_wallet_stripes(),
+    )
+    return _post_journal(posting)
+
+
+def list_entries(
+    wallet_id: UUID,
+    *,
+    cursor: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = 100,
+) -> dict:
+    """One page of a wallet's journal entries, newest first.
+
+    since is inclusive and until exclusive. Pass the returned next_cursor (with
+    the same filters) to fetch the following page; it is None on the last one.
+    """
+    params = entries_params(wallet_id, cursor, since, until, limit)
+    rows = run_transaction(
+        "list_entries",
+        lambda conn: conn.execute(SELECT_WALLET_ENTRIES_SQL, params, prepare=True).fetchall(),
+        READ,
+    )
+    return entries_page(wallet_id, rows, limit)
 
 
 def get_transaction(transaction_id: UUID) -> LedgerTransaction:
-    with get_connection() as conn:
-        exists = conn.execute(
-            "SELECT 1 FROM journal_transactions WHERE transaction_id = %s", (str(transaction_id),)
-        ).fetchone()
-        if not exists:
+    def read(conn) -> LedgerTransaction:
+        params = created_at_range(transaction_id)
+        rows = conn.execute(SELECT_TRANSACTION_SQL, params, prepare=True).fetchall()
+        if not rows:
             raise NotFoundError("transaction not found")
-        return _load_transaction(conn, str(transaction_id))
-
-
-def audit_balance(wallet_id: UUID) -> dict:
-    with get_connection() as conn:
-        row = conn.execute(
-            """
-            SELECT a.wallet_id, a.asset, COALESCE(SUM(e.amount), 0) AS balance
-            FROM accounts a
-            LEFT JOIN journal_entries e ON e.wallet_id = a.wallet_id AND e.asset = a.asset
-            WHERE a.wallet_id = %s
-            GROUP BY a.wallet_id, a.asset
-            """,
-            (str(wallet_id),),
-        ).fetchone()
-        if not row:
-            raise NotFoundError("wallet not found")
-        return {"wallet_id": row[0], "asset": row[1], "balance": row[2]}
+        return transaction_from_journal_rows(rows)
+
+    return run_transaction("get_transaction", read, READ)
+
+
+def audit_balance(wallet_id: UUID, *, full: bool = False) -> dict:
+    """Journal balance from the latest checkpoint plus later entries.
+
+    full=True ignores checkpoints and sums the wallet's entire history.
+    """
+    sql = audit_sql(wallet_id, full)
+
+    def read(conn) -> dict:
+        row = conn.execute(sql, (str(wallet_id),), prepare=True).fetchone()
+        return audit_from_row(row)
+
+    return run_transaction("audit_balance", read, READ)
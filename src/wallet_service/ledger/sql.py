@@ -0,0 +1,226 @@
+"""SQL statements the sync and async ledger services share.
+
+Both services execute these verbatim, so the two paths stay statement for
+statement identical; reconcile.py reuses the balance expressions.
+"""
+
+INSERT_ACCOUNT_SQL = """
+    INSERT INTO accounts(wallet_id, asset, version, created_at)
+    VALUES (%s, %s, 0, %s)
+    RETURNING wallet_id, asset, version, created_at
+"""
+
+INSERT_PROJECTION_SQL = """
+    INSERT INTO balance_projections(wallet_id, asset, balance, version, as_of)
+    VALUES (%s, %s, 0, 0, %s)
+"""
+
+# Accounts are inserted in wallet_id order, so concurrent bulk requests wait on
+# each other's unique index entries in one order, and each account actually
+# created gets its zero projection in the same statement (the projection's
+# foreign key is checked at the end of the statement, after both inserts).
+INSERT_WALLETS_BULK_SQL = """
+    WITH created AS (
+        INSERT INTO accounts(wallet_id, asset, version, created_at)
+        SELECT w.wallet_id, w.asset, 0, %(created_at)s
+        FROM unnest(%(wallet_ids)s::uuid[], %(assets)s::text[]) AS w(wallet_id, asset)
+        ORDER BY w.wallet_id
+        ON CONFLICT (wallet_id) DO NOTHING
+        RETURNING wallet_id, asset
+    ),
+    projected AS (
+        INSERT INTO balance_projections(wallet_id, asset, balance, version, as_of)
+        SELECT wallet_id, asset, 0, 0, %(created_at)s FROM created
+    )
+    SELECT wallet_id FROM created
+"""
+
+SELECT_BALANCE_SQL = """
+    SELECT wallet_id, asset, balance, version, as_of
+    FROM balance_projections
+    WHERE wallet_id = %s
+"""
+
+# Lookups by id carry the created_at range encoded in the id (see
+# created_at_range), so only the partitions covering it are searched.
+# One row per entry with the header repeated, like post_journal_transaction()
+# returns. Every committed transaction has entries, so no row means not found.
+SELECT_TRANSACTION_SQL = """
+    SELECT t.transaction_id, t.operation_scope, t.idempotency_key, t.payload_hash, t.status,
+           t.created_at, t.external_reference, e.wallet_id, e.amount, e.asset
+    FROM journal_transactions t
+    JOIN journal_entries e
+      ON e.transaction_id = t.transaction_id AND e.created_at = t.created_at
+    WHERE t.transaction_id = %(transaction_id)s
+      AND t.created_at >= %(created_from)s AND t.created_at < %(created_until)s
+      AND e.created_at >= %(created_from)s AND e.created_at < %(created_until)s
+    ORDER BY e.seq ASC
+"""
+
+# Newest first. The row comparison seeks straight to the cursor position on
+# idx_journal_entries_wallet_history; the LEFT JOIN keeps one row for a wallet
+# without entries so an empty page is told apart from a missing wallet.
+SELECT_WALLET_ENTRIES_SQL = """
+    SELECT a.asset, e.entry_id, e.transaction_id, e.seq, e.amount, e.created_at
+    FROM accounts a
+    LEFT JOIN LATERAL (
+        SELECT entry_id, transaction_id, seq, amount, created_at
+        FROM journal_entries
+        WHERE wallet_id = a.wallet_id AND asset = a.asset
+          AND created_at >= %(since)s AND created_at < %(until)s
+          AND (created_at, entry_id) < (%(before_at)s, %(before_id)s)
+        ORDER BY created_at DESC, entry_id DESC
+        LIMIT %(limit)s
+    ) e ON TRUE
+    WHERE a.wallet_id = %(wallet_id)s
+"""
+
+# The trailing column is true when the key was committed by an earlier
+# transaction (a replay): a new posting is stamped with this transaction's NOW().
+POST_JOURNAL_SQL = """
+    SELECT *, created_at < NOW() FROM post_journal_transaction(
+        %s, %s, %s, %s, %s, %s::jsonb, %s::uuid[], %s::numeric[], %s::text[], %s::bigint[]
+    )
+"""
+
+# Sums of detached journal partitions are kept in journal_carry_forward, so a
+# full-history balance is the carried sum plus every attached entry.
+FULL_BALANCE_EXPR = """
+    (
+        SELECT COALESCE(SUM(e.amount), 0)
+        FROM journal_entries e
+        WHERE e.wallet_id = a.wallet_id AND e.asset = a.asset
+    ) + COALESCE((
+        SELECT f.balance
+        FROM journal_carry_forward f
+        WHERE f.wallet_id = a.wallet_id AND f.asset = a.asset
+    ), 0)
+"""
+
+AUDIT_BALANCE_SQL = f"""
+    SELECT a.wallet_id, a.asset, {FULL_BALANCE_EXPR} AS balance
+    FROM accounts a
+    WHERE a.wallet_id = %s
+"""
+
+# Checkpoint plus the entries created at or after its horizon, which only
+# touches the partitions from sealed_through on. The CASE keeps wallets
+# without a checkpoint on a full sum, and only the branch taken is executed.
+CHECKPOINT_BALANCE_EXPR = f"""
+    CASE WHEN c.sealed_through IS NULL THEN {FULL_BALANCE_EXPR}
+    ELSE c.balance + (
+        SELECT COALESCE(SUM(e.amount), 0)
+        FROM journal_entries e
+        WHERE e.wallet_id = a.wallet_id AND e.asset = a.asset AND e.created_at >= c.sealed_through
+    ) END
+"""
+
+AUDIT_CHECKPOINT_BALANCE_SQL = f"""
+    SELECT a.wallet_id, a.asset, {CHECKPOINT_BALANCE_EXPR} AS balance
+    FROM accounts a
+    LEFT JOIN balance_checkpoints c ON c.wallet_id = a.wallet_id AND c.asset = a.asset
+    WHERE a.wallet_id = %s
+"""
+
+ENSURE_SYSTEM_STRIPES_SQL = "SELECT wallet_id FROM ensure_system_wallet_stripes(%s, %s)"
+
+SELECT_SYSTEM_BALANCE_SQL = """
+    SELECT wallet_id, asset, balance, version, as_of
+    FROM system_wallet_balances
+    WHERE wallet_id = %s
+"""
+
+AUDIT_SYSTEM_BALANCE_SQL = f"""
+    SELECT s.root_wallet_id, a.asset, SUM({FULL_BALANCE_EXPR}) AS balance
+    FROM system_wallet_stripes s
+    JOIN accounts a ON a.wallet_id = s.wallet_id
+    WHERE s.root_wallet_id = %s
+    GROUP BY s.root_wallet_id, a.asset
+"""
+
+AUDIT_SYSTEM_CHECKPOINT_BALANCE_SQL = f"""
+    SELECT s.root_wallet_id, a.asset, SUM({CHECKPOINT_BALANCE_EXPR}) AS balance
+    FROM system_wallet_stripes s
+    JOIN accounts a ON a.wallet_id = s.wallet_id
+    LEFT JOIN balance_checkpoints c ON c.wallet_id = a.wallet_id AND c.asset = a.asset
+    WHERE s.root_wallet_id = %s
+    GROUP BY s.root_wallet_id, a.asset
+"""
+
+# idempotency_keys records each key's created_at, so the journal rows are read
+# from the one partition holding them. Keys of detached transactions find no
+# rows and are reported as conflicts, like post_journal_transaction() does.
+SELECT_TRANSACTIONS_BY_KEY_SQL = """
+    SELECT k.transaction_id, k.operation_scope, k.idempotency_key, k.payload_hash, t.status,
+           k.created_at, t.external_reference, e.wallet_id, e.amount, e.asset
+    FROM idempotency_keys k
+    LEFT JOIN journal_transactions t
+      ON t.transaction_id = k.transaction_id AND t.created_at = k.created_at
+    LEFT JOIN journal_entries e
+      ON e.transaction_id = t.transaction_id AND e.created_at = t.created_at
+    WHERE k.operation_scope = %s AND k.idempotency_key = ANY(%s)
+    ORDER BY k.idempotency_key, e.seq
+"""
+
+# Same canonical wallet_id order as post_journal_transaction(), so batches and
+# single postings never deadlock against each other.
+LOCK_ACCOUNTS_SQL = """
+    SELECT wallet_id, asset, version
+    FROM accounts
+    WHERE wallet_id = ANY(%s)
+    ORDER BY wallet_id
+    FOR UPDATE
+"""
+
+# Transaction ids are UUIDv7 stamped with created_at, like the ones
+# post_journal_transaction() assigns. Entries and outbox events take the same
+# NOW() by default, which is fixed for the database transaction.
+INSERT_BATCH_TRANSACTIONS_SQL = """
+    WITH batch AS (
+        SELECT t.*, uuid_v7_at(NOW()) AS transaction_id
+        FROM unnest(%s::text[], %s::text[], %s::text[], %s::text[])
+          AS t(operation_scope, idempotency_key, payload_hash, external_reference)
+    ),
+    keyed AS (
+        INSERT INTO idempotency_keys(
+            operation_scope, idempotency_key, transaction_id, payload_hash, created_at
+        )
+        SELECT operation_scope, idempotency_key, transaction_id, payload_hash, NOW()
+        FROM batch
+    )
+    INSERT INTO journal_transactions(
+        transaction_id, operation_scope, idempotency_key, payload_hash, status,
+        external_reference, created_at
+    )
+    SELECT transaction_id, operation_scope, idempotency_key, payload_hash, 'committed',
+           external_reference, NOW()
+    FROM batch
+    RETURNING idempotency_key, transaction_id, created_at
+"""
+
+INSERT_BATCH_ENTRIES_SQL = """
+    INSERT INTO journal_entries(transaction_id, seq, wallet_id, amount, asset)
+    SELECT * FROM unnest(%s::uuid[], %s::int[], %s::uuid[], %s::numeric[], %s::text[])
+    RETURNING transaction_id, seq, wallet_id, amount, asset
+"""
+
+UPDATE_BATCH_ACCOUNTS_SQL = """
+    UPDATE accounts a
+    SET version = d.version
+    FROM unnest(%s::uuid[], %s::bigint[]) AS d(wallet_id, version)
+    WHERE a.wallet_id = d.wallet_id
+"""
+
+UPDATE_BATCH_PROJECTIONS_SQL = """
+    UPDATE balance_projections b
+    SET balance = b.balance + d.delta, version = d.version, as_of = NOW()
+    FROM unnest(%s::uuid[], %s::text[], %s::numeric[], %s::bigint[])
+      AS d(wallet_id, asset, delta, version)
+    WHERE b.wallet_id = d.wallet_id AND b.asset = d.asset
+"""
+
+INSERT_BATCH_OUTBOX_SQL = """
+    INSERT INTO outbox_events(event_id, transaction_id, event_type, payload)
+    SELECT gen_random_uuid(), o.transaction_id, o.event_type, o.payload
+    FROM unnest(%s::uuid[], %s::text[], %s::jsonb[]) AS o(transaction_id, event_type, payload)
+"""
@@ -1,13 +1,19 @@
 import logging
 
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from psycopg import Error as PsycopgError
 
 from wallet_service.api.routes import router as wallet_router
+from wallet_service.auth.jwks import start_jwks_refresher, stop_jwks_refresher
 from wallet_service.config import settings
-from wallet_service.db.database import get_connection
-from wallet_service.db.migrations import apply_migrations
+from wallet_service.db.database import (
+    close_async_pool,
+    close_pool,
+    get_async_connection,
+    get_async_pool,
+)
+from wallet_service.db.migrations import apply_migrations, verify_migrations
 from wallet_service.domain.errors import (
     ConflictError,
     ForbiddenError,
@@ -16,21 +22,51 @@ from wallet_service.domain.errors import (
     UnauthorizedError,
     ValidationError,
 )
+from wallet_service.ledger import system_wallet_stripes
+from wallet_service.ledger.balance_cache import start_balance_listener, stop_balance_listener
+from wallet_service.ledger.partitions import ensure_partitions
 from wallet_service.logging_config import configure_logging
+from wallet_service.observability import prometheus
 from wallet_service.observability.otel import setup_otel
+from wallet_service.observability.queries import QueryBudgetMiddleware
+from wallet_service.observability.timing import RequestTimingMiddleware
 
 configure_logging()
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Wallet Ledger Service", version="0.1.0")
 app.include_router(wallet_router)
+app.add_middleware(RequestTimingMiddleware)
+app.add_middleware(QueryBudgetMiddleware)
 setup_otel(app)
 
 
 @app.on_event("startup")
 def on_startup() -> None:
-    apply_migrations()
-    logger.info("migrations applied")
+    if settings.migrations_mode == "verify":
+        verify_migrations()
+        logger.info("migrations verified")
+    else:
+        applied = apply_migrations()
+        logger.info("migrations applied", extra={"migrations": applied})
+    ensure_partitions()
+    stripes = system_wallet_stripes()
+    logger.info("system wallet striped across %d sub-accounts", len(stripes))
+    start_balance_listener()
+    start_jwks_refresher()
+
+
+@app.on_event("startup")
+async def open_async_pool() -> None:
+    await get_async_pool()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    stop_balance_listener()
+    stop_jwks_refresher()
+    await close_async_pool()
+    close_pool()
 
 
 @app.exception_handler(NotFoundError)
@@ -73,11 +109,17 @@ def health() -> dict:
     return {"status": "ok", "service": settings.app_name}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    body, content_type = prometheus.render()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/v1/ready")
-def ready() -> dict:
-    with get_connection() as conn:
-        conn.execute("SELECT 1")
-        schema = conn.execute(
+async def ready() -> dict:
+    async with get_async_connection() as conn:
+        cur = await conn.execute(
             "SELECT COALESCE(MAX(applied_at)::text, 'none') FROM schema_migrations"
-        ).fetchone()[0]
+        )
+        schema = (await cur.fetchone())[0]
     return {"status": "ready", "latest_migration": schema}
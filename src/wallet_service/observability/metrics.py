@@ -0,0 +1,5 @@
+from opentelemetry import metrics
+
+# Instruments bind to the global meter provider lazily, so they are exported once
+# setup_otel() installs the OTLP pipeline and stay no-ops when OTel is disabled.
+meter = metrics.get_meter("wallet_service")
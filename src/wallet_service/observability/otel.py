@@ -12,7 +12,8 @@ from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from wallet_service.config import settings
 
 
-def setup_otel(app) -> None:
+def setup_otel(app=None) -> None:
+    """Install OTLP trace/metric providers; instrument the FastAPI app when given."""
     if not settings.otel_enabled:
         return
 
@@ -30,5 +31,6 @@ def setup_otel(app) -> None:
     meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
     metrics.set_meter_provider(meter_provider)
 
-    FastAPIInstrumentor.instrument_app(app)
+    if app is not None:
+        FastAPIInstrumentor.instrument_app(app)
     PsycopgInstrumentor().instrument()
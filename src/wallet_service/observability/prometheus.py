@@ -0,0 +1,66 @@
+"""Ledger domain metrics for Prometheus to scrape from /metrics.
+
+The OTLP pipeline pushes HTTP and pool metrics through Alloy; these are the
+ledger's own counters, kept in-process by prometheus_client so recording one
+is a lock and an add. Under several worker processes set
+PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the workers: each
+process then writes its samples to files there and /metrics sums them across
+workers, so a scrape hitting any worker sees the whole pod.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+postings = Counter(
+    "wallet_postings",
+    "Journal transactions committed, by operation",
+    ["operation"],
+)
+idempotent_replays = Counter(
+    "wallet_idempotent_replays",
+    "Postings answered with the transaction already committed under their key",
+    ["operation", "source"],
+)
+version_conflicts = Counter(
+    "wallet_version_conflicts",
+    "Postings rejected because an expected wallet version was stale",
+    ["operation"],
+)
+idempotency_conflicts = Counter(
+    "wallet_idempotency_conflicts",
+    "Postings rejected because their idempotency key was used with a different payload",
+    ["operation"],
+)
+posting_duration = Histogram(
+    "wallet_posting_duration_seconds",
+    "Time to commit or replay a posting, including retries",
+    ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+serialization_failures = Counter(
+    "wallet_db_serialization_failures",
+    "Transaction attempts aborted by a serialization failure or deadlock",
+    ["operation", "error"],
+)
+db_unavailable = Counter(
+    "wallet_db_unavailable",
+    "Connection checkouts that failed closed because the database was unreachable",
+)
+
+
+def render() -> tuple[bytes, str]:
+    """Exposition body and content type for a /metrics response."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,171 @@
+"""Statement accounting per request and per endpoint.
+
+Round trips dominate request latency, and an extra query on a hot path is
+easy to add and hard to notice. Pooled connections create CountingCursor /
+AsyncCountingCursor, which add every statement, its rows and the time spent in
+execute() to the QueryStats of the current scope. QueryBudgetMiddleware opens
+a scope per request and, when the response starts, records the totals to the
+wallet.db.request.* histograms labelled by route. A route running more
+statements than its entry in db_statement_budgets logs a warning.
+
+count_queries() opens a scope anywhere else, which makes it a test helper:
+
+    with count_queries() as stats:
+        service.get_transaction(transaction_id)
+    assert stats.statements == 1
+
+A transaction that run_transaction retries after a serialization failure
+moves the statements of its rolled-back attempts from statements to retried,
+so statements is what the code path issues once and does not depend on
+contention; retries and retried say how much the contention cost.
+
+Statements outside a scope cost one ContextVar lookup.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import psycopg
+
+from wallet_service.config import settings
+from wallet_service.observability.metrics import meter
+from wallet_service.observability.timing import route_label
+
+logger = logging.getLogger(__name__)
+
+_request_statements = meter.create_histogram(
+    "wallet.db.request.statements",
+    description="SQL statements executed per request, by route",
+)
+_request_rows = meter.create_histogram(
+    "wallet.db.request.rows",
+    description="Rows returned or affected per request, by route",
+)
+_request_db_time = meter.create_histogram(
+    "wallet.db.request.time",
+    unit="ms",
+    description="Time spent executing statements per request, by route",
+)
+_budget_exceeded = meter.create_counter(
+    "wallet.db.request.budget_exceeded",
+    description="Requests that ran more statements than their route's budget",
+)
+
+
+class QueryStats:
+    __slots__ = ("db_ms", "retried", "retries", "rows", "statements")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.rows = 0
+        self.db_ms = 0.0
+        self.retries = 0
+        self.retried = 0
+
+    def add(self, rows: int, ms: float) -> None:
+        self.statements += 1
+        self.rows += max(rows, 0)
+        self.db_ms += ms
+
+    def discard_attempt(self, mark: int) -> None:
+        """Move the statements counted since mark, a rolled-back attempt, to retried."""
+        self.retries += 1
+        self.retried += self.statements - mark
+        self.statements = mark
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("wallet_query_stats", default=None)
+
+
+@contextmanager
+def count_queries():
+    """Count the statements run by pooled connections within the block."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def current_stats() -> QueryStats | None:
+    """The QueryStats of the enclosing count_queries() scope, if any."""
+    return _current.get()
+
+
+@contextmanager
+def uncounted():
+    """Leave the statements within the block out of the current scope."""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class CountingCursor(psycopg.Cursor):
+    def execute(self, query, params=None, **kwargs):
+        stats = _current.get()
+        if stats is None:
+            return super().execute(query, params, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().execute(query, params, **kwargs)
+        finally:
+            stats.add(self.rowcount, (time.perf_counter() - started) * 1000)
+
+
+class AsyncCountingCursor(psycopg.AsyncCursor):
+    async def execute(self, query, params=None, **kwargs):
+        stats = _current.get()
+        if stats is None:
+            return await super().execute(query, params, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await super().execute(query, params, **kwargs)
+        finally:
+            stats.add(self.rowcount, (time.perf_counter() - started) * 1000)
+
+
+def check_budget(route: str, stats: QueryStats) -> bool:
+    """Warn when stats exceed route's statement budget; False if they did."""
+    budget = settings.db_statement_budgets.get(route)
+    if budget is None or stats.statements <= budget:
+        return True
+    _budget_exceeded.add(1, {"route": route})
+    logger.warning(
+        "statement budget exceeded: %s ran %d statements (budget %d, %d rows, %.1f ms)",
+        route,
+        stats.statements,
+        budget,
+        stats.rows,
+        stats.db_ms,
+    )
+    return False
+
+
+class QueryBudgetMiddleware:
+    """ASGI middleware recording each request's statements against its route's budget."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_stats(message) -> None:
+            if message["type"] == "http.response.start" and stats.statements:
+                route = route_label(scope)
+                attributes = {"route": route}
+                _request_statements.record(stats.statements, attributes)
+                _request_rows.record(stats.rows, attributes)
+                _request_db_time.record(stats.db_ms, attributes)
+                check_budget(route, stats)
+            await send(message)
+
+        with count_queries() as stats:
+            await self.app(scope, receive, send_with_stats)
@@ -0,0 +1,12 @@
+from wallet_service.outbox.relay import probe_backlog, prune_processed, relay_batch
+from wallet_service.outbox.sinks import JsonLinesSink, OutboxEvent, OutboxSink, open_sink
+
+__all__ = [
+    "JsonLinesSink",
+    "OutboxEvent",
+    "OutboxSink",
+    "open_sink",
+    "probe_backlog",
+    "prune_processed",
+    "relay_batch",
+]
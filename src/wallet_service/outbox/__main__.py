@@ -0,0 +1,3 @@
+from wallet_service.outbox.relay import main
+
+main()
@@ -0,0 +1,273 @@
+"""Outbox relay: drains outbox_events to a sink with at-least-once delivery.
+
+Workers claim the oldest pending events with FOR UPDATE SKIP LOCKED, so any
+number of relay processes (and --workers threads within one) drain the table
+in parallel without waiting on each other's batches. A batch is marked
+processed in the transaction that claimed it, after the sink accepted it; if
+delivery fails the transaction rolls back and the events are claimed again.
+
+    python -m wallet_service.outbox --sink file:/var/log/wallet/outbox.ndjson --workers 4
+"""
+
+import argparse
+import logging
+import signal
+import threading
+import time
+from datetime import UTC, datetime
+
+from opentelemetry.metrics import CallbackOptions, Observation
+from psycopg import IsolationLevel
+
+from wallet_service.config import settings
+from wallet_service.db.database import READ, TransactionPolicy, close_pool, run_transaction
+from wallet_service.logging_config import configure_logging
+from wallet_service.observability.metrics import meter
+from wallet_service.observability.otel import setup_otel
+from wallet_service.outbox.sinks import OutboxEvent, OutboxSink, open_sink
+
+logger = logging.getLogger(__name__)
+
+# Queue claims need READ COMMITTED: under SERIALIZABLE, locking a row another
+# worker processed after this snapshot was taken is a serialization failure.
+RELAY = TransactionPolicy(IsolationLevel.READ_COMMITTED)
+
+CLAIM_SQL = """
+    SELECT event_id, transaction_id, event_type, payload, created_at
+    FROM outbox_events
+    WHERE processed_at IS NULL
+    ORDER BY created_at
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+"""
+
+# The created_at range of the claimed batch limits the update to the monthly
+# partitions it came from.
+MARK_PROCESSED_SQL = """
+    UPDATE outbox_events SET processed_at = NOW()
+    WHERE event_id = ANY(%s) AND created_at BETWEEN %s AND %s
+"""
+
+PRUNE_SQL = """
+    DELETE FROM outbox_events
+    WHERE (event_id, created_at) IN (
+        SELECT event_id, created_at
+        FROM outbox_events
+        WHERE processed_at < NOW() - make_interval(secs => %s)
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+"""
+
+BACKLOG_SQL = """
+    SELECT COUNT(*), COALESCE(EXTRACT(EPOCH FROM NOW() - MIN(created_at)), 0)
+    FROM outbox_events
+    WHERE processed_at IS NULL
+"""
+
+# Latest backlog probe: (pending events, age of the oldest in seconds).
+_backlog = (0, 0.0)
+
+_delivered = meter.create_counter(
+    "wallet.outbox.delivered",
+    description="Outbox events delivered to the sink and marked processed",
+)
+_lag = meter.create_histogram(
+    "wallet.outbox.lag",
+    unit="ms",
+    description="Time from posting commit to outbox delivery",
+)
+_batch_duration = meter.create_histogram(
+    "wallet.outbox.batch.duration",
+    unit="ms",
+    description="Claim, deliver and mark time per outbox batch",
+)
+_failures = meter.create_counter(
+    "wallet.outbox.failures",
+    description="Outbox batches rolled back because claiming or delivery failed",
+)
+_pruned = meter.create_counter(
+    "wallet.outbox.pruned",
+    description="Processed outbox events deleted after the retention window",
+)
+
+
+def _observe_backlog(_: CallbackOptions):
+    yield Observation(_backlog[0])
+
+
+def _observe_backlog_age(_: CallbackOptions):
+    yield Observation(_backlog[1])
+
+
+meter.create_observable_gauge(
+    "wallet.outbox.pending",
+    callbacks=[_observe_backlog],
+    description="Unprocessed outbox events at the last backlog probe",
+)
+meter.create_observable_gauge(
+    "wallet.outbox.oldest_pending_age",
+    callbacks=[_observe_backlog_age],
+    unit="s",
+    description="Age of the oldest unprocessed outbox event; grows when the relay stalls",
+)
+
+
+def relay_batch(sink: OutboxSink, batch_size: int | None = None) -> int:
+    """Claim, deliver and mark one batch. Returns the number of events delivered."""
+    limit = batch_size or settings.outbox_batch_size
+    started = time.perf_counter()
+
+    def drain(conn) -> list[OutboxEvent]:
+        rows = conn.execute(CLAIM_SQL, (limit,), prepare=True).fetchall()
+        if not rows:
+            return []
+        events = [OutboxEvent(*row) for row in rows]
+        sink.deliver(events)
+        conn.execute(
+            MARK_PROCESSED_SQL,
+            ([event.event_id for event in events], events[0].created_at, events[-1].created_at),
+            prepare=True,
+        )
+        return events
+
+    events = run_transaction("outbox_relay", drain, RELAY)
+    if events:
+        now = datetime.now(UTC)
+        for event in events:
+            _lag.record((now - event.created_at).total_seconds() * 1000)
+        _delivered.add(len(events))
+        _batch_duration.record((time.perf_counter() - started) * 1000)
+    return len(events)
+
+
+def prune_processed(retention_seconds: float | None = None, batch_size: int | None = None) -> int:
+    """Delete processed events older than the retention window, in bounded batches."""
+    retention = retention_seconds
+    if retention is None:
+        retention = settings.outbox_retention_hours * 3600
+    limit = batch_size or settings.outbox_prune_batch_size
+    total = 0
+    while True:
+        deleted = run_transaction(
+            "outbox_prune",
+            lambda conn: conn.execute(PRUNE_SQL, (retention, limit), prepare=True).rowcount,
+            RELAY,
+        )
+        total += deleted
+        if deleted < limit:
+            break
+    _pruned.add(total)
+    return total
+
+
+def probe_backlog() -> tuple[int, float]:
+    """Refresh and return (pending events, oldest pending age in seconds)."""
+    global _backlog
+    row = run_transaction(
+        "outbox_backlog", lambda conn: conn.execute(BACKLOG_SQL, prepare=True).fetchone(), READ
+    )
+    _backlog = (row[0], float(row[1]))
+    return _backlog
+
+
+class RelayStats:
+    """Delivered-event totals shared by worker threads, for throughput logging."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.delivered = 0
+
+    def add(self, count: int) -> None:
+        with self._lock:
+            self.delivered += count
+
+
+def _work(sink: OutboxSink, stats: RelayStats, stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            delivered = relay_batch(sink)
+        except Exception:
+            _failures.add(1)
+            logger.exception("outbox batch failed; events stay pending")
+            stop.wait(settings.outbox_poll_interval_seconds)
+            continue
+        stats.add(delivered)
+        # A full batch means more is probably waiting, so only idle on a short one.
+        if delivered < settings.outbox_batch_size:
+            stop.wait(settings.outbox_poll_interval_seconds)
+
+
+def run_relay(sink: OutboxSink, workers: int, stop: threading.Event) -> None:
+    stats = RelayStats()
+    threads = [
+        threading.Thread(
+            target=_work, args=(sink, stats, stop), name=f"outbox-relay-{i}", daemon=True
+        )
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    last_prune = 0.0
+    last_report, last_delivered = time.monotonic(), 0
+    while not stop.wait(settings.outbox_report_interval_seconds):
+        now = time.monotonic()
+        delivered = stats.delivered
+        logger.info(
+            "outbox relay throughput",
+            extra={
+                "delivered": delivered,
+                "events_per_second": round((delivered - last_delivered) / (now - last_report), 1),
+            },
+        )
+        last_report, last_delivered = now, delivered
+        try:
+            pending, oldest_age = probe_backlog()
+            logger.info(
+                "outbox backlog", extra={"pending": pending, "oldest_age_seconds": oldest_age}
+            )
+        except Exception:
+            logger.exception("outbox backlog probe failed")
+        if now - last_prune >= settings.outbox_prune_interval_seconds:
+            try:
+                logger.info("outbox pruned", extra={"deleted": prune_processed()})
+            except Exception:
+                logger.exception("outbox prune failed")
+            last_prune = now
+
+    for thread in threads:
+        thread.join()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Relay outbox_events to a sink.")
+    parser.add_argument(
+        "--sink", default="stdout", help='"stdout", "file:<path>" or "<module>:<factory>"'
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--once", action="store_true", help="Drain pending events, prune, and exit")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    setup_otel()
+    sink = open_sink(args.sink)
+    try:
+        if args.once:
+            delivered = 0
+            while batch := relay_batch(sink):
+                delivered += batch
+            pruned = prune_processed()
+            logger.info("outbox drained", extra={"delivered": delivered, "pruned": pruned})
+            return
+
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        run_relay(sink, args.workers, stop)
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
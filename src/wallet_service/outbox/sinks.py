@@ -0,0 +1,66 @@
+import importlib
+import json
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Protocol, TextIO
+from uuid import UUID
+
+
+@dataclass(frozen=True)
+class OutboxEvent:
+    event_id: UUID
+    transaction_id: UUID
+    event_type: str
+    payload: dict
+    created_at: datetime
+
+
+class OutboxSink(Protocol):
+    def deliver(self, events: list[OutboxEvent]) -> None:
+        """Durably hand off a batch, or raise to have it redelivered later."""
+
+
+class JsonLinesSink:
+    """Writes one JSON object per event to a text stream."""
+
+    def __init__(self, stream: TextIO, *, fsync: bool = False) -> None:
+        self._stream = stream
+        self._fsync = fsync
+        # Relay worker threads share one sink; keep each batch contiguous.
+        self._lock = threading.Lock()
+
+    def deliver(self, events: list[OutboxEvent]) -> None:
+        lines = "".join(
+            json.dumps(
+                {
+                    "event_id": str(event.event_id),
+                    "transaction_id": str(event.transaction_id),
+                    "event_type": event.event_type,
+                    "payload": event.payload,
+                    "created_at": event.created_at.isoformat(),
+                },
+                separators=(",", ":"),
+            )
+            + "\n"
+            for event in events
+        )
+        with self._lock:
+            self._stream.write(lines)
+            self._stream.flush()
+            if self._fsync:
+                os.fsync(self._stream.fileno())
+
+
+def open_sink(spec: str) -> OutboxSink:
+    """Build a sink from "stdout", "file:<path>" or "<module>:<factory>"."""
+    if spec == "stdout":
+        return JsonLinesSink(sys.stdout)
+    if spec.startswith("file:"):
+        return JsonLinesSink(open(spec.removeprefix("file:"), "a", encoding="utf-8"), fsync=True)
+    module_name, _, factory = spec.partition(":")
+    if not factory:
+        raise ValueError(f"unknown outbox sink {spec!r}")
+    return getattr(importlib.import_module(module_name), factory)()
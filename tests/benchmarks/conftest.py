@@ -0,0 +1,172 @@
+"""Ledger benchmarks against the test database, gated on statements per call.
+
+Not part of the default run; select the directory explicitly:
+
+    uv run pytest tests/benchmarks
+    uv run pytest tests/benchmarks --update-baseline   # after an intended change
+
+Each benchmark counts the SQL statements of one call with the same counter
+the statement budgets use (wallet_service.observability.queries) and fails if
+that grows past baseline.json. Only the attempt that commits is counted, so
+serialization retries in the contended setup do not move the gate and it holds
+on any machine; the retried statements are reported in extra_info instead.
+Latencies are recorded but only compared on request, against an earlier run
+saved on the same machine by pytest-benchmark:
+
+    uv run pytest tests/benchmarks --benchmark-autosave
+    uv run pytest tests/benchmarks --benchmark-compare --benchmark-compare-fail=median:50%
+"""
+
+import json
+import threading
+from decimal import Decimal
+from pathlib import Path
+from statistics import median
+from uuid import uuid4
+
+import psycopg
+import pytest
+
+from wallet_service.observability.queries import count_queries
+
+BASELINE = Path(__file__).with_name("baseline.json")
+# Writers hammering the hot wallets in the contended setup, and the retry
+# budget there: serialization failures are expected there, and their retries
+# show up in the latencies and in extra_info["retried_statements"].
+CONTENDING_WRITERS = 4
+CONTENDED_MAX_RETRIES = 50
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("ledger benchmarks")
+    group.addoption(
+        "--update-baseline",
+        action="store_true",
+        help="Rewrite baseline.json from this run instead of checking against it",
+    )
+
+
+class Statements:
+    """Statements run by each call of a benchmarked function.
+
+    Only the calling thread's statements are counted: the contending writers
+    run outside its count_queries() scope. A retried transaction counts its
+    committed attempt in calls and the rolled-back ones in retried.
+    """
+
+    def __init__(self) -> None:
+        self.calls: list[int] = []
+        self.retried = 0
+
+    def measure(self, fn):
+        """fn, recording the statements of every call in self.calls."""
+
+        def measured():
+            with count_queries() as stats:
+                try:
+                    return fn()
+                finally:
+                    self.calls.append(stats.statements)
+                    self.retried += stats.retried
+
+        return measured
+
+    def per_call(self) -> int:
+        return int(median(self.calls))
+
+
+@pytest.fixture
+def statements():
+    return Statements()
+
+
+def _credit(wallet_id, amount: str = "1000000.00") -> None:
+    from wallet_service.ledger import service
+
+    service.post_adjustment(
+        idempotency_key=f"bench-fund-{wallet_id}",
+        wallet_id=wallet_id,
+        amount=Decimal(amount),
+        direction="credit",
+        asset="USD",
+        reason="benchmark funding",
+        expected_wallet_version=None,
+    )
+
+
+@pytest.fixture(params=["uncontended", "contended"])
+def wallets(request, ledger_db, monkeypatch):
+    """A funded wallet pair; in the contended setup other writers keep posting to it."""
+    from wallet_service.config import settings
+    from wallet_service.ledger import service
+
+    pair = (uuid4(), uuid4())
+    for wallet_id in pair:
+        service.create_wallet(wallet_id, "USD")
+        _credit(wallet_id)
+    if request.param == "uncontended":
+        yield pair
+        return
+
+    monkeypatch.setattr(settings, "db_tx_max_retries", CONTENDED_MAX_RETRIES)
+    stop = threading.Event()
+
+    def contend(writer: int) -> None:
+        i = 0
+        while not stop.is_set():
+            from_wallet_id, to_wallet_id = pair if (writer + i) % 2 else pair[::-1]
+            try:
+                service.post_transfer(
+                    idempotency_key=f"bench-contend-{pair[0]}-{writer}-{i}",
+                    from_wallet_id=from_wallet_id,
+                    to_wallet_id=to_wallet_id,
+                    amount=Decimal("0.01"),
+                    asset="USD",
+                    external_reference=None,
+                    expected_from_version=None,
+                    expected_to_version=None,
+                )
+            except psycopg.Error:
+                pass
+            i += 1
+
+    writers = [
+        threading.Thread(target=contend, args=(n,), daemon=True) for n in range(CONTENDING_WRITERS)
+    ]
+    for writer in writers:
+        writer.start()
+    yield pair
+    stop.set()
+    for writer in writers:
+        writer.join()
+
+
+class Baseline:
+    def __init__(self, config) -> None:
+        self.update = config.getoption("--update-baseline")
+        self.stored = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+        self.measured: dict[str, dict] = {}
+
+    def check(self, name: str, benchmark, statements: Statements) -> None:
+        result = {"statements": statements.per_call()}
+        benchmark.extra_info.update(result, retried_statements=statements.retried)
+        self.measured[name] = result
+        if self.update:
+            return
+        expected = self.stored.get(name)
+        assert expected is not None, f"{name} has no baseline; run with --update-baseline"
+        assert result["statements"] <= expected["statements"], (
+            f"{name}: {result['statements']} statements per call, baseline {expected['statements']}"
+        )
+
+    def save(self) -> None:
+        merged = {**self.stored, **self.measured}
+        BASELINE.write_text(json.dumps(dict(sorted(merged.items())), indent=2) + "\n")
+
+
+@pytest.fixture(scope="session")
+def baseline(pytestconfig):
+    stored = Baseline(pytestconfig)
+    yield stored
+    if stored.update and stored.measured:
+        stored.save()
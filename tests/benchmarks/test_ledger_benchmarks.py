@@ -0,0 +1,90 @@
+from decimal import Decimal
+from itertools import count
+from uuid import uuid4
+
+from wallet_service.config import settings
+from wallet_service.ledger import service
+from wallet_service.ledger.replay_cache import replay_cache
+
+_keys = count()
+
+
+def _transfer(from_wallet_id, to_wallet_id, key: str | None = None):
+    return service.post_transfer(
+        idempotency_key=key or f"bench-transfer-{uuid4()}-{next(_keys)}",
+        from_wallet_id=from_wallet_id,
+        to_wallet_id=to_wallet_id,
+        amount=Decimal("0.01"),
+        asset="USD",
+        external_reference=None,
+        expected_from_version=None,
+        expected_to_version=None,
+    )
+
+
+def _name(request) -> str:
+    return request.node.name.removeprefix("test_")
+
+
+def test_post_transfer(benchmark, baseline, statements, wallets, request):
+    payer, payee = wallets
+    benchmark(statements.measure(lambda: _transfer(payer, payee)))
+    baseline.check(_name(request), benchmark, statements)
+
+
+def test_post_adjustment(benchmark, baseline, statements, wallets, request):
+    wallet_id = wallets[0]
+
+    def adjust():
+        return service.post_adjustment(
+            idempotency_key=f"bench-adjust-{uuid4()}",
+            wallet_id=wallet_id,
+            amount=Decimal("0.01"),
+            direction="credit",
+            asset="USD",
+            reason="benchmark",
+            expected_wallet_version=None,
+        )
+
+    benchmark(statements.measure(adjust))
+    baseline.check(_name(request), benchmark, statements)
+
+
+def test_get_balance(benchmark, baseline, statements, wallets, request):
+    # The balance cache only answers while the listener runs, which it does
+    # not here: every call reads the projection.
+    wallet_id = wallets[0]
+    benchmark(statements.measure(lambda: service.get_balance(wallet_id)))
+    baseline.check(_name(request), benchmark, statements)
+
+
+def test_get_transaction(benchmark, baseline, statements, wallets, request):
+    transaction_id = _transfer(*wallets).transaction_id
+    benchmark(statements.measure(lambda: service.get_transaction(transaction_id)))
+    baseline.check(_name(request), benchmark, statements)
+
+
+def test_audit_balance(benchmark, baseline, statements, wallets, request):
+    wallet_id = wallets[0]
+    for _ in range(20):
+        _transfer(*wallets)
+    benchmark(statements.measure(lambda: service.audit_balance(wallet_id)))
+    baseline.check(_name(request), benchmark, statements)
+
+
+def test_replay_cached(benchmark, baseline, statements, wallets, request):
+    key = f"bench-replay-{uuid4()}"
+    _transfer(*wallets, key=key)
+    benchmark(statements.measure(lambda: _transfer(*wallets, key=key)))
+    baseline.check(_name(request), benchmark, statements)
+
+
+def test_replay_from_database(benchmark, baseline, statements, wallets, request, monkeypatch):
+    # With the in-process cache off every replay is answered by the idempotency
+    # lookup in the posting statement, as on another replica.
+    monkeypatch.setattr(settings, "idempotency_cache_max_entries", 0)
+    replay_cache.clear()
+    key = f"bench-replay-{uuid4()}"
+    _transfer(*wallets, key=key)
+    benchmark(statements.measure(lambda: _transfer(*wallets, key=key)))
+    baseline.check(_name(request), benchmark, statements)
@@ -7,6 +7,8 @@ import pytest
 from fastapi.testclient import TestClient
 
 TEST_DB = os.getenv("TEST_DATABASE_URL", "postgresql://raj@localhost:5432/wallet_service")
+# Throwaway database for tests that detach or drop journal partitions.
+SCRATCH_DB = TEST_DB.rsplit("/", 1)[0] + "/wallet_service_scratch"
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -24,19 +26,76 @@ def app_client(monkeypatch):
     monkeypatch.setattr(settings, "database_url", TEST_DB)
     monkeypatch.setattr(settings, "otel_enabled", False)
 
+    from wallet_service.ledger.balance_cache import balance_cache
+    from wallet_service.ledger.replay_cache import replay_cache
     from wallet_service.main import app
 
+    # The journal is reset below, so cached replays and balances from earlier
+    # tests are void.
+    replay_cache.clear()
+    balance_cache.clear()
     with TestClient(app) as client:
         with psycopg.connect(TEST_DB) as conn:
-            conn.execute("TRUNCATE journal_entries, journal_transactions, outbox_events RESTART IDENTITY CASCADE")
             conn.execute(
-                "DELETE FROM balance_projections WHERE wallet_id <> '00000000-0000-0000-0000-000000000001'"
+                "TRUNCATE journal_entries, journal_transactions, outbox_events, idempotency_keys,"
+                " balance_checkpoints, journal_carry_forward RESTART IDENTITY CASCADE"
             )
-            conn.execute("DELETE FROM accounts WHERE wallet_id <> '00000000-0000-0000-0000-000000000001'")
+            # System wallet stripes survive the reset, like the root system wallet.
+            for table in ("balance_projections", "accounts"):
+                conn.execute(
+                    f"DELETE FROM {table}"
+                    " WHERE wallet_id NOT IN (SELECT wallet_id FROM system_wallet_stripes)"
+                )
             conn.commit()
         yield client
 
 
+@pytest.fixture
+def anyio_backend():
+    # psycopg's async connections and pools run on asyncio only.
+    return "asyncio"
+
+
+@pytest.fixture
+def ledger_db(monkeypatch):
+    """Point the ledger service at the test database without starting the app."""
+    from wallet_service.config import settings
+    from wallet_service.db import database
+    from wallet_service.db.migrations import apply_migrations
+    from wallet_service.ledger.replay_cache import replay_cache
+
+    monkeypatch.setattr(settings, "database_url", TEST_DB)
+    monkeypatch.setattr(settings, "otel_enabled", False)
+    apply_migrations()
+    replay_cache.clear()
+    yield
+    database.close_pool()
+
+
+@pytest.fixture
+def scratch_ledger(monkeypatch):
+    """Like ledger_db, on a freshly created and migrated SCRATCH_DB."""
+    from wallet_service.config import settings
+    from wallet_service.db import database
+    from wallet_service.db.migrations import apply_migrations
+    from wallet_service.ledger.replay_cache import replay_cache
+
+    admin = TEST_DB.rsplit("/", 1)[0] + "/postgres"
+    name = SCRATCH_DB.rsplit("/", 1)[1]
+    with psycopg.connect(admin, autocommit=True) as conn:
+        conn.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+        conn.execute(f"CREATE DATABASE {name}")
+    monkeypatch.setattr(settings, "database_url", SCRATCH_DB)
+    monkeypatch.setattr(settings, "otel_enabled", False)
+    apply_migrations()
+    replay_cache.clear()
+    yield
+    database.close_pool()
+    replay_cache.clear()
+    with psycopg.connect(admin, autocommit=True) as conn:
+        conn.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+
+
 def auth_header(scopes: str = "wallet:read wallet:write wallet:admin") -> dict:
     from wallet_service.config import settings
 
@@ -0,0 +1,47 @@
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+
+@pytest.fixture
+async def async_ledger(ledger_db):
+    from wallet_service.db import database
+
+    yield
+    await database.close_async_pool()
+
+
+@pytest.mark.anyio
+async def test_sync_and_async_paths_match(async_ledger, wallet_ids):
+    from wallet_service.domain.errors import ConflictError, NotFoundError
+    from wallet_service.ledger import async_service, service
+
+    w1, w2 = (UUID(w) for w in wallet_ids)
+    service.create_wallet(w1, "USD")
+    await async_service.create_wallet(w2, "USD")
+
+    transfer = {
+        "idempotency_key": f"idem-async-{w1}",
+        "from_wallet_id": w1,
+        "to_wallet_id": w2,
+        "amount": Decimal("3.50"),
+        "asset": "USD",
+        "external_reference": None,
+        "expected_from_version": None,
+        "expected_to_version": None,
+    }
+    posted = await async_service.post_transfer(**transfer)
+    replayed = service.post_transfer(**transfer)
+    assert replayed == posted
+
+    assert await async_service.get_transaction(posted.transaction_id) == service.get_transaction(
+        posted.transaction_id
+    )
+    assert await async_service.get_balance(w2) == service.get_balance(w2)
+    assert (await async_service.audit_balance(w2))["balance"] == Decimal("3.50")
+
+    with pytest.raises(ConflictError):
+        await async_service.post_transfer(**{**transfer, "amount": Decimal(4)})
+    with pytest.raises(NotFoundError):
+        await async_service.get_balance(UUID(int=7))
@@ -0,0 +1,89 @@
+from decimal import Decimal
+from uuid import uuid4
+
+import psycopg
+
+from tests.conftest import TEST_DB
+
+
+def _funded_wallets(count: int = 3):
+    from wallet_service.ledger import service
+
+    wallets = [uuid4() for _ in range(2)]
+    for wallet in wallets:
+        service.create_wallet(wallet, "USD")
+    _transfer(*wallets, count)
+    return wallets
+
+
+def _transfer(payer, payee, count: int) -> None:
+    from wallet_service.ledger import service
+
+    for _ in range(count):
+        service.post_transfer(
+            idempotency_key=f"checkpoint-{uuid4()}",
+            from_wallet_id=payer,
+            to_wallet_id=payee,
+            amount=Decimal("1.50"),
+            asset="USD",
+            external_reference=None,
+            expected_from_version=None,
+            expected_to_version=None,
+        )
+
+
+def _checkpoint(wallet):
+    with psycopg.connect(TEST_DB) as conn:
+        return conn.execute(
+            "SELECT balance, sealed_at FROM balance_checkpoints WHERE wallet_id = %s", (wallet,)
+        ).fetchone()
+
+
+def test_audit_adds_entries_after_checkpoint(ledger_db):
+    from wallet_service.ledger import service
+    from wallet_service.ledger.checkpoints import seal_checkpoints
+
+    payer, payee = _funded_wallets(3)
+    seal_checkpoints(min_age_seconds=0)
+    assert _checkpoint(payee)[0] == Decimal("4.50")
+
+    _transfer(payer, payee, 2)
+    assert service.audit_balance(payee)["balance"] == Decimal("7.50")
+    assert service.audit_balance(payee, full=True)["balance"] == Decimal("7.50")
+
+    run = seal_checkpoints(min_age_seconds=0, full=True)
+    assert run.mismatched == []
+    assert _checkpoint(payee)[0] == Decimal("7.50")
+    assert service.audit_balance(payer)["balance"] == Decimal("-7.50")
+
+
+def test_full_reseal_reports_and_repairs_drifted_checkpoint(ledger_db):
+    from wallet_service.ledger import service
+    from wallet_service.ledger.checkpoints import seal_checkpoints
+
+    _, payee = _funded_wallets(2)
+    seal_checkpoints(min_age_seconds=0)
+    with psycopg.connect(TEST_DB) as conn:
+        conn.execute("UPDATE balance_checkpoints SET balance = 99 WHERE wallet_id = %s", (payee,))
+
+    assert service.audit_balance(payee)["balance"] == Decimal(99)
+    assert service.audit_balance(payee, full=True)["balance"] == Decimal("3.00")
+
+    run = seal_checkpoints(min_age_seconds=0, full=True)
+    assert payee in run.mismatched
+    assert service.audit_balance(payee)["balance"] == Decimal("3.00")
+
+
+def test_rerun_skips_recently_sealed_wallets(ledger_db):
+    from wallet_service.ledger.checkpoints import seal_checkpoints
+
+    sealed_earlier = _funded_wallets(1)
+    seal_checkpoints(min_age_seconds=0, batch_size=2)
+    sealed_at = _checkpoint(sealed_earlier[0])[1]
+
+    late = _funded_wallets(1)
+    run = seal_checkpoints(min_age_seconds=3600, batch_size=2)
+
+    assert run.sealed == 2
+    assert _checkpoint(sealed_earlier[0])[1] == sealed_at
+    assert all(_checkpoint(wallet) is not None for wallet in late)
@@ -0,0 +1,144 @@
+import time
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+
+@pytest.fixture
+def listening_cache(ledger_db):
+    from wallet_service.ledger.balance_cache import (
+        balance_cache,
+        start_balance_listener,
+        stop_balance_listener,
+    )
+
+    balance_cache.clear()
+    start_balance_listener()
+    _wait_for(lambda: balance_cache.listening)
+    yield balance_cache
+    stop_balance_listener()
+    balance_cache.clear()
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.02)
+
+
+def _unavailable(*args, **kwargs):
+    from wallet_service.domain.errors import ServiceUnavailableError
+
+    raise ServiceUnavailableError("database unavailable")
+
+
+def _transfer(w1, w2, key: str):
+    from wallet_service.ledger import service
+
+    return service.post_transfer(**_transfer_kwargs(w1, w2, key))
+
+
+def _transfer_kwargs(w1, w2, key: str) -> dict:
+    return {
+        "idempotency_key": key,
+        "from_wallet_id": w1,
+        "to_wallet_id": w2,
+        "amount": Decimal("2.00"),
+        "asset": "USD",
+        "external_reference": None,
+        "expected_from_version": None,
+        "expected_to_version": None,
+    }
+
+
+def test_cached_balance_is_invalidated_by_commit_notification(
+    listening_cache, wallet_ids, monkeypatch
+):
+    from wallet_service.ledger import service
+
+    w1, w2 = (UUID(w) for w in wallet_ids)
+    service.create_wallet(w1, "USD")
+    service.create_wallet(w2, "USD")
+    assert service.get_balance(w2)["version"] == 0
+
+    with monkeypatch.context() as patched:
+        patched.setattr(service, "run_transaction", _unavailable)
+        assert service.get_balance(w2)["version"] == 0
+
+    # As if another replica posted: only the notification reaches this cache.
+    with monkeypatch.context() as patched:
+        patched.setattr(listening_cache, "invalidate", lambda wallet_ids: None)
+        _transfer(w1, w2, f"cache-{w1}")
+    _wait_for(lambda: listening_cache.get(w2) is None)
+    balance = service.get_balance(w2)
+    assert balance["version"] == 1
+    assert balance["balance"] == Decimal("2.00")
+
+
+def test_read_after_local_posting_sees_it_without_waiting(listening_cache, wallet_ids, monkeypatch):
+    from wallet_service.ledger import service
+
+    # Hold back notifications: reads must not depend on the listener catching up.
+    monkeypatch.setattr(listening_cache, "apply", lambda payload: None)
+    w1, w2 = (UUID(w) for w in wallet_ids)
+    service.create_wallet(w1, "USD")
+    service.create_wallet(w2, "USD")
+    service.get_balance(w1), service.get_balance(w2)
+
+    _transfer(w1, w2, f"local-{w1}")
+    assert (service.get_balance(w1)["version"], service.get_balance(w2)["version"]) == (1, 1)
+
+    # The version just read is accepted as the expected version of the next posting.
+    service.post_transfer(
+        **{**_transfer_kwargs(w2, w1, f"local-expected-{w1}"), "expected_from_version": 1}
+    )
+    assert service.get_balance(w2)["version"] == 2
+
+    service.post_transfer_batch([_transfer_kwargs(w1, w2, f"local-batch-{w1}")], atomic=True)
+    assert (service.get_balance(w1)["version"], service.get_balance(w2)["version"]) == (3, 3)
+
+
+@pytest.mark.anyio
+async def test_async_read_after_local_posting_sees_it_without_waiting(
+    listening_cache, wallet_ids, monkeypatch
+):
+    from wallet_service.db import database
+    from wallet_service.ledger import async_service
+
+    monkeypatch.setattr(listening_cache, "apply", lambda payload: None)
+    w1, w2 = (UUID(w) for w in wallet_ids)
+    await async_service.create_wallet(w1, "USD")
+    await async_service.create_wallet(w2, "USD")
+    try:
+        assert (await async_service.get_balance(w2))["version"] == 0
+        await async_service.post_transfer(**_transfer_kwargs(w1, w2, f"async-local-{w1}"))
+        assert (await async_service.get_balance(w2))["version"] == 1
+        await async_service.post_transfer_batch(
+            [_transfer_kwargs(w1, w2, f"async-local-batch-{w1}")], atomic=False
+        )
+        assert (await async_service.get_balance(w2))["version"] == 2
+    finally:
+        await database.close_async_pool()
+
+
+def test_stale_reads_need_opt_in_and_report_staleness(listening_cache, wallet_ids, monkeypatch):
+    from wallet_service.config import settings
+    from wallet_service.domain.errors import ServiceUnavailableError
+    from wallet_service.ledger import service
+
+    w1, _ = (UUID(w) for w in wallet_ids)
+    service.create_wallet(w1, "USD")
+    service.get_balance(w1)
+    # Simulate the outage reaching the listener too: entries are no longer verified.
+    listening_cache.mark_lost()
+    monkeypatch.setattr(service, "run_transaction", _unavailable)
+
+    with pytest.raises(ServiceUnavailableError):
+        service.get_balance(w1)
+
+    monkeypatch.setattr(settings, "allow_stale_reads", True)
+    stale = service.get_balance(w1)
+    assert stale["version"] == 0
+    assert 0 <= stale["stale_seconds"] <= settings.stale_read_max_seconds
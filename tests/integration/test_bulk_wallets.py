@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+
+from tests.conftest import auth_header
+from wallet_service.domain.errors import ValidationError
+from wallet_service.observability.queries import count_queries
+
+
+def test_bulk_create_reports_created_and_existing(app_client):
+    headers = auth_header("wallet:read wallet:write")
+    existing = str(uuid4())
+    app_client.post("/v1/wallets", headers=headers, json={"wallet_id": existing, "asset": "EUR"})
+    fresh = [str(uuid4()) for _ in range(3)]
+    wallets = [{"wallet_id": w} for w in fresh[:2]] + [
+        {"wallet_id": existing, "asset": "USD"},
+        {"wallet_id": fresh[2], "asset": "GBP"},
+    ]
+
+    response = app_client.post("/v1/wallets:bulk", headers=headers, json={"wallets": wallets})
+    assert response.status_code == 200
+    assert response.json() == {"created": fresh, "existing": [existing]}
+
+    # A re-sent batch creates nothing and leaves the existing asset alone.
+    again = app_client.post("/v1/wallets:bulk", headers=headers, json={"wallets": wallets})
+    assert again.json() == {"created": [], "existing": [*fresh[:2], existing, fresh[2]]}
+    balance = app_client.get(f"/v1/wallets/{fresh[2]}/balance", headers=headers).json()
+    assert (balance["asset"], Decimal(balance["balance"])) == ("GBP", 0)
+    balance = app_client.get(f"/v1/wallets/{existing}/balance", headers=headers).json()
+    assert balance["asset"] == "EUR"
+
+
+def test_bulk_create_rejects_duplicates_and_needs_write_scope(app_client):
+    wallet = str(uuid4())
+    body = {"wallets": [{"wallet_id": wallet}, {"wallet_id": wallet}]}
+    response = app_client.post("/v1/wallets:bulk", headers=auth_header(), json=body)
+    assert response.status_code == 422
+    single = {"wallets": [{"wallet_id": wallet}]}
+    denied = app_client.post("/v1/wallets:bulk", headers=auth_header("wallet:read"), json=single)
+    assert denied.status_code == 403
+    empty = app_client.post("/v1/wallets:bulk", headers=auth_header(), json={"wallets": []})
+    assert empty.status_code == 422
+
+
+def test_bulk_create_is_one_statement_and_safe_concurrently(ledger_db):
+    from wallet_service.ledger import service
+
+    wallets = [(uuid4(), "USD") for _ in range(200)]
+    with count_queries() as stats:
+        result = service.create_wallets(wallets[:100])
+    assert stats.statements == 1
+    assert len(result["created"]) == 100
+
+    # Overlapping batches in opposite orders lock in wallet_id order, so they
+    # neither deadlock nor create a wallet twice.
+    batches = [wallets, list(reversed(wallets))] * 2
+    with ThreadPoolExecutor(len(batches)) as pool:
+        results = list(pool.map(service.create_wallets, batches))
+    created = [wallet_id for r in results for wallet_id in r["created"]]
+    assert sorted(created) == sorted(w for w, _ in wallets[100:])
+    assert all(isinstance(w, UUID) for w in created)
+
+    with pytest.raises(ValidationError):
+        service.create_wallets([wallets[0], wallets[0]])
@@ -0,0 +1,47 @@
+from uuid import uuid4
+
+from tests.conftest import auth_header
+
+
+def test_fanout_posts_one_multi_leg_transaction(app_client):
+    headers = auth_header("wallet:read wallet:write")
+    source = str(uuid4())
+    targets = [str(uuid4()) for _ in range(5)]
+    for wallet in [source, *targets]:
+        app_client.post("/v1/wallets", headers=headers, json={"wallet_id": wallet, "asset": "USD"})
+
+    # The first target is credited twice; its deltas are aggregated.
+    credits = [{"to_wallet_id": t, "amount": "1.00"} for t in targets]
+    credits.append({"to_wallet_id": targets[0], "amount": "0.50"})
+    payload = {"from_wallet_id": source, "credits": credits, "expected_from_version": 0}
+
+    def fanout(key: str, body: dict):
+        return app_client.post(
+            "/v1/transfers:fanout", headers={**headers, "Idempotency-Key": key}, json=body
+        )
+
+    posted = fanout("fanout-1", payload)
+    assert posted.status_code == 200
+    tx = posted.json()
+    assert tx["operation_scope"] == "fanout"
+    assert [(e["account_id"], e["amount"]) for e in tx["entries"]] == [
+        (source, "-5.500000"),
+        *[(t, "1.000000") for t in targets],
+        (targets[0], "0.500000"),
+    ]
+
+    source_balance = app_client.get(f"/v1/wallets/{source}/balance", headers=headers).json()
+    assert (source_balance["balance"], source_balance["version"]) == ("-5.500000", 1)
+    first_target = app_client.get(f"/v1/wallets/{targets[0]}/balance", headers=headers).json()
+    assert (first_target["balance"], first_target["version"]) == ("1.500000", 1)
+    audit = app_client.get(f"/v1/wallets/{targets[0]}/balance/audit", headers=headers).json()
+    assert audit["balance"] == "1.500000"
+
+    assert fanout("fanout-1", payload).json() == tx
+    assert fanout("fanout-1", {**payload, "credits": credits[:2]}).status_code == 409
+
+    self_credit = {"from_wallet_id": source, "credits": [{"to_wallet_id": source, "amount": "1"}]}
+    assert fanout("fanout-2", self_credit).status_code == 422
+    stale = fanout("fanout-3", payload)
+    assert stale.status_code == 409
+    assert stale.json() == {"error": "optimistic version conflict"}
@@ -0,0 +1,116 @@
+import gzip
+import json
+import shutil
+from decimal import Decimal
+from uuid import uuid4
+
+import psycopg
+import pytest
+
+from tests.conftest import SCRATCH_DB
+
+
+def _transfer(payer, payee, key: str | None = None):
+    from wallet_service.ledger import service
+
+    return service.post_transfer(
+        idempotency_key=key or f"archive-{uuid4()}",
+        from_wallet_id=payer,
+        to_wallet_id=payee,
+        amount=Decimal("2.25"),
+        asset="USD",
+        external_reference="tab\there",
+        expected_from_version=None,
+        expected_to_version=None,
+    )
+
+
+def _detach_legacy():
+    from wallet_service.ledger.partitions import detach_month
+
+    with psycopg.connect(SCRATCH_DB) as conn:
+        conn.execute("UPDATE outbox_events SET processed_at = NOW()")
+        legacy_until = conn.execute("SELECT legacy_until FROM journal_partitioning").fetchone()[0]
+    assert detach_month("_legacy", legacy_until)
+
+
+def _audits(*wallets):
+    from wallet_service.ledger import service
+
+    return [
+        (
+            service.audit_balance(wallet)["balance"],
+            service.audit_balance(wallet, full=True)["balance"],
+        )
+        for wallet in wallets
+    ]
+
+
+def test_archive_round_trip(scratch_ledger, tmp_path):
+    from wallet_service.ledger import service
+    from wallet_service.ledger.archive import (
+        detached_months,
+        export_detached,
+        restore_month,
+        verify_archive,
+    )
+    from wallet_service.ledger.checkpoints import seal_checkpoints
+    from wallet_service.ledger.replay_cache import replay_cache
+
+    payer, payee = uuid4(), uuid4()
+    for wallet in (payer, payee):
+        service.create_wallet(wallet, "USD")
+    first = _transfer(payer, payee)
+    seal_checkpoints(min_age_seconds=0)
+    _transfer(payer, payee)
+    _detach_legacy()
+    before = _audits(payer, payee)
+
+    assert detached_months() == ["_legacy"]
+    [manifest] = export_detached(tmp_path)
+    assert manifest["month"] == "legacy" and manifest["created_from"] is None
+    assert manifest["tables"]["journal_entries"]["rows"] == 4
+    assert verify_archive(tmp_path / "legacy") == manifest
+    assert detached_months() == []
+    with psycopg.connect(SCRATCH_DB) as conn:
+        assert conn.execute("SELECT to_regclass('journal_entries_legacy')").fetchone()[0] is None
+    assert _audits(payer, payee) == before
+
+    restored = restore_month("legacy", tmp_path)
+    assert restored["month"] == "legacy"
+    with psycopg.connect(SCRATCH_DB) as conn:
+        carried = conn.execute(
+            "SELECT balance FROM journal_carry_forward WHERE wallet_id = %s", (payee,)
+        ).fetchone()[0]
+    assert carried == 0
+    assert _audits(payer, payee) == before
+    assert service.get_transaction(first.transaction_id).entries == first.entries
+    replay_cache.clear()
+    replay = _transfer(payer, payee, key=first.idempotency_key)
+    assert replay.transaction_id == first.transaction_id
+    assert replay.external_reference == "tab\there"
+
+
+def test_corrupt_archive_is_rejected(scratch_ledger, tmp_path):
+    from wallet_service.ledger import service
+    from wallet_service.ledger.archive import ArchiveError, export_detached, restore_month
+
+    payer, payee = uuid4(), uuid4()
+    for wallet in (payer, payee):
+        service.create_wallet(wallet, "USD")
+    _transfer(payer, payee)
+    _detach_legacy()
+    export_detached(tmp_path)
+
+    damaged = tmp_path / "damaged"
+    shutil.copytree(tmp_path / "legacy", damaged)
+    column = damaged / "journal_entries" / "amount.gz"
+    column.write_bytes(gzip.compress(b"1000000.00\n-1000000.00\n"))
+    with pytest.raises(ArchiveError, match="checksum"):
+        restore_month("damaged", tmp_path)
+
+    (damaged / "manifest.json").write_text(json.dumps({"format": 99}))
+    with pytest.raises(ArchiveError, match="format"):
+        restore_month("damaged", tmp_path)
+    with psycopg.connect(SCRATCH_DB) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0] == 0
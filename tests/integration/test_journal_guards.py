@@ -0,0 +1,97 @@
+from uuid import uuid4
+
+import psycopg
+import pytest
+from psycopg.errors import ForeignKeyViolation, RaiseException
+
+from tests.conftest import TEST_DB
+
+INSERT_TRANSACTION_SQL = """
+    INSERT INTO journal_transactions(
+        transaction_id, operation_scope, idempotency_key, payload_hash, status, created_at
+    )
+    VALUES (%s, 'guard', %s, 'x', 'committed', NOW())
+"""
+
+
+def _wallets(conn, *assets):
+    wallets = [uuid4() for _ in assets]
+    for wallet, asset in zip(wallets, assets, strict=True):
+        conn.execute("INSERT INTO accounts(wallet_id, asset) VALUES (%s, %s)", (wallet, asset))
+    return wallets
+
+
+def _transaction(conn):
+    transaction_id = conn.execute("SELECT uuid_v7_at(NOW())").fetchone()[0]
+    conn.execute(INSERT_TRANSACTION_SQL, (transaction_id, str(uuid4())))
+    return transaction_id
+
+
+def _insert_entries(conn, rows, table="journal_entries"):
+    conn.execute(
+        f"INSERT INTO {table}(transaction_id, seq, wallet_id, amount, asset, created_at)"
+        " SELECT *, NOW()"
+        " FROM unnest(%s::uuid[], %s::int[], %s::uuid[], %s::numeric[], %s::text[])",
+        [list(column) for column in zip(*rows, strict=True)],
+    )
+
+
+@pytest.mark.parametrize(
+    ("legs", "error", "message"),
+    [
+        ([("a", "5", "USD"), ("b", "-5", "EUR")], RaiseException, "mismatches account asset"),
+        ([("a", "5", "USD"), ("b", "-4", "USD")], RaiseException, "unbalanced sum=1"),
+        ([("a", "5", "USD")], RaiseException, "requires at least 2 entries"),
+        # The wallet foreign key's row check runs before the statement trigger.
+        ([("a", "5", "USD"), ("missing", "-5", "USD")], ForeignKeyViolation, "wallet_id"),
+    ],
+)
+def test_statement_rejects_invalid_entries(ledger_db, legs, error, message):
+    with psycopg.connect(TEST_DB) as conn:
+        wallets = dict(zip("ab", _wallets(conn, "USD", "USD"), strict=True))
+        wallets["missing"] = uuid4()
+        good, bad = _transaction(conn), _transaction(conn)
+        rows = [
+            (good, 1, wallets["a"], "1", "USD"),
+            (good, 2, wallets["b"], "-1", "USD"),
+        ] + [
+            (bad, seq, wallets[name], amount, asset)
+            for seq, (name, amount, asset) in enumerate(legs, 1)
+        ]
+        with pytest.raises(error, match=message):
+            _insert_entries(conn, rows)
+
+
+def test_direct_partition_inserts_are_guarded(ledger_db):
+    with psycopg.connect(TEST_DB) as conn:
+        payer, payee = _wallets(conn, "USD", "USD")
+        transaction_id = _transaction(conn)
+        partition = (
+            conn.execute(
+                "SELECT tableoid::regclass::text FROM journal_transactions"
+                " WHERE transaction_id = %s",
+                (transaction_id,),
+            )
+            .fetchone()[0]
+            .replace("journal_transactions", "journal_entries")
+        )
+        with pytest.raises(RaiseException, match="unbalanced"):
+            _insert_entries(
+                conn,
+                [(transaction_id, 1, payer, "-3", "USD"), (transaction_id, 2, payee, "2", "USD")],
+                table=partition,
+            )
+
+
+def test_transaction_without_entries_fails_at_commit(ledger_db):
+    with psycopg.connect(TEST_DB) as conn:
+        payer, payee = _wallets(conn, "USD", "USD")
+        transaction_id = _transaction(conn)
+        _insert_entries(
+            conn, [(transaction_id, 1, payer, "-3", "USD"), (transaction_id, 2, payee, "3", "USD")]
+        )
+        conn.commit()
+
+        _transaction(conn)
+        with pytest.raises(RaiseException, match="requires at least 2 entries"):
+            conn.commit()
@@ -0,0 +1,159 @@
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import psycopg
+import pytest
+
+from tests.conftest import SCRATCH_DB, TEST_DB
+
+
+def _transfer(payer, payee, key: str | None = None):
+    from wallet_service.ledger import service
+
+    return service.post_transfer(
+        idempotency_key=key or f"partition-{uuid4()}",
+        from_wallet_id=payer,
+        to_wallet_id=payee,
+        amount=Decimal("1.50"),
+        asset="USD",
+        external_reference=None,
+        expected_from_version=None,
+        expected_to_version=None,
+    )
+
+
+def _wallets():
+    from wallet_service.ledger import service
+
+    wallets = [uuid4() for _ in range(2)]
+    for wallet in wallets:
+        service.create_wallet(wallet, "USD")
+    return wallets
+
+
+def _scanned(conn, query: str, params) -> set[str]:
+    """Journal partitions a query actually reads, per EXPLAIN ANALYZE."""
+    plan = conn.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + query, params).fetchone()[0]
+    scanned = set()
+
+    def walk(node):
+        if node.get("Relation Name", "").startswith("journal_") and node.get("Actual Loops"):
+            scanned.add(node["Relation Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return scanned
+
+
+def test_lookups_read_one_partition(ledger_db):
+    from wallet_service.ledger import journal, service, sql
+
+    payer, payee = _wallets()
+    tx = _transfer(payer, payee)
+    assert tx.transaction_id.version == 7
+    assert service.get_transaction(tx.transaction_id).entries == tx.entries
+
+    with psycopg.connect(TEST_DB) as conn:
+        params = journal.created_at_range(tx.transaction_id)
+        # One journal_transactions and one journal_entries partition.
+        assert len(_scanned(conn, sql.SELECT_TRANSACTION_SQL, params)) == 2
+        by_key = _scanned(
+            conn, sql.SELECT_TRANSACTIONS_BY_KEY_SQL, ("transfer", [tx.idempotency_key])
+        )
+        assert len(by_key) == 2
+
+        # A checkpoint sealed through a later month leaves older partitions unread.
+        conn.execute(
+            "INSERT INTO balance_checkpoints(wallet_id, asset, sealed_through, balance)"
+            " VALUES (%s, 'USD', (date_trunc('month', NOW() AT TIME ZONE 'UTC')"
+            " + INTERVAL '2 months') AT TIME ZONE 'UTC', 0)",
+            (payee,),
+        )
+        audited = _scanned(conn, sql.AUDIT_CHECKPOINT_BALANCE_SQL, (payee,))
+        assert audited and "journal_entries_legacy" not in audited
+        conn.rollback()
+
+
+def test_batch_postings_get_time_ordered_ids(ledger_db):
+    from wallet_service.ledger import service
+
+    payer, payee = _wallets()
+    item = {
+        "idempotency_key": f"partition-batch-{uuid4()}",
+        "from_wallet_id": payer,
+        "to_wallet_id": payee,
+        "amount": Decimal("2.00"),
+        "asset": "USD",
+        "external_reference": None,
+        "expected_from_version": None,
+        "expected_to_version": None,
+    }
+    [result] = service.post_transfer_batch([item], atomic=True)
+    assert result.status == "committed"
+    assert result.transaction.transaction_id.version == 7
+    assert service.get_transaction(result.transaction.transaction_id).entries == (
+        result.transaction.entries
+    )
+    [replay] = service.post_transfer_batch([item], atomic=True)
+    assert replay.status == "replayed"
+    assert replay.transaction.transaction_id == result.transaction.transaction_id
+
+
+def test_detached_month_is_carried_forward(scratch_ledger):
+    from wallet_service.config import settings
+    from wallet_service.domain.errors import ConflictError
+    from wallet_service.ledger import service
+    from wallet_service.ledger.checkpoints import seal_checkpoints
+    from wallet_service.ledger.partitions import detach_month, ensure_partitions
+    from wallet_service.ledger.reconcile import reconcile_partition
+    from wallet_service.ledger.replay_cache import replay_cache
+
+    payer, payee = _wallets()
+    first = _transfer(payer, payee)
+    _transfer(payer, payee)
+    seal_checkpoints(min_age_seconds=0)
+    _transfer(payer, payee)
+
+    with psycopg.connect(SCRATCH_DB) as conn:
+        legacy_until = conn.execute("SELECT legacy_until FROM journal_partitioning").fetchone()[0]
+        # Postings made now land in the partition created by the migration.
+        assert not detach_month("_legacy", legacy_until)
+        conn.execute("UPDATE outbox_events SET processed_at = NOW()")
+        conn.commit()
+
+    assert detach_month("_legacy", legacy_until)
+
+    with psycopg.connect(SCRATCH_DB) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM journal_entries_legacy").fetchone()[0] == 6
+        dangling = conn.execute(
+            "SELECT conname FROM pg_constraint"
+            " WHERE confrelid = 'journal_transactions'::regclass"
+            " AND conrelid IN ("
+            "'journal_entries_legacy'::regclass, 'outbox_events_legacy'::regclass)"
+        ).fetchall()
+        assert dangling == []
+        carried = conn.execute(
+            "SELECT balance FROM journal_carry_forward WHERE wallet_id = %s", (payee,)
+        ).fetchone()[0]
+    assert carried == Decimal("4.50")
+    assert service.audit_balance(payee)["balance"] == Decimal("4.50")
+    assert service.audit_balance(payee, full=True)["balance"] == Decimal("4.50")
+    assert service.audit_balance(payer)["balance"] == Decimal("-4.50")
+    for full in (False, True):
+        result = reconcile_partition(SCRATCH_DB, None, UUID(int=0), None, full, 100)
+        assert result.drift == []
+
+    # Past the in-process replay cache, the key resolves to a detached month.
+    replay_cache.clear()
+    with pytest.raises(ConflictError):
+        _transfer(payer, payee, key=first.idempotency_key)
+
+    created = ensure_partitions(settings.journal_partition_months_ahead + 1)
+    assert [name.rsplit("_p", 1)[0] for name in created] == [
+        "journal_transactions",
+        "journal_entries",
+        "outbox_events",
+    ]
+    assert ensure_partitions(settings.journal_partition_months_ahead + 1) == []
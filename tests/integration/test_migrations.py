@@ -0,0 +1,49 @@
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from wallet_service.db.migrations import apply_migrations, migration_files, verify_migrations
+from wallet_service.observability.queries import count_queries
+
+REPO_MIGRATIONS = Path(__file__).resolve().parents[2] / "migrations"
+
+
+@pytest.fixture
+def pending_migration(scratch_ledger, tmp_path, monkeypatch):
+    """A migrations/ directory in the working directory with one unapplied file."""
+    migrations = tmp_path / "migrations"
+    shutil.copytree(REPO_MIGRATIONS, migrations)
+    # Fails if applied twice, so a race between replicas would surface.
+    (migrations / "999_scale_out.sql").write_text("CREATE TABLE scale_out_probe (id INT);")
+    monkeypatch.chdir(tmp_path)
+    return "999_scale_out.sql"
+
+
+def test_up_to_date_schema_is_checked_in_one_query(scratch_ledger):
+    with count_queries() as stats:
+        assert apply_migrations() == []
+    # Advisory lock, CREATE TABLE IF NOT EXISTS, then the applied filenames.
+    assert stats.statements == 3
+
+    with count_queries() as stats:
+        verify_migrations()
+    assert stats.statements == 1
+
+
+def test_concurrent_replicas_apply_each_migration_once(pending_migration):
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: apply_migrations(), range(4)))
+    assert sorted(results) == [[], [], [], [pending_migration]]
+
+
+def test_verify_refuses_pending_migrations(pending_migration):
+    with pytest.raises(RuntimeError, match=pending_migration):
+        verify_migrations()
+    apply_migrations()
+    verify_migrations()
+
+    # A database ahead of the shipped files (mid rolling deploy) still verifies.
+    (migration_files()[-1]).unlink()
+    verify_migrations()
@@ -0,0 +1,122 @@
+import json
+import threading
+from decimal import Decimal
+from uuid import uuid4
+
+import psycopg
+import pytest
+
+from tests.conftest import TEST_DB
+
+
+class ListSink:
+    def __init__(self, fail: bool = False) -> None:
+        self.events = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def deliver(self, events) -> None:
+        if self.fail:
+            raise RuntimeError("sink unavailable")
+        with self._lock:
+            self.events.extend(events)
+
+
+def _post_transfers(count: int) -> set:
+    from wallet_service.ledger import service
+
+    w1, w2 = uuid4(), uuid4()
+    service.create_wallet(w1, "USD")
+    service.create_wallet(w2, "USD")
+    return {
+        service.post_transfer(
+            idempotency_key=f"outbox-{w1}-{i}",
+            from_wallet_id=w1,
+            to_wallet_id=w2,
+            amount=Decimal("1.00"),
+            asset="USD",
+            external_reference=None,
+            expected_from_version=None,
+            expected_to_version=None,
+        ).transaction_id
+        for i in range(count)
+    }
+
+
+def _drain(sink, batch_size: int) -> None:
+    from wallet_service.outbox import relay_batch
+
+    while relay_batch(sink, batch_size):
+        pass
+
+
+def test_parallel_workers_deliver_each_event_once(ledger_db):
+    from wallet_service.outbox import probe_backlog
+
+    transaction_ids = _post_transfers(30)
+    sink = ListSink()
+    workers = [threading.Thread(target=_drain, args=(sink, 4)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    event_ids = [event.event_id for event in sink.events]
+    assert len(event_ids) == len(set(event_ids))
+    assert transaction_ids <= {event.transaction_id for event in sink.events}
+    assert probe_backlog() == (0, 0.0)
+    with psycopg.connect(TEST_DB) as conn:
+        pending = conn.execute(
+            "SELECT COUNT(*) FROM outbox_events"
+            " WHERE transaction_id = ANY(%s) AND processed_at IS NULL",
+            (list(transaction_ids),),
+        ).fetchone()[0]
+    assert pending == 0
+
+
+def test_failed_delivery_leaves_events_pending(ledger_db):
+    from wallet_service.outbox import relay_batch
+
+    _drain(ListSink(), 500)
+    transaction_ids = _post_transfers(2)
+
+    with pytest.raises(RuntimeError):
+        relay_batch(ListSink(fail=True))
+
+    sink = ListSink()
+    _drain(sink, 500)
+    assert {event.transaction_id for event in sink.events} == transaction_ids
+
+
+def test_prune_deletes_only_old_processed_events(ledger_db):
+    from wallet_service.outbox import prune_processed
+
+    old, recent = _post_transfers(1), _post_transfers(1)
+    _drain(ListSink(), 500)
+    with psycopg.connect(TEST_DB) as conn:
+        conn.execute(
+            "UPDATE outbox_events SET processed_at = NOW() - INTERVAL '2 hours'"
+            " WHERE transaction_id = ANY(%s)",
+            (list(old),),
+        )
+
+    assert prune_processed(retention_seconds=3600, batch_size=1) >= 1
+
+    with psycopg.connect(TEST_DB) as conn:
+        remaining = conn.execute(
+            "SELECT transaction_id FROM outbox_events WHERE transaction_id = ANY(%s)",
+            (list(old | recent),),
+        ).fetchall()
+    assert {row[0] for row in remaining} == recent
+
+
+def test_file_sink_writes_json_lines(ledger_db, tmp_path):
+    from wallet_service.outbox import open_sink
+
+    transaction_ids = _post_transfers(2)
+    path = tmp_path / "outbox.ndjson"
+    _drain(open_sink(f"file:{path}"), 500)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert {str(t) for t in transaction_ids} <= {line["transaction_id"] for line in lines}
+    assert {line["event_type"] for line in lines} >= {"wallet.transfer.committed"}
@@ -0,0 +1,36 @@
+from uuid import uuid4
+
+from tests.conftest import auth_header
+
+
+def test_posting_errors_keep_http_contract(app_client, wallet_ids):
+    w1, w2 = wallet_ids
+    headers = auth_header("wallet:read wallet:write")
+    for wallet in [w1, w2]:
+        app_client.post("/v1/wallets", headers=headers, json={"wallet_id": wallet, "asset": "USD"})
+
+    def transfer(key: str, **overrides):
+        payload = {"from_wallet_id": w1, "to_wallet_id": w2, "amount": "1.00", "asset": "USD"}
+        payload.update(overrides)
+        return app_client.post(
+            "/v1/transfers", headers={**headers, "Idempotency-Key": key}, json=payload
+        )
+
+    missing = transfer("idem-missing", to_wallet_id=str(uuid4()))
+    assert missing.status_code == 404
+    assert missing.json() == {"error": "wallet not found"}
+
+    stale = transfer("idem-stale", expected_from_version=5)
+    assert stale.status_code == 409
+    assert stale.json() == {"error": "optimistic version conflict"}
+
+    posted = transfer("idem-ok", expected_from_version=0, expected_to_version=0)
+    assert posted.status_code == 200
+    assert [e["amount"] for e in posted.json()["entries"]] == ["-1.000000", "1.000000"]
+
+    reused = transfer("idem-ok", amount="2.00")
+    assert reused.status_code == 409
+    assert reused.json() == {"error": "idempotency key reuse with different payload"}
+
+    balance = app_client.get(f"/v1/wallets/{w1}/balance", headers=headers).json()
+    assert balance["version"] == 1
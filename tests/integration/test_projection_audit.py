@@ -25,7 +25,9 @@ def test_projection_matches_audit(app_client, wallet_ids):
 
     projected = app_client.get(f"/v1/wallets/{wallet}/balance", headers=headers)
     audited = app_client.get(f"/v1/wallets/{wallet}/balance/audit", headers=headers)
+    recomputed = app_client.get(f"/v1/wallets/{wallet}/balance/audit?full=true", headers=headers)
 
     assert projected.status_code == 200
     assert audited.status_code == 200
     assert Decimal(projected.json()["balance"]) == Decimal(audited.json()["balance"])
+    assert Decimal(recomputed.json()["balance"]) == Decimal(audited.json()["balance"])
@@ -0,0 +1,70 @@
+from prometheus_client import REGISTRY
+
+from tests.conftest import auth_header
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_ledger_counters_exposed_on_metrics(app_client, wallet_ids):
+    from wallet_service.ledger.replay_cache import replay_cache
+
+    headers = auth_header()
+    for wallet in wallet_ids:
+        app_client.post("/v1/wallets", headers=headers, json={"wallet_id": wallet, "asset": "USD"})
+    before = {
+        "committed": _sample("wallet_postings_total", operation="transfer"),
+        "cache": _sample("wallet_idempotent_replays_total", operation="transfer", source="cache"),
+        "database": _sample(
+            "wallet_idempotent_replays_total", operation="transfer", source="database"
+        ),
+        "conflicts": _sample("wallet_version_conflicts_total", operation="transfer"),
+        "reuse": _sample("wallet_idempotency_conflicts_total", operation="transfer"),
+    }
+
+    payload = {
+        "from_wallet_id": wallet_ids[0],
+        "to_wallet_id": wallet_ids[1],
+        "amount": "1.00",
+        "asset": "USD",
+    }
+    transfer_headers = {**headers, "Idempotency-Key": f"prom-{wallet_ids[0]}"}
+    for _ in range(2):
+        assert app_client.post("/v1/transfers", headers=transfer_headers, json=payload).is_success
+    replay_cache.clear()
+    assert app_client.post("/v1/transfers", headers=transfer_headers, json=payload).is_success
+    stale = app_client.post(
+        "/v1/transfers",
+        headers={**headers, "Idempotency-Key": f"prom-stale-{wallet_ids[0]}"},
+        json={**payload, "expected_from_version": 0},
+    )
+    assert stale.status_code == 409
+    # A reused key conflicts from the cache and, once evicted, from the database.
+    reused = {**payload, "amount": "2.00"}
+    for _ in range(2):
+        response = app_client.post("/v1/transfers", headers=transfer_headers, json=reused)
+        assert response.status_code == 409
+        replay_cache.clear()
+
+    assert _sample("wallet_postings_total", operation="transfer") == before["committed"] + 1
+    assert (
+        _sample("wallet_idempotent_replays_total", operation="transfer", source="cache")
+        == before["cache"] + 1
+    )
+    assert (
+        _sample("wallet_idempotent_replays_total", operation="transfer", source="database")
+        == before["database"] + 1
+    )
+    assert (
+        _sample("wallet_version_conflicts_total", operation="transfer") == before["conflicts"] + 1
+    )
+    assert (
+        _sample("wallet_idempotency_conflicts_total", operation="transfer") == before["reuse"] + 2
+    )
+
+    res = app_client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert 'wallet_postings_total{operation="transfer"}' in res.text
+    assert "wallet_posting_duration_seconds_bucket" in res.text
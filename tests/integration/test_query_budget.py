@@ -0,0 +1,55 @@
+import logging
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+
+from tests.conftest import auth_header
+from wallet_service.domain.errors import NotFoundError
+from wallet_service.observability.queries import count_queries
+
+
+def test_ledger_reads_and_postings_are_single_statements(ledger_db, wallet_ids):
+    from wallet_service.ledger import service
+
+    payer, payee = (UUID(w) for w in wallet_ids)
+    service.create_wallet(payer, "USD")
+    service.create_wallet(payee, "USD")
+    with count_queries() as posting:
+        tx = service.post_transfer(
+            idempotency_key=f"budget-{payer}",
+            from_wallet_id=payer,
+            to_wallet_id=payee,
+            amount=Decimal("1.00"),
+            asset="USD",
+            external_reference=None,
+            expected_from_version=None,
+            expected_to_version=None,
+        )
+    assert posting.statements == 1
+
+    with count_queries() as read:
+        assert service.get_transaction(tx.transaction_id) == tx
+    assert (read.statements, read.rows) == (1, 2)
+    assert read.db_ms > 0
+
+    with count_queries() as missing, pytest.raises(NotFoundError):
+        service.get_transaction(uuid4())
+    assert (missing.statements, missing.rows) == (1, 0)
+
+
+def test_request_over_budget_logs_warning(app_client, wallet_ids, monkeypatch, caplog):
+    from wallet_service.config import settings
+
+    headers = auth_header()
+    body = {"wallet_id": wallet_ids[0], "asset": "USD"}
+    app_client.post("/v1/wallets", headers=headers, json=body)
+    assert "statement budget exceeded" not in caplog.text
+
+    monkeypatch.setitem(settings.db_statement_budgets, "POST /v1/wallets", 1)
+    with caplog.at_level(logging.WARNING, logger="wallet_service.observability.queries"):
+        res = app_client.post(
+            "/v1/wallets", headers=headers, json={"wallet_id": wallet_ids[1], "asset": "USD"}
+        )
+    assert res.status_code == 200
+    assert "POST /v1/wallets ran 2 statements (budget 1" in caplog.text
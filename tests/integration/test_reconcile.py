@@ -0,0 +1,63 @@
+import io
+import itertools
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import psycopg
+
+from tests.conftest import TEST_DB
+
+
+def _transfer_pair():
+    from wallet_service.ledger import service
+
+    payer, payee = uuid4(), uuid4()
+    service.create_wallet(payer, "USD")
+    service.create_wallet(payee, "USD")
+    service.post_transfer(
+        idempotency_key=f"reconcile-{payer}",
+        from_wallet_id=payer,
+        to_wallet_id=payee,
+        amount=Decimal("4.00"),
+        asset="USD",
+        external_reference=None,
+        expected_from_version=None,
+        expected_to_version=None,
+    )
+    return payer, payee
+
+
+def test_keyspace_partitions_cover_every_wallet_id():
+    from wallet_service.ledger.reconcile import keyspace_partitions
+
+    ranges = keyspace_partitions(5)
+    assert ranges[0][0] == UUID(int=0)
+    assert ranges[-1][1] is None
+    assert all(hi == next_lo for (_, hi), (next_lo, _) in itertools.pairwise(ranges))
+
+
+def test_reconcile_reports_only_drifted_wallets(ledger_db):
+    from wallet_service.ledger.checkpoints import seal_checkpoints
+    from wallet_service.ledger.reconcile import reconcile, write_drift_report
+
+    clean = _transfer_pair()
+    payer, drifted = _transfer_pair()
+    seal_checkpoints(min_age_seconds=0)
+    with psycopg.connect(TEST_DB) as conn:
+        conn.execute(
+            "UPDATE balance_projections SET balance = balance + 5 WHERE wallet_id = %s", (drifted,)
+        )
+
+    for full in (False, True):
+        report = reconcile(workers=2, partitions=3, full=full)
+        by_wallet = {row.wallet_id: row for row in report.drift}
+        assert report.wallets >= 4
+        assert drifted in by_wallet
+        assert by_wallet[drifted].delta == Decimal(5)
+        assert by_wallet[drifted].journal == Decimal("4.00")
+        assert not set(clean) & by_wallet.keys()
+        assert payer not in by_wallet
+
+    out = io.StringIO()
+    write_drift_report(report.drift, out)
+    assert f"{drifted},USD,9.000000,4.000000,5.000000" in out.getvalue().splitlines()
@@ -0,0 +1,37 @@
+from tests.conftest import auth_header
+
+
+def _phases(header: str) -> dict[str, float]:
+    phases = {}
+    for item in header.split(", "):
+        name, duration = item.split(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+
+def test_posting_phases_in_server_timing(app_client, wallet_ids, monkeypatch):
+    from wallet_service.config import settings
+
+    headers = auth_header("wallet:read wallet:write")
+    for wallet in wallet_ids:
+        body = {"wallet_id": wallet, "asset": "USD"}
+        res = app_client.post("/v1/wallets", headers=headers, json=body)
+        assert "server-timing" not in res.headers
+
+    monkeypatch.setattr(settings, "server_timing_enabled", True)
+    payload = {
+        "from_wallet_id": wallet_ids[0],
+        "to_wallet_id": wallet_ids[1],
+        "amount": "1.00",
+        "asset": "USD",
+    }
+    headers = {**headers, "Idempotency-Key": f"timing-{wallet_ids[0]}"}
+    first = app_client.post("/v1/transfers", headers=headers, json=payload)
+    assert first.status_code == 200
+    phases = _phases(first.headers["server-timing"])
+    assert {"auth", "replay_cache", "pool_checkout", "post_journal", "commit"} <= phases.keys()
+    assert all(duration >= 0 for duration in phases.values())
+
+    # A replay answered by the cache never reaches the database.
+    replay = app_client.post("/v1/transfers", headers=headers, json=payload)
+    assert _phases(replay.headers["server-timing"]).keys() == {"auth", "replay_cache"}
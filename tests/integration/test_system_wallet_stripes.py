@@ -0,0 +1,58 @@
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+
+def _credit(service, wallet_id, key, amount="1.00"):
+    return service.post_adjustment(
+        idempotency_key=key,
+        wallet_id=wallet_id,
+        amount=Decimal(amount),
+        direction="credit",
+        asset="USD",
+        reason="stripe-test",
+        expected_wallet_version=None,
+    )
+
+
+def test_adjustments_spread_over_stripes_and_aggregate(ledger_db, monkeypatch):
+    from wallet_service.config import settings
+    from wallet_service.ledger import service
+
+    monkeypatch.setattr(settings, "system_wallet_stripes", 4)
+    monkeypatch.setattr(settings, "system_wallet_stripe_strategy", "round_robin")
+    system_wallet_id = UUID(settings.system_wallet_id)
+    wallet_id = uuid4()
+    service.create_wallet(wallet_id, "USD")
+
+    stripes = service.system_wallet_stripes()
+    assert len(stripes) == 4 and stripes[0] == system_wallet_id
+    before = service.get_balance(system_wallet_id)
+    audited_before = service.audit_balance(system_wallet_id)["balance"]
+
+    counter_legs = {
+        tx.entries[1].account_id
+        for tx in (_credit(service, wallet_id, f"stripe-{wallet_id}-{i}") for i in range(4))
+    }
+
+    assert counter_legs == set(stripes)
+    after = service.get_balance(system_wallet_id)
+    assert after["balance"] == before["balance"] - Decimal("4.00")
+    assert after["version"] == before["version"] + 4
+    assert service.audit_balance(system_wallet_id)["balance"] == audited_before - Decimal("4.00")
+
+
+def test_hashed_stripe_is_stable_for_replays(ledger_db, monkeypatch):
+    from wallet_service.config import settings
+    from wallet_service.ledger import service
+
+    monkeypatch.setattr(settings, "system_wallet_stripes", 4)
+    monkeypatch.setattr(settings, "system_wallet_stripe_strategy", "hash")
+    wallet_id = uuid4()
+    service.create_wallet(wallet_id, "USD")
+
+    first = _credit(service, wallet_id, f"stripe-replay-{wallet_id}")
+    replay = _credit(service, wallet_id, f"stripe-replay-{wallet_id}")
+
+    assert replay.transaction_id == first.transaction_id
+    assert replay.entries == first.entries
+    assert service.get_balance(wallet_id)["balance"] == Decimal("1.000000")
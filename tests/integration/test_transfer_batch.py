@@ -0,0 +1,81 @@
+from uuid import uuid4
+
+from tests.conftest import auth_header
+
+
+def test_transfer_batch_best_effort_and_atomic(app_client):
+    headers = auth_header("wallet:read wallet:write")
+    w1, w2 = str(uuid4()), str(uuid4())
+    for wallet in [w1, w2]:
+        app_client.post("/v1/wallets", headers=headers, json={"wallet_id": wallet, "asset": "USD"})
+
+    def transfer(key: str, **payload):
+        return app_client.post(
+            "/v1/transfers", headers={**headers, "Idempotency-Key": key}, json=payload
+        )
+
+    def batch(mode: str, *items):
+        return app_client.post(
+            "/v1/transfers:batch", headers=headers, json={"mode": mode, "transfers": list(items)}
+        )
+
+    single = transfer("idem-single", from_wallet_id=w1, to_wallet_id=w2, amount="1.00")
+    assert single.status_code == 200
+
+    def item(key: str, from_wallet_id: str, to_wallet_id: str, amount: str, **versions):
+        return {
+            "idempotency_key": key,
+            "from_wallet_id": from_wallet_id,
+            "to_wallet_id": to_wallet_id,
+            "amount": amount,
+            **versions,
+        }
+
+    items = [
+        item("b-1", w1, w2, "2.00", expected_from_version=1),
+        # Expected versions see the earlier items of the same batch.
+        item("b-2", w2, w1, "0.50", expected_to_version=2),
+        item("b-3", w1, str(uuid4()), "1.00"),
+        item("idem-single", w1, w2, "1.00"),
+        item("b-5", w1, w1, "1.00"),
+        item("b-1", w1, w2, "3.00"),
+    ]
+    body = batch("best_effort", *items).json()
+    assert (body["committed"], body["failed"]) == (2, 3)
+    assert [(r["status"], r["error_status"], r["error"]) for r in body["results"]] == [
+        ("committed", None, None),
+        ("committed", None, None),
+        ("failed", 404, "wallet not found"),
+        ("replayed", None, None),
+        ("failed", 422, "from_wallet_id and to_wallet_id must differ"),
+        ("failed", 422, "duplicate idempotency key in batch"),
+    ]
+    assert body["results"][3]["transaction"] == single.json()
+    entries = body["results"][0]["transaction"]["entries"]
+    assert [e["amount"] for e in entries] == ["-2.000000", "2.000000"]
+
+    # Batch items and single transfers share one idempotency scope.
+    payload = {k: v for k, v in items[0].items() if k != "idempotency_key"}
+    assert transfer("b-1", **payload).json() == body["results"][0]["transaction"]
+    reused = transfer("b-2", from_wallet_id=w2, to_wallet_id=w1, amount="9.00")
+    assert reused.status_code == 409
+    assert reused.json() == {"error": "idempotency key reuse with different payload"}
+    replayed = batch("best_effort", *items[:2]).json()
+    assert [r["status"] for r in replayed["results"]] == ["replayed", "replayed"]
+    first_two = [r["transaction"] for r in body["results"][:2]]
+    assert [r["transaction"] for r in replayed["results"]] == first_two
+
+    atomic = batch(
+        "atomic",
+        item("a-1", w1, w2, "1.00"),
+        item("a-2", w1, w2, "1.00", expected_from_version=0),
+    ).json()
+    outcomes = [(r["status"], r["error_status"]) for r in atomic["results"]]
+    assert outcomes == [("aborted", None), ("failed", 409)]
+    assert transfer("a-1", from_wallet_id=w2, to_wallet_id=w1, amount="5.00").status_code == 200
+
+    for wallet, expected in [(w1, "2.500000"), (w2, "-2.500000")]:
+        balance = app_client.get(f"/v1/wallets/{wallet}/balance", headers=headers).json()
+        audit = app_client.get(f"/v1/wallets/{wallet}/balance/audit", headers=headers).json()
+        assert balance["balance"] == audit["balance"] == expected
+    assert app_client.get(f"/v1/wallets/{w1}/balance", headers=headers).json()["version"] == 4
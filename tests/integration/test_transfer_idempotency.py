@@ -1,5 +1,7 @@
 from decimal import Decimal
 
+import pytest
+
 from tests.conftest import auth_header
 
 
@@ -32,3 +34,33 @@ def test_transfer_idempotency_and_balance(app_client, wallet_ids):
 
     assert Decimal(b1["balance"]) == Decimal("-10.25")
     assert Decimal(b2["balance"]) == Decimal("10.25")
+
+
+def test_replay_is_served_without_database(ledger_db, wallet_ids, monkeypatch):
+    from uuid import UUID
+
+    from wallet_service.domain.errors import ConflictError, ServiceUnavailableError
+    from wallet_service.ledger import service
+
+    w1, w2 = (UUID(w) for w in wallet_ids)
+    service.create_wallet(w1, "USD")
+    service.create_wallet(w2, "USD")
+    transfer = {
+        "idempotency_key": f"idem-cached-{w1}",
+        "from_wallet_id": w1,
+        "to_wallet_id": w2,
+        "amount": Decimal("3.00"),
+        "asset": "USD",
+        "external_reference": None,
+        "expected_from_version": None,
+        "expected_to_version": None,
+    }
+    first = service.post_transfer(**transfer)
+
+    def unavailable(*args, **kwargs):
+        raise ServiceUnavailableError("database unavailable")
+
+    monkeypatch.setattr(service, "run_transaction", unavailable)
+    assert service.post_transfer(**transfer) == first
+    with pytest.raises(ConflictError, match="idempotency key reuse with different payload"):
+        service.post_transfer(**{**transfer, "amount": Decimal("4.00")})
@@ -0,0 +1,76 @@
+import json
+from uuid import uuid4
+
+from tests.conftest import auth_header
+
+
+def _wallet_with_transfers(app_client, count: int) -> str:
+    headers = auth_header("wallet:read wallet:write")
+    wallet, other = str(uuid4()), str(uuid4())
+    for wallet_id in (wallet, other):
+        body = {"wallet_id": wallet_id, "asset": "USD"}
+        app_client.post("/v1/wallets", headers=headers, json=body)
+    for i in range(count):
+        response = app_client.post(
+            "/v1/transfers",
+            headers={**headers, "Idempotency-Key": f"entries-{wallet}-{i}"},
+            json={"from_wallet_id": other, "to_wallet_id": wallet, "amount": f"{i + 1}.00"},
+        )
+        assert response.status_code == 200
+    return wallet
+
+
+def test_keyset_pages_walk_history_newest_first(app_client):
+    wallet = _wallet_with_transfers(app_client, 5)
+    headers = auth_header("wallet:read")
+
+    seen, cursor = [], None
+    for _ in range(3):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = app_client.get(f"/v1/wallets/{wallet}/entries", headers=headers, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        seen += page["entries"]
+        cursor = page["next_cursor"]
+    assert cursor is None
+
+    assert [float(e["amount"]) for e in seen] == [5.0, 4.0, 3.0, 2.0, 1.0]
+    assert len({e["entry_id"] for e in seen}) == 5
+
+    middle = seen[2]["created_at"]
+    filtered = app_client.get(
+        f"/v1/wallets/{wallet}/entries",
+        headers=headers,
+        params={"since": middle, "until": seen[0]["created_at"]},
+    ).json()
+    assert [float(e["amount"]) for e in filtered["entries"]] == [4.0, 3.0]
+
+
+def test_ndjson_streams_every_page(app_client):
+    wallet = _wallet_with_transfers(app_client, 3)
+    response = app_client.get(
+        f"/v1/wallets/{wallet}/entries",
+        headers={**auth_header("wallet:read"), "Accept": "application/x-ndjson"},
+        params={"limit": 1},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [float(line["amount"]) for line in lines] == [3.0, 2.0, 1.0]
+
+
+def test_entries_errors(app_client):
+    headers = auth_header("wallet:read")
+    wallet = _wallet_with_transfers(app_client, 0)
+
+    empty = app_client.get(f"/v1/wallets/{wallet}/entries", headers=headers).json()
+    assert empty["entries"] == [] and empty["next_cursor"] is None
+    assert app_client.get(f"/v1/wallets/{uuid4()}/entries", headers=headers).status_code == 404
+    bad_cursor = app_client.get(
+        f"/v1/wallets/{wallet}/entries", headers=headers, params={"cursor": "nope"}
+    )
+    assert bad_cursor.status_code == 422
+    too_large = app_client.get(
+        f"/v1/wallets/{wallet}/entries", headers=headers, params={"limit": 1001}
+    )
+    assert too_large.status_code == 422
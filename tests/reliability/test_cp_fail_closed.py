@@ -1,18 +1,18 @@
-from contextlib import contextmanager
+from contextlib import asynccontextmanager
 
 from tests.conftest import auth_header
 
 
 def test_write_fails_closed_without_db(monkeypatch, app_client, wallet_ids):
+    from wallet_service.db import database
     from wallet_service.domain.errors import ServiceUnavailableError
-    from wallet_service.ledger import service as ledger_service
 
-    @contextmanager
-    def broken_conn():
+    @asynccontextmanager
+    async def broken_conn(policy=database.WRITE):
         raise ServiceUnavailableError("database unavailable")
         yield
 
-    monkeypatch.setattr(ledger_service, "get_connection", broken_conn)
+    monkeypatch.setattr(database, "get_async_connection", broken_conn)
 
     w1, _ = wallet_ids
     headers = auth_header("wallet:write")
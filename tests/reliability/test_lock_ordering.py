@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from uuid import uuid4
+
+import psycopg
+
+
+def test_opposing_transfers_never_deadlock(ledger_db, monkeypatch):
+    from wallet_service.config import settings
+    from wallet_service.ledger import service
+
+    # With retries disabled every lock-order failure surfaces to the caller.
+    monkeypatch.setattr(settings, "db_tx_max_retries", 0)
+    wallets = [uuid4(), uuid4()]
+    for wallet_id in wallets:
+        service.create_wallet(wallet_id, "USD")
+
+    def post(i):
+        # Alternate A->B and B->A so half the writers want the reverse order.
+        from_wallet_id, to_wallet_id = wallets if i % 2 else wallets[::-1]
+        try:
+            service.post_transfer(
+                idempotency_key=f"lock-order-{from_wallet_id}-{i}",
+                from_wallet_id=from_wallet_id,
+                to_wallet_id=to_wallet_id,
+                amount=Decimal("1.00"),
+                asset="USD",
+                external_reference=None,
+                expected_from_version=None,
+                expected_to_version=None,
+            )
+        except psycopg.Error as exc:
+            return type(exc)
+        return None
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        failures = [f for f in pool.map(post, range(400)) if f is not None]
+
+    assert psycopg.errors.DeadlockDetected not in failures
+    assert set(failures) <= {psycopg.errors.SerializationFailure}
+    assert sum(service.get_balance(w)["balance"] for w in wallets) == Decimal(0)
+    for wallet_id in wallets:
+        audited = service.audit_balance(wallet_id)["balance"]
+        assert audited == service.get_balance(wallet_id)["balance"]
+
+
+def test_repeated_wallet_legs_bump_version_once(ledger_db):
+    from wallet_service.ledger import journal, service
+
+    payer, payee = uuid4(), uuid4()
+    service.create_wallet(payer, "USD")
+    service.create_wallet(payee, "USD")
+
+    posting = journal.JournalPosting(
+        operation_scope="transfer",
+        idempotency_key=f"split-{payee}",
+        payload={"legs": 3},
+        payload_hash=journal.hash_payload({"legs": 3}),
+        external_reference=None,
+        event_type="wallet.transfer.committed",
+        legs=[
+            (payee, Decimal("1.50"), "USD", 0),
+            (payer, Decimal("-3.00"), "USD", 0),
+            (payee, Decimal("1.50"), "USD", 0),
+        ],
+    )
+    tx = service._post_journal(posting)
+
+    assert [str(entry.account_id) for entry in tx.entries] == [str(payee), str(payer), str(payee)]
+    balance = service.get_balance(payee)
+    assert (balance["balance"], balance["version"]) == (Decimal("3.000000"), 1)
+    assert service.get_balance(payer)["version"] == 1
@@ -0,0 +1,27 @@
+import pytest
+
+from tests.conftest import TEST_DB
+
+
+def test_saturated_pool_fails_closed(monkeypatch):
+    from wallet_service.config import settings
+    from wallet_service.db import database
+    from wallet_service.domain.errors import ServiceUnavailableError
+
+    database.close_pool()
+    monkeypatch.setattr(settings, "database_url", TEST_DB)
+    monkeypatch.setattr(settings, "db_pool_min_size", 1)
+    monkeypatch.setattr(settings, "db_pool_max_size", 1)
+    monkeypatch.setattr(settings, "db_pool_timeout_seconds", 0.2)
+    try:
+        with database.get_connection() as held:
+            held.execute("SELECT 1")
+            assert database.pool_stats()["pool_available"] == 0
+            with pytest.raises(ServiceUnavailableError), database.get_connection():
+                pass
+
+        # The held connection went back to the pool and is reused.
+        with database.get_connection() as conn:
+            assert conn.execute("SELECT 1").fetchone() == (1,)
+    finally:
+        database.close_pool()
@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from uuid import UUID
+
+import psycopg
+import pytest
+
+
+def test_serialization_failures_are_retried(ledger_db, monkeypatch):
+    from wallet_service.config import settings
+    from wallet_service.db.database import READ, run_transaction
+
+    monkeypatch.setattr(settings, "db_tx_retry_base_seconds", 0)
+    attempts = []
+
+    def flaky(conn):
+        attempts.append(conn.read_only)
+        if len(attempts) < 3:
+            raise psycopg.errors.SerializationFailure("could not serialize access")
+        return conn.execute("SELECT 1").fetchone()[0]
+
+    assert run_transaction("test", flaky, READ) == 1
+    assert attempts == [True, True, True]
+
+
+def test_retried_attempts_are_counted_apart(ledger_db, monkeypatch):
+    from wallet_service.config import settings
+    from wallet_service.db.database import run_transaction
+    from wallet_service.observability.queries import count_queries
+
+    monkeypatch.setattr(settings, "db_tx_retry_base_seconds", 0)
+    attempts = []
+
+    def flaky(conn):
+        attempts.append(1)
+        conn.execute("SELECT 1")
+        if len(attempts) < 3:
+            raise psycopg.errors.SerializationFailure("could not serialize access")
+        conn.execute("SELECT 2")
+
+    with count_queries() as stats:
+        run_transaction("test", lambda conn: conn.execute("SELECT 0"))
+        run_transaction("test", flaky)
+    # The earlier transaction and the attempt that committed count; the two
+    # rolled-back attempts are reported apart.
+    assert (stats.statements, stats.retries, stats.retried) == (3, 2, 2)
+
+
+def test_retries_are_bounded(ledger_db, monkeypatch):
+    from wallet_service.config import settings
+    from wallet_service.db.database import run_transaction
+
+    monkeypatch.setattr(settings, "db_tx_retry_base_seconds", 0)
+    monkeypatch.setattr(settings, "db_tx_max_retries", 2)
+    attempts = []
+
+    def deadlocked(conn):
+        attempts.append(1)
+        raise psycopg.errors.DeadlockDetected("deadlock detected")
+
+    with pytest.raises(psycopg.errors.DeadlockDetected):
+        run_transaction("test", deadlocked)
+    assert len(attempts) == 3
+
+
+def test_concurrent_retries_keep_idempotency(ledger_db, wallet_ids):
+    from wallet_service.ledger import service
+
+    w1, w2 = (UUID(w) for w in wallet_ids)
+    service.create_wallet(w1, "USD")
+    service.create_wallet(w2, "USD")
+
+    def post(_):
+        return service.post_transfer(
+            idempotency_key=f"idem-race-{w1}",
+            from_wallet_id=w1,
+            to_wallet_id=w2,
+            amount=Decimal("1.00"),
+            asset="USD",
+            external_reference=None,
+            expected_from_version=None,
+            expected_to_version=None,
+        ).transaction_id
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        transaction_ids = set(pool.map(post, range(8)))
+
+    assert len(transaction_ids) == 1
+    assert service.get_balance(w2)["balance"] == Decimal("1.00")
@@ -0,0 +1,120 @@
+from datetime import UTC, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from wallet_service.config import settings
+from wallet_service.ledger.balance_cache import BalanceCache
+
+
+class FakeClock:
+    now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _balance(wallet_id, version: int) -> dict:
+    return {
+        "wallet_id": wallet_id,
+        "asset": "USD",
+        "balance": Decimal(version),
+        "version": version,
+        "as_of": datetime.now(UTC),
+    }
+
+
+def _listening_cache(clock=None) -> BalanceCache:
+    cache = BalanceCache(clock=clock) if clock else BalanceCache()
+    cache.mark_listening()
+    return cache
+
+
+def test_notified_version_invalidates_older_entry():
+    cache = _listening_cache()
+    wallet = uuid4()
+    cache.put(_balance(wallet, 3), cache.epoch())
+    assert cache.get(wallet)["version"] == 3
+
+    cache.apply(f"{wallet}:3,{uuid4()}:9")
+    assert cache.get(wallet) is not None
+    cache.apply(f"{wallet}:4")
+    assert cache.get(wallet) is None
+
+
+def test_read_superseded_by_earlier_notification_is_not_cached():
+    cache = _listening_cache()
+    wallet = uuid4()
+    epoch = cache.epoch()
+    cache.apply(f"{wallet}:5")
+    cache.put(_balance(wallet, 4), epoch)
+    assert cache.get(wallet) is None
+
+
+def test_read_superseded_by_an_evicted_notification_is_not_cached(monkeypatch):
+    monkeypatch.setattr(settings, "balance_cache_max_entries", 1)
+    cache = _listening_cache()
+    wallet = uuid4()
+    epoch = cache.epoch()
+    cache.apply(f"{wallet}:5")
+    # The notification for wallet is trimmed before the racing read stores v4.
+    cache.apply(f"{uuid4()}:1")
+    cache.put(_balance(wallet, 4), epoch)
+    assert cache.get(wallet) is None
+    cache.put(_balance(wallet, 5), cache.epoch())
+    assert cache.get(wallet)["version"] == 5
+
+
+def test_local_posting_drops_entry_and_refuses_reads_that_started_before_it(monkeypatch):
+    cache = _listening_cache()
+    wallet, other = uuid4(), uuid4()
+    cache.put(_balance(wallet, 1), cache.epoch())
+    cache.put(_balance(other, 1), cache.epoch())
+    before_commit = cache.epoch()
+
+    cache.invalidate([wallet])
+    assert cache.get(wallet) is None
+    cache.put(_balance(wallet, 1), before_commit)
+    assert cache.get(wallet) is None
+    # Other wallets' in-flight reads are unaffected; reads after the commit are cached.
+    cache.put(_balance(other, 1), before_commit)
+    assert cache.get(other) is not None
+    cache.put(_balance(wallet, 2), cache.epoch())
+    assert cache.get(wallet)["version"] == 2
+
+    # Once an invalidation is no longer tracked, reads older than it are refused.
+    monkeypatch.setattr(settings, "balance_cache_max_entries", 1)
+    before_commit = cache.epoch()
+    cache.clear()
+    cache.invalidate([uuid4(), uuid4()])
+    cache.put(_balance(other, 1), before_commit)
+    assert cache.get(other) is None
+
+
+def test_nothing_is_served_or_stored_across_a_reconnect():
+    cache = _listening_cache()
+    wallet = uuid4()
+    cache.put(_balance(wallet, 1), cache.epoch())
+    stale_epoch = cache.epoch()
+
+    cache.mark_lost()
+    assert cache.get(wallet) is None
+    cache.mark_listening()
+    assert len(cache) == 0
+    cache.put(_balance(wallet, 1), stale_epoch)
+    assert cache.get(wallet) is None
+
+
+def test_stale_reads_are_bounded_from_last_verification(monkeypatch):
+    monkeypatch.setattr(settings, "stale_read_max_seconds", 10)
+    clock = FakeClock()
+    cache = _listening_cache(clock)
+    wallet = uuid4()
+    cache.put(_balance(wallet, 1), cache.epoch())
+
+    clock.now = 20
+    cache.heartbeat()
+    cache.mark_lost()
+    clock.now = 25
+    assert cache.stale(wallet)["stale_seconds"] == 5
+    clock.now = 31
+    assert cache.stale(wallet) is None
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+WORKER = """
+from wallet_service.observability import prometheus
+prometheus.postings.labels("transfer").inc(3)
+prometheus.db_unavailable.inc()
+"""
+
+SCRAPE = """
+import sys
+from wallet_service.observability import prometheus
+body, _ = prometheus.render()
+sys.stdout.write(body.decode())
+"""
+
+
+def test_metrics_sum_across_worker_processes(tmp_path):
+    env = {
+        **os.environ,
+        "PROMETHEUS_MULTIPROC_DIR": str(tmp_path),
+        "PYTHONPATH": os.pathsep.join(sys.path),
+    }
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", WORKER], env=env, check=True)
+    scraped = subprocess.run(
+        [sys.executable, "-c", SCRAPE], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    assert 'wallet_postings_total{operation="transfer"} 6.0' in scraped
+    assert "wallet_db_unavailable_total 2.0" in scraped
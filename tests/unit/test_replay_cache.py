@@ -0,0 +1,118 @@
+from datetime import UTC, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from wallet_service.config import settings
+from wallet_service.domain.errors import ConflictError
+from wallet_service.ledger.journal import LedgerTransaction, transfer_posting
+from wallet_service.ledger.replay_cache import ReplayCache
+
+
+def _posting(key: str, amount: str = "1.00"):
+    return transfer_posting(
+        idempotency_key=key,
+        from_wallet_id=uuid4(),
+        to_wallet_id=uuid4(),
+        amount=Decimal(amount),
+        asset="USD",
+        external_reference=None,
+        expected_from_version=None,
+        expected_to_version=None,
+    )
+
+
+def _committed(posting) -> LedgerTransaction:
+    return LedgerTransaction(
+        transaction_id=uuid4(),
+        operation_scope=posting.operation_scope,
+        idempotency_key=posting.idempotency_key,
+        payload_hash=posting.payload_hash,
+        status="committed",
+        created_at=datetime.now(UTC),
+        external_reference=None,
+        entries=[],
+    )
+
+
+class FakeClock:
+    now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_replay_hits_and_mismatch_conflicts():
+    cache = ReplayCache()
+    posting = _posting("k1")
+    assert cache.lookup(posting) is None
+
+    tx = _committed(posting)
+    cache.store(tx)
+    assert cache.lookup(posting) is tx
+
+    mismatch = _posting("k1", amount="2.00")
+    with pytest.raises(ConflictError, match="idempotency key reuse with different payload"):
+        cache.lookup(mismatch)
+
+
+class FakeCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def add(self, amount, attributes=None) -> None:
+        self.count += amount
+
+
+def test_mismatch_counts_as_conflict_not_hit(monkeypatch):
+    from wallet_service.ledger import replay_cache
+
+    hits, conflicts = FakeCounter(), FakeCounter()
+    monkeypatch.setattr(replay_cache, "_hits", hits)
+    monkeypatch.setattr(replay_cache, "_conflicts", conflicts)
+    cache = ReplayCache()
+    posting = _posting("k1")
+    cache.store(_committed(posting))
+
+    with pytest.raises(ConflictError):
+        cache.lookup(_posting("k1", amount="2.00"))
+    assert (hits.count, conflicts.count) == (0, 1)
+    cache.lookup(posting)
+    assert (hits.count, conflicts.count) == (1, 1)
+
+
+def test_least_recently_used_entries_are_evicted(monkeypatch):
+    monkeypatch.setattr(settings, "idempotency_cache_max_entries", 2)
+    cache = ReplayCache()
+    postings = [_posting(f"k{i}") for i in range(3)]
+    cache.store(_committed(postings[0]))
+    cache.store(_committed(postings[1]))
+    cache.lookup(postings[0])
+    cache.store(_committed(postings[2]))
+
+    assert len(cache) == 2
+    assert cache.lookup(postings[1]) is None
+    assert cache.lookup(postings[0]) is not None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    monkeypatch.setattr(settings, "idempotency_cache_ttl_seconds", 10)
+    clock = FakeClock()
+    cache = ReplayCache(clock=clock)
+    posting = _posting("k1")
+    cache.store(_committed(posting))
+
+    clock.now = 9
+    assert cache.lookup(posting) is not None
+    clock.now = 11
+    assert cache.lookup(posting) is None
+    assert len(cache) == 0
+
+
+def test_zero_capacity_disables_cache(monkeypatch):
+    monkeypatch.setattr(settings, "idempotency_cache_max_entries", 0)
+    cache = ReplayCache()
+    posting = _posting("k1")
+    cache.store(_committed(posting))
+    assert cache.lookup(posting) is None
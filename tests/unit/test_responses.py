@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from wallet_service.api.responses import batch_transfer_response, transaction_response
+from wallet_service.api.schemas import (
+    BatchTransferResponse,
+    BatchTransferResult,
+    TransactionResponse,
+)
+from wallet_service.domain.errors import ConflictError, ServiceUnavailableError
+from wallet_service.ledger.journal import BatchItemResult, JournalEntry, LedgerTransaction
+
+
+def _transaction(external_reference: str | None) -> LedgerTransaction:
+    payer, payee = uuid4(), uuid4()
+    return LedgerTransaction(
+        transaction_id=uuid4(),
+        operation_scope="transfer",
+        idempotency_key="key-é",
+        payload_hash="ab" * 32,
+        status="committed",
+        created_at=datetime(2026, 10, 18, 9, 30, 1, 250, tzinfo=timezone(timedelta(hours=2))),
+        external_reference=external_reference,
+        entries=[
+            JournalEntry(payer, Decimal("-12.500000"), "USD"),
+            JournalEntry(payee, Decimal("12.500000"), "USD"),
+        ],
+    )
+
+
+def _validated(tx: LedgerTransaction) -> TransactionResponse:
+    """The response model the routes used to build and FastAPI re-validated."""
+    return TransactionResponse(
+        transaction_id=tx.transaction_id,
+        operation_scope=tx.operation_scope,
+        idempotency_key=tx.idempotency_key,
+        payload_hash=tx.payload_hash,
+        status=tx.status,
+        created_at=tx.created_at,
+        external_reference=tx.external_reference,
+        entries=[
+            {"account_id": e.account_id, "amount": e.amount, "asset": e.asset} for e in tx.entries
+        ],
+    )
+
+
+def _rendered(model, response_model) -> bytes:
+    """Bytes FastAPI sends when a route returns model through response_model."""
+    app = FastAPI()
+    app.get("/", response_model=response_model)(lambda: model)
+    response = TestClient(app).get("/")
+    assert response.headers["content-type"] == "application/json"
+    return response.content
+
+
+@pytest.mark.parametrize("external_reference", [None, 'order "7"\t  ✓ \x1f'])
+def test_transaction_response_matches_response_model(external_reference):
+    tx = _transaction(external_reference)
+    expected = _rendered(_validated(tx), TransactionResponse)
+    response = transaction_response(tx)
+    assert response.body == expected
+    assert response.media_type == "application/json"
+
+
+def test_batch_response_matches_response_model():
+    committed = _transaction("ref")
+    results = [
+        BatchItemResult("a", "committed", committed),
+        BatchItemResult("b", "failed", error=ConflictError("idempotency key reuse")),
+        BatchItemResult("c", "aborted"),
+    ]
+    expected = _rendered(
+        BatchTransferResponse(
+            mode="best_effort",
+            committed=1,
+            failed=1,
+            results=[
+                BatchTransferResult(
+                    idempotency_key="a", status="committed", transaction=_validated(committed)
+                ),
+                BatchTransferResult(
+                    idempotency_key="b",
+                    status="failed",
+                    error_status=409,
+                    error="idempotency key reuse",
+                ),
+                BatchTransferResult(idempotency_key="c", status="aborted"),
+            ],
+        ),
+        BatchTransferResponse,
+    )
+    assert batch_transfer_response("best_effort", results).body == expected
+
+
+class _ReusedKey(ConflictError):
+    pass
+
+
+@pytest.mark.parametrize(
+    ("error", "status"),
+    [
+        (_ReusedKey("reused"), 409),
+        (ServiceUnavailableError("database unavailable"), 503),
+        (RuntimeError("unexpected"), 500),
+    ],
+)
+def test_batch_error_status_follows_exception_hierarchy(error, status):
+    response = batch_transfer_response("best_effort", [BatchItemResult("a", "failed", error=error)])
+    assert b'"error_status":%d' % status in response.body
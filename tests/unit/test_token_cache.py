@@ -0,0 +1,101 @@
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from wallet_service.auth import jwt as auth_jwt
+from wallet_service.auth.jwks import JwksKeys
+from wallet_service.auth.jwt import AuthContext, decode_bearer_token
+from wallet_service.auth.token_cache import TokenCache, token_cache
+from wallet_service.config import settings
+from wallet_service.domain.errors import UnauthorizedError
+
+
+class FakeClock:
+    now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _context(subject: str = "svc") -> AuthContext:
+    return AuthContext(subject=subject, scope=frozenset({"wallet:read"}))
+
+
+def test_entries_expire_at_exp_or_max_ttl(monkeypatch):
+    monkeypatch.setattr(settings, "jwt_cache_max_ttl_seconds", 300.0)
+    clock = FakeClock()
+    cache = TokenCache(clock=clock)
+    short, unbounded = _context("short"), _context("unbounded")
+    cache.put("short", short, exp=clock.now + 10)
+    cache.put("unbounded", unbounded, exp=None)
+    assert cache.get("short") is short
+
+    clock.now += 10
+    assert cache.get("short") is None
+    assert cache.get("unbounded") is unbounded
+
+    clock.now += 290
+    assert cache.get("unbounded") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_tokens_are_evicted(monkeypatch):
+    monkeypatch.setattr(settings, "jwt_cache_max_entries", 2)
+    cache = TokenCache()
+    for token in ("a", "b"):
+        cache.put(token, _context(token), exp=None)
+    cache.get("a")
+    cache.put("c", _context("c"), exp=None)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_decode_reuses_verified_context(monkeypatch):
+    token_cache.clear()
+    token = jwt.encode(
+        {
+            "sub": "svc",
+            "aud": settings.jwt_audience,
+            "scope": "wallet:read",
+            "exp": time.time() + 60,
+        },
+        settings.jwt_secret,
+        algorithm="HS256",
+    )
+    first = decode_bearer_token(token)
+
+    def no_verify(*args, **kwargs):
+        raise AssertionError("cached token verified again")
+
+    monkeypatch.setattr(auth_jwt.jwt, "decode", no_verify)
+    assert decode_bearer_token(token) is first
+
+    # Any other token, tampered or not, is verified in full.
+    with pytest.raises(AssertionError):
+        decode_bearer_token(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
+
+
+def test_jwks_tokens_verify_against_fetched_keys(monkeypatch):
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    public_jwk = jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    keys = JwksKeys()
+    monkeypatch.setattr(settings, "jwt_jwks_url", "https://issuer.example/jwks.json")
+    monkeypatch.setattr(settings, "jwt_algorithms", ["ES256", "HS256"])
+    monkeypatch.setattr(auth_jwt, "jwks_keys", keys)
+    monkeypatch.setattr(
+        jwt.PyJWKClient,
+        "fetch_data",
+        lambda self: {"keys": [{**public_jwk, "kid": "k1", "alg": "ES256", "use": "sig"}]},
+    )
+    assert keys.refresh() == 1
+    token_cache.clear()
+
+    claims = {"sub": "agent", "aud": settings.jwt_audience, "scope": "wallet:write"}
+    token = jwt.encode(claims, private_key, algorithm="ES256", headers={"kid": "k1"})
+    assert decode_bearer_token(token).scope == {"wallet:write"}
+
+    unknown = jwt.encode(claims, private_key, algorithm="ES256", headers={"kid": "k2"})
+    with pytest.raises(UnauthorizedError):
+        decode_bearer_token(unknown)